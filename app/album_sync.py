@@ -0,0 +1,126 @@
+"""Album synchronization: mirrors source albums into Immich albums with bulk membership writes."""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from logging import Logger
+from typing import Any
+
+from app.immich_client import ImmichClient
+from app.log import get_logger
+from app.media_record import MediaRecord
+
+
+@dataclass
+class AlbumSyncStats:
+    """Counters of one album synchronization."""
+
+    albums: int = 0
+    created: int = 0
+    assets_added: int = 0
+    unresolved: int = 0
+    failed: list[str] = field(default_factory=list)
+
+
+class AlbumSync:
+    """Resolves source albums to Immich albums by name and adds the missing assets to them.
+
+    Membership is diffed locally against the current album contents, so only missing assets are sent, in bulk
+    requests of up to `batch_size` assets. Albums are only ever added to: assets removed from a source album or
+    added to an Immich album by hand are left alone.
+    """
+
+    immich: ImmichClient
+    batch_size: int
+    dry_run: bool
+    stats: AlbumSyncStats
+    logger: Logger
+
+    def __init__(self, immich: ImmichClient, *, batch_size: int = 500, dry_run: bool = False) -> None:
+        """Initialize the album sync.
+
+        :param immich: Immich client.
+        :param batch_size: Maximum number of assets added to an album in one request.
+        :param dry_run: Only log the albums that would be created and the assets that would be added.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.immich = immich
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.stats = AlbumSyncStats()
+
+    def run(self, albums: Iterable[dict[str, Any]], resolve: Callable[[MediaRecord], str | None]) -> AlbumSyncStats:
+        """Synchronize albums.
+
+        :param albums: Source albums as yielded by the source client's `iter_albums`.
+        :param resolve: Returns the Immich asset ID matching a source media record, or None.
+        :return: Counters of the synchronization.
+        """
+        self.stats = AlbumSyncStats()
+        existing: dict[str, dict[str, Any]] = {}
+        for album in self.immich.list_albums():
+            existing.setdefault(album.get("albumName") or "", album)
+
+        for album in albums:
+            title: str = album.get("title") or ""
+            if not title:
+                continue
+            self.stats.albums += 1
+            asset_ids: set[str] = set()
+            for item in album["items"]:
+                asset_id: str | None = resolve(item)
+                if asset_id is None:
+                    self.stats.unresolved += 1
+                else:
+                    asset_ids.add(asset_id)
+            album_id: str | None = self._sync_album(title, asset_ids, existing.get(title))
+            if album_id is not None and title not in existing:
+                existing[title] = {"id": album_id}  # source albums may share a name; merge them
+
+        self.logger.info(
+            "Synchronized %d albums: %d created, %d assets added, %d items not matched in Immich.",
+            self.stats.albums,
+            self.stats.created,
+            self.stats.assets_added,
+            self.stats.unresolved,
+        )
+        if self.stats.failed:
+            self.logger.error("Failed to create %d albums: %s", len(self.stats.failed), ", ".join(self.stats.failed))
+        return self.stats
+
+    def _sync_album(self, title: str, asset_ids: set[str], album: dict[str, Any] | None) -> str | None:
+        """Bring one Immich album up to date with its source album.
+
+        :param title: Album name.
+        :param asset_ids: Immich asset IDs of the source album members.
+        :param album: The existing Immich album of that name, or None.
+        :return: The ID of the Immich album, or None if there is none.
+        """
+        if album is None and not asset_ids:
+            self.logger.debug("Not creating album %s without any asset in Immich", title)
+            return None
+
+        current: set[str] = set()
+        if album is not None and album.get("assetCount", 1):
+            current = self.immich.get_album_asset_ids(album["id"])
+        missing: list[str] = sorted(asset_ids - current)
+
+        if self.dry_run:
+            if album is None:
+                self.logger.info("[DRY-RUN] Would create album: %s", title)
+            if missing:
+                self.logger.info("[DRY-RUN] Would add %d assets to album: %s", len(missing), title)
+            return None
+
+        album_id: str | None = album["id"] if album is not None else None
+        if album_id is None:
+            album_id = self.immich.create_album(title)
+            if album_id is None:
+                self.stats.failed.append(title)
+                return None
+            self.logger.info("Created album: %s", title)
+            self.stats.created += 1
+        if missing:
+            added: int = self.immich.add_assets_to_album(album_id, missing, self.batch_size)
+            self.stats.assets_added += added
+            self.logger.info("Added %d assets to album: %s", added, title)
+        return album_id
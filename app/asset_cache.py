@@ -0,0 +1,132 @@
+"""Persistent SQLite cache of the Immich asset index."""
+
+import os
+import sqlite3
+from collections.abc import Iterable
+from logging import Logger
+
+from app.asset_index import AssetIndex, IndexedAsset
+from app.log import get_logger
+
+SCHEMA_VERSION: str = "4"
+
+
+class AssetCache:
+    """On-disk cache of Immich asset metadata with a sync watermark."""
+
+    path: str
+    connection: sqlite3.Connection
+    logger: Logger
+
+    def __init__(self, path: str) -> None:
+        """Open (or create) the cache database.
+
+        :param path: Path to the SQLite database file.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.path = path
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self._ensure_schema()
+
+    def _ensure_schema(self) -> None:
+        """Create the cache tables, dropping any cache written with a different schema version."""
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row: tuple[str] | None = self.connection.execute(
+                "SELECT value FROM meta WHERE key = 'schema_version'"
+            ).fetchone()
+            if row is not None and row[0] != SCHEMA_VERSION:
+                self.logger.info("Asset cache schema changed (%s → %s), rebuilding.", row[0], SCHEMA_VERSION)
+                self.connection.execute("DROP TABLE IF EXISTS assets")
+                self.connection.execute("DELETE FROM meta")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                "id TEXT PRIMARY KEY, original_file_name TEXT NOT NULL, checksum TEXT, description TEXT, "
+                "updated_at TEXT, taken_at TEXT, file_size INTEGER, is_favorite INTEGER, is_archived INTEGER, "
+                "latitude REAL, longitude REAL, visibility TEXT)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS assets_original_file_name ON assets (original_file_name)"
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (SCHEMA_VERSION,)
+            )
+
+    @property
+    def watermark(self) -> str | None:
+        """Return the `updatedAt` of the most recently changed asset stored in the cache.
+
+        :return: The watermark as an ISO timestamp, or None if the cache is empty.
+        """
+        row: tuple[str] | None = self.connection.execute("SELECT value FROM meta WHERE key = 'watermark'").fetchone()
+        return row[0] if row else None
+
+    def load(self) -> AssetIndex:
+        """Load all cached assets into an in-memory index.
+
+        :return: Index populated from the cache, with the stored watermark.
+        """
+        index: AssetIndex = AssetIndex()
+        rows = self.connection.execute(
+            "SELECT id, original_file_name, checksum, description, updated_at, taken_at, file_size, "
+            "is_favorite, is_archived, latitude, longitude, visibility FROM assets"
+        )
+        for row in rows:
+            asset: IndexedAsset = IndexedAsset(*row)
+            asset.is_favorite = None if asset.is_favorite is None else bool(asset.is_favorite)
+            asset.is_archived = None if asset.is_archived is None else bool(asset.is_archived)
+            index.add(asset)
+        index.watermark = self.watermark
+        self.logger.debug("Loaded %d assets from cache %s", len(index), self.path)
+        return index
+
+    def store(self, assets: Iterable[IndexedAsset], removed: Iterable[str], watermark: str | None) -> None:
+        """Upsert changed assets, delete removed ones and advance the watermark in one transaction.
+
+        :param assets: Assets that were added or changed.
+        :param removed: IDs of assets that no longer exist in Immich.
+        :param watermark: New watermark to persist.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO assets "
+                "(id, original_file_name, checksum, description, updated_at, taken_at, file_size, "
+                "is_favorite, is_archived, latitude, longitude, visibility) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        asset.id,
+                        asset.original_file_name,
+                        asset.checksum,
+                        asset.description,
+                        asset.updated_at,
+                        asset.taken_at,
+                        asset.file_size,
+                        asset.is_favorite,
+                        asset.is_archived,
+                        asset.latitude,
+                        asset.longitude,
+                        asset.visibility,
+                    )
+                    for asset in assets
+                ),
+            )
+            self.connection.executemany("DELETE FROM assets WHERE id = ?", ((asset_id,) for asset_id in removed))
+            if watermark:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('watermark', ?)", (watermark,)
+                )
+
+    def clear(self) -> None:
+        """Remove all cached assets and the watermark."""
+        with self.connection:
+            self.connection.execute("DELETE FROM assets")
+            self.connection.execute("DELETE FROM meta WHERE key = 'watermark'")
+        self.logger.info("Cleared asset cache %s", self.path)
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self.connection.close()
@@ -0,0 +1,204 @@
+"""In-memory index of Immich assets used to match Google Photos items locally."""
+
+import datetime
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+MATCH_TIME_TOLERANCE: datetime.timedelta = datetime.timedelta(hours=14)  # widest UTC offset of a local camera clock
+
+
+def normalize_timestamp(value: str | None) -> str | None:
+    """Normalize an ISO timestamp to UTC with second precision, so times from different APIs compare equal.
+
+    :param value: ISO 8601 timestamp (e.g. "2024-04-10T12:00:00.000Z"), or None.
+    :return: Timestamp formatted as "YYYY-MM-DDTHH:MM:SSZ", or None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        parsed: datetime.datetime = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.UTC)
+    return parsed.astimezone(datetime.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class IndexedAsset:
+    """Subset of Immich asset metadata kept in the index."""
+
+    id: str
+    original_file_name: str
+    checksum: str | None = None
+    description: str | None = None
+    updated_at: str | None = None
+    taken_at: str | None = None
+    file_size: int | None = None
+    is_favorite: bool | None = None
+    is_archived: bool | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    visibility: str | None = None  # reported by Immich releases that replaced isArchived
+
+    @staticmethod
+    def from_api(asset: dict[str, Any]) -> "IndexedAsset":
+        """Create an indexed asset from an Immich API asset response.
+
+        :param asset: Asset dictionary as returned by the Immich API.
+        :return: IndexedAsset with the fields required for matching.
+        """
+        exif: dict[str, Any] = asset.get("exifInfo") or {}
+        is_archived: bool | None = asset.get("isArchived")
+        if is_archived is None and "visibility" in asset:  # newer Immich releases replace isArchived
+            is_archived = asset["visibility"] == "archive"
+        return IndexedAsset(
+            id=asset["id"],
+            original_file_name=asset.get("originalFileName") or "",
+            checksum=asset.get("checksum"),
+            description=exif.get("description"),
+            updated_at=asset.get("updatedAt"),
+            taken_at=normalize_timestamp(exif.get("dateTimeOriginal") or asset.get("fileCreatedAt")),
+            file_size=exif.get("fileSizeInByte"),
+            is_favorite=asset.get("isFavorite"),
+            is_archived=is_archived,
+            latitude=exif.get("latitude"),
+            longitude=exif.get("longitude"),
+            visibility=asset.get("visibility"),
+        )
+
+
+def _contradicts(asset: IndexedAsset, checksum: str | None, taken_at: str | None, size: int | None) -> bool:
+    """Check whether an asset with the same file name is known to differ from a source item.
+
+    :param asset: Candidate asset.
+    :param checksum: Base64 SHA-1 of the item content, or None.
+    :param taken_at: Normalized capture time of the item, or None.
+    :param size: File size of the item in bytes, or None.
+    :return: True if the checksum, the size or the capture time of both are known and disagree.
+    """
+    if checksum and asset.checksum and asset.checksum != checksum:
+        return True
+    if size and asset.file_size and asset.file_size != size:
+        return True
+    if not taken_at or not asset.taken_at:
+        return False
+    offset: datetime.timedelta = datetime.datetime.fromisoformat(asset.taken_at) - datetime.datetime.fromisoformat(
+        taken_at
+    )
+    return abs(offset) > MATCH_TIME_TOLERANCE
+
+
+class AssetIndex:
+    """Index of Immich assets keyed by checksum and original file name."""
+
+    assets: dict[str, IndexedAsset]
+    by_filename: dict[str, list[str]]
+    by_checksum: dict[str, list[str]]
+    watermark: str | None
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self.assets = {}
+        self.by_filename = {}
+        self.by_checksum = {}
+        self.watermark = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed assets.
+
+        :return: Number of assets in the index.
+        """
+        return len(self.assets)
+
+    def add(self, asset: IndexedAsset) -> None:
+        """Add or replace an asset in the index.
+
+        :param asset: The asset to add.
+        """
+        previous: IndexedAsset | None = self.assets.get(asset.id)
+        if previous is not None:
+            self._unlink(previous)
+        self.assets[asset.id] = asset
+        self.by_filename.setdefault(asset.original_file_name, []).append(asset.id)
+        if asset.checksum:
+            self.by_checksum.setdefault(asset.checksum, []).append(asset.id)
+        if asset.updated_at and (self.watermark is None or asset.updated_at > self.watermark):
+            self.watermark = asset.updated_at
+
+    def remove(self, asset_id: str) -> None:
+        """Remove an asset from the index if present.
+
+        :param asset_id: The ID of the asset to remove.
+        """
+        asset: IndexedAsset | None = self.assets.pop(asset_id, None)
+        if asset is not None:
+            self._unlink(asset)
+
+    def add_all(self, assets: Iterable[dict[str, Any]]) -> None:
+        """Add all assets from an iterable of Immich API asset responses.
+
+        :param assets: Iterable of asset dictionaries as returned by the Immich API.
+        """
+        for asset in assets:
+            self.add(IndexedAsset.from_api(asset))
+
+    def find_by_filename(self, filename: str) -> str | None:
+        """Find the first asset ID with the given original file name.
+
+        :param filename: The original file name to look up.
+        :return: The asset ID if found, otherwise None.
+        """
+        asset_ids: list[str] | None = self.by_filename.get(filename)
+        return asset_ids[0] if asset_ids else None
+
+    def match(
+        self, filename: str, checksum: str | None = None, taken_at: str | None = None, size: int | None = None
+    ) -> list[IndexedAsset]:
+        """Find the candidate assets for a source item.
+
+        The content checksum is authoritative. Without a checksum hit, assets with the same file name are first
+        dropped when a known checksum, size or capture time (beyond `MATCH_TIME_TOLERANCE`) contradicts the item,
+        so a lone asset sharing only the file name is not taken for it, and are then narrowed down by (capture
+        time, size) and by capture time alone.
+
+        :param filename: Original file name of the item.
+        :param checksum: Base64 SHA-1 of the item content, as stored by Immich.
+        :param taken_at: Capture time of the item (ISO 8601).
+        :param size: File size of the item in bytes.
+        :return: Matching assets; exactly one element means an unambiguous match.
+        """
+        if checksum and checksum in self.by_checksum:
+            return [self.assets[asset_id] for asset_id in self.by_checksum[checksum]]
+
+        taken: str | None = normalize_timestamp(taken_at)
+        candidates: list[IndexedAsset] = [
+            asset
+            for asset_id in self.by_filename.get(filename, [])
+            if not _contradicts(asset := self.assets[asset_id], checksum, taken, size)
+        ]
+        if len(candidates) <= 1:
+            return candidates
+
+        by_time_and_size: list[IndexedAsset] = [
+            asset for asset in candidates if taken and asset.taken_at == taken and size and asset.file_size == size
+        ]
+        if by_time_and_size:
+            return by_time_and_size
+        by_time: list[IndexedAsset] = [asset for asset in candidates if taken and asset.taken_at == taken]
+        return by_time or candidates
+
+    def _unlink(self, asset: IndexedAsset) -> None:
+        """Remove an asset from the lookup tables.
+
+        :param asset: The asset to remove.
+        """
+        for table, key in ((self.by_filename, asset.original_file_name), (self.by_checksum, asset.checksum)):
+            if key is None:
+                continue
+            asset_ids: list[str] = table.get(key, [])
+            if asset.id in asset_ids:
+                asset_ids.remove(asset.id)
+            if not asset_ids:
+                table.pop(key, None)
@@ -0,0 +1,125 @@
+"""Metadata patches: the source fields synchronized to Immich and the asset fields they are written to."""
+
+import json
+import math
+from typing import Any
+
+from app.asset_index import IndexedAsset, normalize_timestamp
+from app.media_record import MediaRecord
+
+SYNC_FIELDS: frozenset[str] = frozenset({"description", "date", "location", "favorite", "archived"})
+BULK_FIELDS: frozenset[str] = frozenset({"isFavorite", "isArchived", "visibility"})  # same value for many assets
+LOCATION_TOLERANCE: float = 1e-6  # degrees (about 0.1 m), absorbs float rounding in Immich's EXIF store
+
+
+def build_patch(record: MediaRecord, sync_fields: frozenset[str]) -> dict[str, Any]:
+    """Build the Immich asset fields to write for a source item.
+
+    Favorite and archived flags are only ever set, never cleared, so state added in Immich is kept.
+
+    :param record: The source media record.
+    :param sync_fields: Names of the synchronized fields (see `SYNC_FIELDS`).
+    :return: Immich asset fields, e.g. {"description": "...", "isFavorite": True}; empty if there is nothing to sync.
+    """
+    patch: dict[str, Any] = {}
+    if "description" in sync_fields and record.description:
+        patch["description"] = record.description
+    if "date" in sync_fields and (taken_at := normalize_timestamp(record.creation_time)):
+        patch["dateTimeOriginal"] = taken_at
+    if "location" in sync_fields and record.latitude is not None and record.longitude is not None:
+        patch["latitude"] = record.latitude
+        patch["longitude"] = record.longitude
+    if "favorite" in sync_fields and record.favorite:
+        patch["isFavorite"] = True
+    if "archived" in sync_fields and record.archived:
+        patch["isArchived"] = True
+    return patch
+
+
+def changed_fields(patch: dict[str, Any], asset: IndexedAsset) -> dict[str, Any]:
+    """Drop the fields Immich is known to hold already.
+
+    :param patch: Fields to write.
+    :param asset: The matching Immich asset.
+    :return: The fields that differ from the asset, or are not known for it.
+    """
+    changed: dict[str, Any] = dict(patch)
+    if changed.get("description") == asset.description:
+        changed.pop("description", None)
+    if asset.taken_at is not None and changed.get("dateTimeOriginal") == asset.taken_at:
+        changed.pop("dateTimeOriginal")
+    if _same_location(changed, asset):
+        changed.pop("latitude")
+        changed.pop("longitude")
+    if asset.is_favorite is not None and changed.get("isFavorite") == asset.is_favorite:
+        changed.pop("isFavorite")
+    if asset.is_archived is not None and changed.get("isArchived") == asset.is_archived:
+        changed.pop("isArchived")
+    return changed
+
+
+def _same_location(patch: dict[str, Any], asset: IndexedAsset) -> bool:
+    """Check whether a patch writes the location Immich already holds.
+
+    :param patch: Fields to write.
+    :param asset: The matching Immich asset.
+    :return: True if both coordinates are in the patch and match the asset within `LOCATION_TOLERANCE`.
+    """
+    if "latitude" not in patch or "longitude" not in patch or asset.latitude is None or asset.longitude is None:
+        return False
+    return math.isclose(patch["latitude"], asset.latitude, abs_tol=LOCATION_TOLERANCE) and math.isclose(
+        patch["longitude"], asset.longitude, abs_tol=LOCATION_TOLERANCE
+    )
+
+
+def asset_fields(patch: dict[str, Any], asset: IndexedAsset) -> dict[str, Any]:
+    """Adapt a patch to the asset fields of the Immich release holding the asset.
+
+    Releases that report `visibility` instead of `isArchived` archive an asset with `visibility: "archive"`. Assets
+    in another visibility (the locked folder, hidden parts of live photos) are not moved to the archive.
+
+    :param patch: Fields to write.
+    :param asset: The matching Immich asset.
+    :return: The fields to send.
+    """
+    if "isArchived" not in patch or asset.visibility is None:
+        return patch
+    fields: dict[str, Any] = {name: value for name, value in patch.items() if name != "isArchived"}
+    if asset.visibility == "timeline":
+        fields["visibility"] = "archive"
+    return fields
+
+
+def is_bulk(patch: dict[str, Any]) -> bool:
+    """Check whether a patch can be written with the bulk asset update.
+
+    :param patch: Fields to write.
+    :return: True if the patch only sets fields that have the same value for many assets.
+    """
+    return bool(patch) and patch.keys() <= BULK_FIELDS
+
+
+def patch_key(patch: dict[str, Any]) -> str:
+    """Return the content recorded in the sync journal for a patch.
+
+    A description-only patch is recorded as the description itself, so journals written before other fields
+    were synchronized stay valid.
+
+    :param patch: Fields to write.
+    :return: The description, or the canonical JSON of the fields.
+    """
+    if patch.keys() == {"description"}:
+        description: str = patch["description"]
+        return description
+    return json.dumps(patch, sort_keys=True, ensure_ascii=False)
+
+
+def describe(patch: dict[str, Any]) -> str:
+    """Format a patch for log messages.
+
+    :param patch: Fields to write.
+    :return: The quoted description, or the list of fields.
+    """
+    if patch.keys() == {"description"}:
+        return f'"{patch["description"]}"'
+    return ", ".join(f"{name}={value!r}" for name, value in patch.items())
@@ -0,0 +1,112 @@
+"""JSON codec with a pluggable fast backend: msgspec or orjson when installed, the standard library otherwise."""
+
+import json
+from collections.abc import Callable
+from logging import Logger
+from typing import Any, TypeVar
+
+from app.log import get_logger
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
+BACKENDS: tuple[str, ...] = ("msgspec", "orjson", "json")  # in order of preference for "auto"
+
+T = TypeVar("T")
+
+logger: Logger = get_logger("codec")
+backend: str = "json"
+
+
+def available_backends() -> list[str]:
+    """List the installed JSON backends.
+
+    :return: Backend names in order of preference.
+    """
+    installed: dict[str, bool] = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [name for name in BACKENDS if installed[name]]
+
+
+def set_backend(name: str = "auto") -> str:
+    """Select the JSON backend used by `loads`, `dumps` and `decode`.
+
+    :param name: "auto" for the fastest installed backend, or one of `BACKENDS`; a backend that is not installed
+        falls back to "auto" with a warning.
+    :return: The name of the selected backend.
+    """
+    global backend  # noqa: PLW0603
+    if name != "auto" and name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}, expected auto or one of {', '.join(BACKENDS)}")
+    installed: list[str] = available_backends()
+    if name != "auto" and name not in installed:
+        logger.warning("JSON backend %s is not installed, using %s", name, installed[0])
+    backend = name if name in installed else installed[0]
+    return backend
+
+
+def loads(data: bytes | str) -> Any:
+    """Decode a JSON document into Python objects.
+
+    :param data: JSON document.
+    :return: The decoded value.
+    :raises ValueError: If the document is not valid JSON.
+    """
+    if backend == "msgspec":
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+    if backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON.
+
+    :param value: Value made of dicts, lists, strings, numbers, booleans and None.
+    :return: The JSON document.
+    """
+    if backend == "msgspec":
+        encoded: bytes = msgspec.json.encode(value)
+        return encoded
+    if backend == "orjson":
+        dumped: bytes = orjson.dumps(value)
+        return dumped
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def decode(data: bytes | str, target: type[T], convert: Callable[[Any], T]) -> T:
+    """Decode a JSON document into a typed record.
+
+    With msgspec the document is decoded straight into `target` (a dataclass whose fields follow the JSON keys),
+    validating the types without building intermediate dicts; unknown keys are skipped. A document that fails the
+    type validation (e.g. a null flag or a non-numeric coordinate) is decoded again through `convert`, so the
+    result is as tolerant as with the other backends, which decode to Python objects and build the record with
+    `convert`.
+
+    :param data: JSON document.
+    :param target: Record type.
+    :param convert: Builds a record from the decoded Python objects, raising ValueError if they do not fit.
+    :return: The decoded record.
+    :raises ValueError: If the document is not valid JSON or does not have the shape of `target`.
+    """
+    if backend == "msgspec":
+        try:
+            record: T = msgspec.json.decode(data, type=target)
+        except msgspec.ValidationError:
+            return convert(loads(data))
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+        return record
+    return convert(loads(data))
+
+
+set_backend()
@@ -1,7 +1,7 @@
 """Configuration module for the application."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from dotenv import load_dotenv
 
@@ -18,6 +18,43 @@ class Config:
     days_back: int = 15
     dry_run: bool = False
     sync_strategy: str = "overwrite"
+    sync_workers: int = 1
+    sync_fields: list[str] = field(default_factory=lambda: ["description"])
+    source: str = "google"
+    google_fetch_shards: int = 1
+    google_shard_days: int = 30
+    google_discovery_cache_path: str = ""
+    takeout_paths: list[str] = field(default_factory=list)
+    takeout_workers: int = 1
+    takeout_hash_media: bool = False
+    match_mode: str = "search"
+    immich_page_size: int = 1000
+    match_window_margin: float = 24.0
+    asset_cache_path: str = ""
+    rebuild_cache: bool = False
+    journal_path: str = ""
+    watermark_path: str = ""
+    watermark_overlap: float = 24.0
+    sync_albums: bool = False
+    album_batch_size: int = 500
+    immich_pool_size: int = 10
+    immich_connect_timeout: float = 5.0
+    immich_read_timeout: float = 30.0
+    immich_max_retries: int = 3
+    immich_retry_backoff: float = 0.5
+    immich_rate_limit: float = 0.0
+    immich_rate_min: float = 1.0
+    immich_rate_max: float = 200.0
+    immich_target_latency: float = 1.0
+    sync_async: bool = False
+    immich_http2: bool = True
+    metrics_port: int = 0
+    metrics_textfile: str = ""
+    daemon: bool = False
+    sync_interval: float = 3600.0
+    sync_cron: str = ""
+    sync_jitter: float = 0.0
+    json_backend: str = "auto"
 
     @staticmethod
     def load() -> "Config":
@@ -32,4 +69,43 @@ class Config:
             days_back=int(os.getenv("DAYS_BACK", "15")),
             dry_run=os.getenv("DRY_RUN", "false").lower() in ("1", "true", "yes"),
             sync_strategy=os.getenv("SYNC_STRATEGY", "overwrite"),
+            sync_workers=max(1, int(os.getenv("SYNC_WORKERS", "1"))),
+            sync_fields=[
+                name.strip().lower() for name in os.getenv("SYNC_FIELDS", "description").split(",") if name.strip()
+            ],
+            source=os.getenv("SOURCE", "google"),
+            google_fetch_shards=max(1, int(os.getenv("GOOGLE_FETCH_SHARDS", "1"))),
+            google_shard_days=max(1, int(os.getenv("GOOGLE_SHARD_DAYS", "30"))),
+            google_discovery_cache_path=os.getenv("GOOGLE_DISCOVERY_CACHE", ""),
+            takeout_paths=[path.strip() for path in os.getenv("TAKEOUT_PATHS", "").split(",") if path.strip()],
+            takeout_workers=max(1, int(os.getenv("TAKEOUT_WORKERS", "1"))),
+            takeout_hash_media=os.getenv("TAKEOUT_HASH_MEDIA", "false").lower() in ("1", "true", "yes"),
+            match_mode=os.getenv("MATCH_MODE", "search"),
+            immich_page_size=int(os.getenv("IMMICH_PAGE_SIZE", "1000")),
+            match_window_margin=float(os.getenv("MATCH_WINDOW_MARGIN_HOURS", "24")),
+            asset_cache_path=os.getenv("ASSET_CACHE_PATH", ""),
+            rebuild_cache=os.getenv("REBUILD_CACHE", "false").lower() in ("1", "true", "yes"),
+            journal_path=os.getenv("JOURNAL_PATH", ""),
+            watermark_path=os.getenv("WATERMARK_PATH", ""),
+            watermark_overlap=max(0.0, float(os.getenv("WATERMARK_OVERLAP_HOURS", "24"))),
+            sync_albums=os.getenv("SYNC_ALBUMS", "false").lower() in ("1", "true", "yes"),
+            album_batch_size=max(1, int(os.getenv("ALBUM_BATCH_SIZE", "500"))),
+            immich_pool_size=max(1, int(os.getenv("IMMICH_POOL_SIZE", "10"))),
+            immich_connect_timeout=float(os.getenv("IMMICH_CONNECT_TIMEOUT", "5")),
+            immich_read_timeout=float(os.getenv("IMMICH_READ_TIMEOUT", "30")),
+            immich_max_retries=int(os.getenv("IMMICH_MAX_RETRIES", "3")),
+            immich_retry_backoff=float(os.getenv("IMMICH_RETRY_BACKOFF", "0.5")),
+            immich_rate_limit=float(os.getenv("IMMICH_RATE_LIMIT", "0")),
+            immich_rate_min=float(os.getenv("IMMICH_RATE_MIN", "1")),
+            immich_rate_max=float(os.getenv("IMMICH_RATE_MAX", "200")),
+            immich_target_latency=float(os.getenv("IMMICH_TARGET_LATENCY", "1")),
+            sync_async=os.getenv("SYNC_ASYNC", "false").lower() in ("1", "true", "yes"),
+            immich_http2=os.getenv("IMMICH_HTTP2", "true").lower() in ("1", "true", "yes"),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            metrics_textfile=os.getenv("METRICS_TEXTFILE", ""),
+            daemon=os.getenv("DAEMON", "false").lower() in ("1", "true", "yes"),
+            sync_interval=float(os.getenv("SYNC_INTERVAL", "3600")),
+            sync_cron=os.getenv("SYNC_CRON", ""),
+            sync_jitter=max(0.0, float(os.getenv("SYNC_JITTER", "0"))),
+            json_backend=os.getenv("JSON_BACKEND", "auto").strip().lower(),
         )
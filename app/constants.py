@@ -1,2 +1,4 @@
 """Global constants for the application."""
 HTTP_OK = 200
+HTTP_NO_CONTENT = 204
+RETRY_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
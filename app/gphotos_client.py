@@ -3,9 +3,17 @@
 import datetime
 import json
 import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
 from logging import Logger
 from typing import Any
 
+import google_auth_httplib2
+import httplib2
 import requests
 from google.auth.exceptions import RefreshError
 from google.auth.external_account_authorized_user import Credentials as AuthUserCredentials
@@ -13,63 +21,146 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials as OAuth2Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build_from_document
+from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
 
+from app import codec
 from app.log import get_logger
+from app.media_record import MediaRecord
+from app.metrics import HTTP_BYTES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT, SOURCE_PAGES
 
 SCOPES: list[str] = ["https://www.googleapis.com/auth/photoslibrary.readonly"]
 DISCOVERY_URL: str = "https://photoslibrary.googleapis.com/$discovery/rest?version=v1"
+DISCOVERY_CACHE_TTL: float = 7 * 24 * 3600.0  # seconds before the cached discovery document is refreshed
+DISCOVERY_TIMEOUT: float = 30.0
+LIST_STOP_PAGES: int = 2  # consecutive list pages before the window after which a full listing stops
 TOKEN_PATH = "token.json"
 
 
+class CodecJsonModel(JsonModel):
+    """API response model decoding the media item pages with the configured JSON backend."""
+
+    def deserialize(self, content: bytes | str) -> Any:
+        """Decode a response body.
+
+        :param content: Raw response body.
+        :return: The decoded body, or the raw body if it is not JSON.
+        """
+        try:
+            body: Any = codec.loads(content)
+        except ValueError:
+            return content
+        if self._data_wrapper and isinstance(body, dict) and "data" in body:
+            return body["data"]
+        return body
+
+
+def parse_media_item(media_item: dict[str, Any]) -> MediaRecord:
+    """Build the record of a Google Photos media item, keeping only the fields the sync needs.
+
+    :param media_item: A media item dictionary from Google Photos API.
+    :return: The media record.
+    """
+    return MediaRecord(
+        id=media_item.get("id") or "",
+        filename=media_item.get("filename") or "",
+        description=media_item.get("description"),
+        creation_time=media_item.get("mediaMetadata", {}).get("creationTime"),
+    )
+
+
 class GooglePhotosClient:
-    """Client for interacting with Google Photos API."""
+    """Client for interacting with Google Photos API.
 
-    service: Any
+    Credentials and the API service are built lazily on first use, so constructing the client does no file or
+    network work.
+    """
+
+    credentials_path: str
+    discovery_cache_path: str
+    shards: int
+    shard_days: int
     logger: Logger
+    _local: threading.local
 
-    def __init__(self, credentials_path: str) -> None:
+    def __init__(
+        self, credentials_path: str, *, shards: int = 1, shard_days: int = 30, discovery_cache_path: str = ""
+    ) -> None:
         """Initialize the Google Photos client.
 
         :param credentials_path: Path to the Google API credentials JSON file.
+        :param shards: Number of date shards of the window fetched concurrently (1 = sequential).
+        :param shard_days: Length of one date shard in days.
+        :param discovery_cache_path: Optional path of the on-disk discovery document cache.
         """
         self.logger = get_logger(self.__class__.__name__)
-        self.service = self._authenticate(credentials_path)
+        self.credentials_path = credentials_path
+        self.discovery_cache_path = discovery_cache_path
+        self.shards = shards
+        self.shard_days = shard_days
+        self._local = threading.local()
 
-    def _test_if_token_expired(self) -> bool:
-        """Check if the token is expired.
+    @cached_property
+    def credentials(self) -> AuthUserCredentials | OAuth2Credentials:
+        """Return the user credentials, authenticating on first access.
 
-        :return: True if the token is expired, False otherwise.
+        :return: Valid user credentials for the Google Photos API.
+        """
+        return self._authenticate(self.credentials_path)
+
+    @cached_property
+    def service(self) -> Any:
+        """Return the Google Photos API service, building it on first access.
+
+        :return: Authenticated service object for Google Photos API.
+        """
+        return build_from_document(
+            self._load_discovery_document(), credentials=self.credentials, model=CodecJsonModel()
+        )
+
+    def _load_token(self) -> dict[str, Any] | None:
+        """Read the stored user token.
+
+        :return: Parsed token data, or None if the token file does not exist.
         """
         if not os.path.exists(TOKEN_PATH):
             self.logger.warning("Token file does not exist: %s", TOKEN_PATH)
-            return True
+            return None
 
         with open(TOKEN_PATH) as token_file:
             self.logger.debug("Loading token from %s", TOKEN_PATH)
-            token_data: dict[str, Any] = json.loads(token_file.read())
-            if "expiry" not in token_data:
-                self.logger.debug("Token file does not contain a refresh token.")
-                return True
-            self.logger.debug("Checking if token is expired...")
-            # Load the token and check if it is expired
-            refresh_date: datetime.datetime = datetime.datetime.fromisoformat(token_data.get("expiry", ""))
-            if refresh_date < datetime.datetime.now(datetime.UTC):
-                self.logger.info("Token is expired, needs refresh.")
-                return True
+            token_data: dict[str, Any] = json.load(token_file)
+        return token_data
+
+    def _test_if_token_expired(self, token_data: dict[str, Any]) -> bool:
+        """Check if the token is expired.
+
+        :param token_data: Parsed token data.
+        :return: True if the token is expired, False otherwise.
+        """
+        if "expiry" not in token_data:
+            self.logger.debug("Token file does not contain a refresh token.")
+            return True
+        self.logger.debug("Checking if token is expired...")
+        refresh_date: datetime.datetime = datetime.datetime.fromisoformat(token_data.get("expiry", ""))
+        if refresh_date < datetime.datetime.now(datetime.UTC):
+            self.logger.info("Token is expired, needs refresh.")
+            return True
 
         return False
 
-    def _authenticate(self, credentials_path: str) -> Any:
-        """Authenticate and create a service object for Google Photos API.
+    def _authenticate(self, credentials_path: str) -> AuthUserCredentials | OAuth2Credentials:
+        """Authenticate the user, reading `token.json` once and running the OAuth flow when needed.
 
         :param credentials_path: Path to the Google API credentials JSON file.
-        :return: Authenticated service object for Google Photos API.
+        :return: Valid user credentials.
         """
         user_credentials: AuthUserCredentials | OAuth2Credentials
         user_credentials_initialized: bool = False
 
-        if os.path.exists(TOKEN_PATH):
-            if self._test_if_token_expired():
+        token_data: dict[str, Any] | None = self._load_token()
+        if token_data is not None:
+            if self._test_if_token_expired(token_data):
                 self.logger.info("Token is expired, refreshing...")
                 try:
                     os.unlink(TOKEN_PATH)
@@ -78,8 +169,8 @@ class GooglePhotosClient:
                 user_credentials_initialized = False
             else:
                 user_credentials_initialized = True
-                self.logger.debug("Loading existing token from %s", TOKEN_PATH)
-                user_credentials = OAuth2Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+                self.logger.debug("Using existing token from %s", TOKEN_PATH)
+                user_credentials = OAuth2Credentials.from_authorized_user_info(token_data, SCOPES)
 
         if not user_credentials_initialized or not user_credentials or not user_credentials.valid:
             if (
@@ -106,44 +197,206 @@ class GooglePhotosClient:
                 token_file.write(user_credentials.to_json())
                 self.logger.info("Saved new token to %s", TOKEN_PATH)
 
-        discovery_doc: str = requests.get(DISCOVERY_URL).text
-        return build_from_document(json.loads(discovery_doc), credentials=user_credentials)
+        return user_credentials
 
-    def fetch_media_items_all(self, days_back: int) -> list[dict]:
-        """Fetch all media items from Google Photos API.
+    def _load_discovery_document(self) -> dict[str, Any]:
+        """Load the API discovery document, from the on-disk cache when it is fresh.
+
+        Cache entries are keyed by the discovery URL (which carries the API version) and expire after
+        `DISCOVERY_CACHE_TTL`. A stale entry is still used when the download fails.
+
+        :return: Parsed discovery document.
+        """
+        cached: dict[str, Any] | None = self._read_discovery_cache()
+        if cached is not None and time.time() - cached["fetched"] < DISCOVERY_CACHE_TTL:
+            self.logger.debug("Using cached discovery document from %s", self.discovery_cache_path)
+            document: dict[str, Any] = cached["document"]
+            return document
+
+        try:
+            response: requests.Response = requests.get(DISCOVERY_URL, timeout=DISCOVERY_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if cached is None:
+                raise
+            self.logger.warning("Failed to refresh discovery document, using cached copy: %s", e)
+            document = cached["document"]
+            return document
+
+        document = codec.loads(response.content)
+        self._write_discovery_cache(document)
+        return document
+
+    def _read_discovery_cache(self) -> dict[str, Any] | None:
+        """Read the discovery cache entry for the current discovery URL.
+
+        :return: Cache entry with `url`, `fetched` and `document` keys, or None if missing, corrupt or outdated.
+        """
+        if not self.discovery_cache_path or not os.path.exists(self.discovery_cache_path):
+            return None
+        try:
+            with open(self.discovery_cache_path, "rb") as cache_file:
+                entry: dict[str, Any] = codec.loads(cache_file.read())
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable discovery cache %s: %s", self.discovery_cache_path, e)
+            return None
+        return entry if entry.get("url") == DISCOVERY_URL else None
+
+    def _write_discovery_cache(self, document: dict[str, Any]) -> None:
+        """Atomically store the discovery document in the on-disk cache.
+
+        :param document: Parsed discovery document.
+        """
+        if not self.discovery_cache_path:
+            return
+        directory: str = os.path.dirname(self.discovery_cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path: str = f"{self.discovery_cache_path}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            cache_file.write(codec.dumps({"url": DISCOVERY_URL, "fetched": time.time(), "document": document}))
+        os.replace(temporary_path, self.discovery_cache_path)
+        self.logger.debug("Cached discovery document in %s", self.discovery_cache_path)
+
+    def iter_media_items_all(self, days_back: int, stop_pages: int = LIST_STOP_PAGES) -> Iterator[MediaRecord]:
+        """Iterate over all media items from Google Photos API created within the window, page by page.
+
+        `mediaItems.list` returns the library newest first, so the listing stops once `stop_pages` consecutive
+        pages lie entirely before the window instead of walking the whole library. If an item inside the window
+        turns up after such a page, the listing order cannot be relied on and the window is fetched with the
+        server-side filtered (and, with `shards`, date-sharded) search instead.
 
         :param days_back: Number of days back to fetch media items.
-        :return: List of media items from Google Photos API.
+        :param stop_pages: Consecutive pages before the window after which the listing stops.
+        :return: Iterator over media records.
         """
-        start_date: str = (
-            f"{(datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days_back)).isoformat('T')}Z"
+        start_date: str = (datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days_back)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
         )
-        media_items: list[Any] = []
 
+        seen: set[str] = set()
+        stale_pages: int = 0
         request = self.service.mediaItems().list(pageSize=100)
         while request is not None:
-            response = request.execute()
-            for item in response.get("mediaItems", []):
-                metadata = item.get("mediaMetadata", {})
-                creation_time = metadata.get("creationTime")
-                if creation_time and creation_time >= start_date:
-                    media_items.append(item)
+            response = self._execute(request, "GET", "/v1/mediaItems")
+            page: list[MediaRecord] = [parse_media_item(item) for item in response.get("mediaItems", [])]
+            in_window: list[MediaRecord] = [record for record in page if (record.creation_time or "") >= start_date]
+            if in_window and stale_pages:
+                self.logger.warning("Media items are not listed newest first, falling back to the filtered search.")
+                yield from self._unique(self.iter_media_items(days_back), seen)
+                return
+
+            for record in in_window:
+                seen.add(record.id)
+                yield record
+            stale_pages = stale_pages + 1 if page and not in_window else 0
+            if stale_pages >= stop_pages:
+                self.logger.debug("Stopped listing after %d pages before %s", stale_pages, start_date)
+                return
 
             request = self.service.mediaItems().list_next(request, response)
 
-        return media_items
-
-    def fetch_media_items(self, days_back: int) -> list[dict]:
-        """Fetch media items from Google Photos API within a specified date range.
+    def fetch_media_items_all(self, days_back: int) -> list[MediaRecord]:
+        """Fetch all media items from Google Photos API.
 
         :param days_back: Number of days back to fetch media items.
-        :return: List of media items from Google Photos API.
+        :return: List of media records.
         """
-        media_items: list[Any] = []
+        return list(self.iter_media_items_all(days_back))
 
-        end: datetime.datetime = datetime.datetime.now(datetime.UTC)
-        start: datetime.datetime = end - datetime.timedelta(days=days_back)
+    def iter_media_items(self, days_back: int) -> Iterator[MediaRecord]:
+        """Iterate over media items from Google Photos API within a specified date range, page by page.
 
+        Items are yielded as soon as their page arrives, so consumers can start working before pagination ends.
+        When `shards` is above 1 and the window spans several shards, the shards are fetched concurrently and
+        merged newest first, de-duplicated by media item ID.
+
+        :param days_back: Number of days back to fetch media items.
+        :return: Iterator over media records.
+        """
+        end: datetime.date = datetime.datetime.now(datetime.UTC).date()
+        start: datetime.date = end - datetime.timedelta(days=days_back)
+
+        service: Any = self.service
+        total: int = 0
+        if self.shards > 1 and days_back >= self.shard_days:
+            for item in self._iter_sharded(service, start, end):
+                total += 1
+                yield item
+        else:
+            for page in self._iter_pages(service, start, end):
+                total += len(page)
+                yield from page
+
+        self.logger.info("Total media items fetched: %d", total)
+
+    def _iter_sharded(self, service: Any, start: datetime.date, end: datetime.date) -> Iterator[MediaRecord]:
+        """Fetch the date shards of a window concurrently and merge them in order.
+
+        At most `shards` shards are fetched at once; each shard is yielded as soon as it and all newer shards
+        are complete.
+
+        :param service: Google Photos API service, built before the workers start.
+        :param start: First day of the window (inclusive).
+        :param end: Last day of the window (inclusive).
+        :return: Iterator over unique media records, newest shard first.
+        """
+        ranges: list[tuple[datetime.date, datetime.date]] = []
+        shard_end: datetime.date = end
+        while shard_end >= start:
+            shard_start: datetime.date = max(start, shard_end - datetime.timedelta(days=self.shard_days - 1))
+            ranges.append((shard_start, shard_end))
+            shard_end = shard_start - datetime.timedelta(days=1)
+        self.logger.debug("Fetching %d date shards with %d workers", len(ranges), self.shards)
+
+        seen: set[str] = set()
+        pending: deque[Future[list[MediaRecord]]] = deque()
+        with ThreadPoolExecutor(max_workers=self.shards, thread_name_prefix="gphotos") as executor:
+            for shard_start, shard_end in ranges:
+                if len(pending) >= self.shards:
+                    yield from self._unique(pending.popleft().result(), seen)
+                pending.append(executor.submit(self._fetch_shard, service, shard_start, shard_end))
+            while pending:
+                yield from self._unique(pending.popleft().result(), seen)
+
+    @staticmethod
+    def _unique(records: Iterable[MediaRecord], seen: set[str]) -> Iterator[MediaRecord]:
+        """Yield the records whose ID was not seen yet.
+
+        :param records: Media records of one shard.
+        :param seen: IDs of the records already yielded, updated in place.
+        :return: Iterator over the new records.
+        """
+        for record in records:
+            if record.id not in seen:
+                seen.add(record.id)
+                yield record
+
+    def _fetch_shard(self, service: Any, start: datetime.date, end: datetime.date) -> list[MediaRecord]:
+        """Fetch all media items of one date shard on the calling worker thread's own connection.
+
+        :param service: Google Photos API service.
+        :param start: First day of the shard (inclusive).
+        :param end: Last day of the shard (inclusive).
+        :return: Media records of the shard.
+        """
+        return [item for page in self._iter_pages(service, start, end, self._thread_http()) for item in page]
+
+    def _iter_pages(
+        self,
+        service: Any,
+        start: datetime.date,
+        end: datetime.date,
+        http: google_auth_httplib2.AuthorizedHttp | None = None,
+    ) -> Iterator[list[MediaRecord]]:
+        """Walk the result pages of one `dateFilter` range.
+
+        :param service: Google Photos API service.
+        :param start: First day of the range (inclusive).
+        :param end: Last day of the range (inclusive).
+        :param http: HTTP transport to execute the requests on, defaults to the service's own.
+        :return: Iterator over pages of media records.
+        """
         request_body: dict[str, Any] = {
             "pageSize": 100,
             "filters": {
@@ -158,30 +411,102 @@ class GooglePhotosClient:
             },
         }
 
-        self.logger.debug("Requesting media items from %s to %s", start.date(), end.date())
+        self.logger.debug("Requesting media items from %s to %s", start, end)
 
-        request = self.service.mediaItems().search(body=request_body)
+        request = service.mediaItems().search(body=request_body)
         while request is not None:
-            response = request.execute()
-            collect_items = response.get("mediaItems", [])
-            self.logger.debug("Fetched %d items in this page", len(collect_items))
-            media_items.extend(collect_items)
-            request = self.service.mediaItems().search_next(request, response)
-
-        self.logger.info("Total media items fetched: %d", len(media_items))
-        return media_items
-
-    def extract_metadata(self, media_item: dict) -> dict[str, str | None]:
-        """Extract metadata from a media item.
-
-        :param media_item: A media item dictionary from Google Photos API.
-        :return: A dictionary containing the extracted metadata.
-        """
-        metadata: dict[str, Any] = {
-            "id": media_item.get("id"),
-            "filename": media_item.get("filename"),
-            "description": media_item.get("description"),
-            "creationTime": media_item.get("mediaMetadata", {}).get("creationTime"),
-        }
-        self.logger.debug("Extracted metadata: %s", metadata)
-        return metadata
+            response = self._execute(request, "POST", "/v1/mediaItems:search", http)
+            records: list[MediaRecord] = [parse_media_item(item) for item in response.get("mediaItems", [])]
+            self.logger.debug("Fetched %d items in this page", len(records))
+            yield records
+            request = service.mediaItems().search_next(request, response)
+
+    @staticmethod
+    def _execute(
+        request: Any, method: str, endpoint: str, http: google_auth_httplib2.AuthorizedHttp | None = None
+    ) -> dict[str, Any]:
+        """Execute one page request and record its latency, size and status in the metrics.
+
+        :param request: Google API request object.
+        :param method: HTTP method, used as a metric label.
+        :param endpoint: API path, used as a metric label.
+        :param http: HTTP transport to execute the request on, defaults to the service's own.
+        :return: Parsed response.
+        """
+        received: list[int] = []
+        postproc: Any = request.postproc
+
+        def measure(resp: Any, content: bytes) -> Any:
+            """Record the size of the raw response body before it is decoded."""
+            received.append(len(content or b""))
+            return postproc(resp, content)
+
+        request.postproc = measure
+        status: str = "error"
+        HTTP_REQUESTS_IN_FLIGHT.inc(service="google")
+        started: float = time.perf_counter()
+        try:
+            response: dict[str, Any] = request.execute(http=http)
+            status = "200"
+        except HttpError as e:
+            status = str(e.resp.status)
+            raise
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(service="google")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, service="google", method=method, endpoint=endpoint, status=status
+            )
+        body: str | bytes = request.body or b""
+        HTTP_BYTES.inc(len(body.encode() if isinstance(body, str) else body), service="google", direction="sent")
+        HTTP_BYTES.inc(sum(received), service="google", direction="received")
+        SOURCE_PAGES.inc(source="google")
+        return response
+
+    def _thread_http(self) -> google_auth_httplib2.AuthorizedHttp:
+        """Return the authorized HTTP transport of the calling thread.
+
+        `httplib2.Http` is not thread-safe, so every shard worker gets its own connection.
+
+        :return: Per-thread authorized HTTP object.
+        """
+        http: google_auth_httplib2.AuthorizedHttp | None = getattr(self._local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def iter_albums(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the user's albums with the metadata of their media items.
+
+        :return: Iterator over albums as {"id", "title", "items"} dictionaries with media records as items.
+        """
+        service: Any = self.service
+        request = service.albums().list(pageSize=50)
+        while request is not None:
+            response = self._execute(request, "GET", "/v1/albums")
+            for album in response.get("albums", []):
+                pages: Iterator[list[MediaRecord]] = self._iter_album_pages(service, album["id"])
+                items: list[MediaRecord] = [record for page in pages for record in page]
+                yield {"id": album["id"], "title": album.get("title") or "", "items": items}
+            request = service.albums().list_next(request, response)
+
+    def _iter_album_pages(self, service: Any, album_id: str) -> Iterator[list[MediaRecord]]:
+        """Walk the result pages of the media items in an album.
+
+        :param service: Google Photos API service.
+        :param album_id: Google Photos album ID.
+        :return: Iterator over pages of media records.
+        """
+        request = service.mediaItems().search(body={"albumId": album_id, "pageSize": 100})
+        while request is not None:
+            response = self._execute(request, "POST", "/v1/mediaItems:search")
+            yield [parse_media_item(item) for item in response.get("mediaItems", [])]
+            request = service.mediaItems().search_next(request, response)
+
+    def fetch_media_items(self, days_back: int) -> list[MediaRecord]:
+        """Fetch media items from Google Photos API within a specified date range.
+
+        :param days_back: Number of days back to fetch media items.
+        :return: List of media records.
+        """
+        return list(self.iter_media_items(days_back))
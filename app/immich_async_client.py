@@ -0,0 +1,240 @@
+"""Asyncio Immich Client for Python"""
+
+import asyncio
+import importlib.util
+import time
+from logging import Logger
+from typing import Any
+
+from app import codec
+from app.constants import HTTP_NO_CONTENT, HTTP_OK, RETRY_STATUS_CODES
+from app.immich_client import endpoint_label
+from app.log import get_logger
+from app.metrics import HTTP_BYTES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+from app.rate_limiter import AdaptiveRateLimiter
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None  # type: ignore[assignment]
+
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
+
+
+class AsyncImmichClient:
+    """Asyncio client for interacting with the Immich API over a multiplexed HTTP/2 connection."""
+
+    base_url: str
+    logger: Logger
+    client: "httpx.AsyncClient"
+    max_retries: int
+    retry_backoff: float
+    rate_limiter: AdaptiveRateLimiter | None
+
+    def __init__(  # noqa: PLR0913
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        max_connections: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        http2: bool = True,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+    ) -> None:
+        """Initialize the async Immich client.
+
+        :param base_url: Base URL of the Immich server (e.g., "https://immich.example.com").
+        :param api_key: API key for authentication with the Immich server.
+        :param max_connections: Maximum number of connections; with HTTP/2 requests are multiplexed on them.
+        :param connect_timeout: Timeout in seconds for establishing a connection.
+        :param read_timeout: Timeout in seconds for reading a response.
+        :param max_retries: Number of retries for connection errors and 429/5xx responses.
+        :param retry_backoff: Backoff factor in seconds between retries (exponential).
+        :param http2: Negotiate HTTP/2 when the `h2` package is installed.
+        :param rate_limiter: Optional adaptive rate limiter shared by all requests; it then paces retries.
+        :param transport: Optional custom transport (used for testing).
+        """
+        if httpx is None:
+            raise RuntimeError("The async Immich client requires the 'httpx' package: pip install 'httpx[http2]'")
+
+        self.logger = get_logger(self.__class__.__name__)
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rate_limiter = rate_limiter
+        if http2 and not HTTP2_AVAILABLE:
+            self.logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+            http2 = False
+
+        self.client = httpx.AsyncClient(
+            headers={"x-api-key": api_key, "Content-Type": "application/json"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            http2=http2,
+            transport=transport,
+        )
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send a request, retrying connection errors and 429/5xx responses with exponential backoff.
+
+        When a rate limiter is configured, every attempt is paced by it and reports its outcome to it.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param kwargs: Additional arguments passed to `httpx.AsyncClient.request`.
+        :return: The HTTP response.
+        """
+        attempt: int = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            started: float = time.monotonic()
+            try:
+                response: httpx.Response = await self._send(method, url, **kwargs)
+            except httpx.TransportError:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_error()
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_response(
+                        response.status_code, time.monotonic() - started, response.headers.get("Retry-After")
+                    )
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+            await asyncio.sleep(self.retry_backoff * 2**attempt)
+            attempt += 1
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> "httpx.Response":
+        """Send one request and record its latency, size and status in the metrics.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param kwargs: Additional arguments passed to `httpx.AsyncClient.request`.
+        :return: The HTTP response.
+        """
+        endpoint: str = endpoint_label(self.base_url, url)
+        status: str = "error"
+        HTTP_REQUESTS_IN_FLIGHT.inc(service="immich")
+        started: float = time.perf_counter()
+        try:
+            response: httpx.Response = await self.client.request(method, url, **kwargs)
+            status = str(response.status_code)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(service="immich")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, service="immich", method=method, endpoint=endpoint, status=status
+            )
+        HTTP_BYTES.inc(len(response.request.content), service="immich", direction="sent")
+        HTTP_BYTES.inc(len(response.content), service="immich", direction="received")
+        return response
+
+    async def find_asset_by_filename(self, filename: str) -> str | None:
+        """Find an asset by its filename.
+
+        :param filename: The filename of the asset to search for.
+        :return: The asset ID if found, otherwise None.
+        """
+        asset: dict[str, Any] | None = await self.search_asset_by_filename(filename)
+        return asset["id"] if asset else None
+
+    async def search_asset_by_filename(self, filename: str, with_exif: bool = False) -> dict[str, Any] | None:
+        """Search for an asset by its filename and return the first match.
+
+        :param filename: The filename of the asset to search for.
+        :param with_exif: Include EXIF info (e.g. the current description) in the result.
+        :return: The asset dictionary as returned by the Immich API if found, otherwise None.
+        """
+        url: str = f"{self.base_url}/search/metadata"
+        payload: dict[str, Any] = {"originalFileName": filename}
+        if with_exif:
+            payload["withExif"] = True
+        self.logger.debug("Searching for asset by filename: %s", filename)
+
+        response: httpx.Response = await self._request("POST", url, json=payload)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.logger.error("Immich search failed: %s", e)
+            return None
+
+        assets: Any = codec.loads(response.content).get("assets", {}).get("items", [])
+        if assets:
+            asset: dict[str, Any] = assets[0]
+            self.logger.debug("Found asset ID: %s", asset["id"])
+            return asset
+
+        self.logger.debug("No matching asset found for filename: %s", filename)
+        return None
+
+    async def update_asset_description(self, asset_id: str, description: str) -> bool:
+        """Update the description of an asset.
+
+        :param asset_id: The ID of the asset to update.
+        :param description: The new description for the asset.
+        :return: True if the update was successful, otherwise False.
+        """
+        return await self.update_asset(asset_id, {"description": description})
+
+    async def update_asset(self, asset_id: str, fields: dict[str, Any]) -> bool:
+        """Update several metadata fields of an asset in one request.
+
+        :param asset_id: The ID of the asset to update.
+        :param fields: Asset fields to set, e.g. {"description": "...", "dateTimeOriginal": "...", "latitude": 1.0}.
+        :return: True if the update was successful, otherwise False.
+        """
+        url: str = f"{self.base_url}/assets/{asset_id}"
+        self.logger.debug("Updating %s for asset %s", ", ".join(fields), asset_id)
+        response: httpx.Response = await self._request("PUT", url, json=fields)
+        if response.status_code == HTTP_OK:
+            self.logger.debug("Successfully updated asset %s", asset_id)
+            return True
+
+        self.logger.error("Failed to update asset %s: HTTP %d", asset_id, response.status_code)
+        return False
+
+    async def update_assets(self, asset_ids: list[str], fields: dict[str, Any]) -> bool:
+        """Set the same fields on many assets in one bulk request.
+
+        :param asset_ids: The IDs of the assets to update.
+        :param fields: Asset fields accepted by the bulk update, e.g. {"isFavorite": True}.
+        :return: True if the update was successful, otherwise False.
+        """
+        url: str = f"{self.base_url}/assets"
+        self.logger.debug("Updating %s for %d assets", ", ".join(fields), len(asset_ids))
+        response: httpx.Response = await self._request("PUT", url, json={"ids": asset_ids, **fields})
+        if response.status_code in (HTTP_OK, HTTP_NO_CONTENT):
+            self.logger.debug("Successfully updated %d assets", len(asset_ids))
+            return True
+
+        self.logger.error("Failed to update %d assets: HTTP %d", len(asset_ids), response.status_code)
+        return False
+
+    async def get_asset_description(self, asset_id: str) -> str:
+        """Get the description of an asset.
+
+        :param asset_id: The ID of the asset to retrieve the description for.
+        :return: The description of the asset, or an empty string if not found.
+        """
+        url: str = f"{self.base_url}/assets/{asset_id}"
+        self.logger.debug("Fetching asset description for ID: %s", asset_id)
+
+        response: httpx.Response = await self._request("GET", url)
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            self.logger.error("Failed to retrieve asset description: %s", e)
+            return ""
+
+        description: str = codec.loads(response.content).get("exifInfo", {}).get("description") or ""
+        self.logger.debug("Retrieved description for asset %s - %s", asset_id, description)
+        return description
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and its connections."""
+        await self.client.aclose()
@@ -1,12 +1,32 @@
 """Immich Client for Python"""
 
+import re
+import time
+from collections.abc import Iterator
 from logging import Logger
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from app.constants import HTTP_OK
+from app import codec
+from app.constants import HTTP_NO_CONTENT, HTTP_OK, RETRY_STATUS_CODES
 from app.log import get_logger
+from app.metrics import HTTP_BYTES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+from app.rate_limiter import THROTTLE_STATUS_CODES, AdaptiveRateLimiter
+
+ASSET_PATH_PATTERN: re.Pattern[str] = re.compile(r"^/(assets?|albums)/[^/]+")
+
+
+def endpoint_label(base_url: str, url: str) -> str:
+    """Derive a low-cardinality endpoint label for metrics from a request URL.
+
+    :param base_url: Base URL of the Immich API.
+    :param url: Full request URL.
+    :return: Path relative to the base URL with asset and album IDs replaced, e.g. "/assets/{id}".
+    """
+    return ASSET_PATH_PATTERN.sub(r"/\1/{id}", url.removeprefix(base_url).split("?", 1)[0])
 
 
 class ImmichClient:
@@ -15,16 +35,138 @@ class ImmichClient:
     base_url: str
     headers: dict[str, str]
     logger: Logger
+    session: requests.Session
+    timeout: tuple[float, float]
+    max_retries: int
+    retry_backoff: float
+    rate_limiter: AdaptiveRateLimiter | None
 
-    def __init__(self, base_url: str, api_key: str) -> None:
+    def __init__(  # noqa: PLR0913
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+    ) -> None:
         """Initialize the Immich client.
 
         :param base_url: Base URL of the Immich server (e.g., "https://immich.example.com").
         :param api_key: API key for authentication with the Immich server.
+        :param pool_size: Maximum number of keep-alive connections kept open to the Immich server.
+        :param connect_timeout: Timeout in seconds for establishing a connection.
+        :param read_timeout: Timeout in seconds for reading a response.
+        :param max_retries: Number of retries for connection errors and 429/5xx responses.
+        :param retry_backoff: Backoff factor in seconds between retries (exponential).
+        :param rate_limiter: Optional adaptive rate limiter shared by all requests; every attempt, retries included,
+            is then paced by it and reported to it.
         """
         self.logger = get_logger(self.__class__.__name__)
         self.base_url = base_url.rstrip("/")
         self.headers = {"x-api-key": api_key, "Content-Type": "application/json"}
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.rate_limiter = rate_limiter
+        self.session = self._create_session(pool_size, max_retries, retry_backoff)
+        self.single_session = self._create_session(1, 0, retry_backoff)  # non-idempotent requests, never resent
+
+    def _create_session(self, pool_size: int, max_retries: int, retry_backoff: float) -> requests.Session:
+        """Create a pooled keep-alive HTTP session with retry/backoff.
+
+        With a rate limiter, the session does not retry: `_request` retries instead, so every attempt is paced by
+        the limiter and reported to it.
+
+        :param pool_size: Maximum number of connections kept in the pool.
+        :param max_retries: Number of retries for connection errors and retryable status codes.
+        :param retry_backoff: Backoff factor in seconds between retries.
+        :return: Configured requests session.
+        """
+        retry: Retry = Retry(
+            total=max_retries if self.rate_limiter is None else 0,
+            backoff_factor=retry_backoff,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "POST", "PUT"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session: requests.Session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _request(self, method: str, url: str, *, retry: bool = True, **kwargs: Any) -> requests.Response:
+        """Send a request through the pooled session, paced by the rate limiter when configured.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param retry: Retry connection errors and 429/5xx responses; disable for requests that must not be sent
+            twice (a timed-out request may still have been processed by the server).
+        :param kwargs: Additional arguments passed to `requests.Session.request`.
+        :return: The HTTP response.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if self.rate_limiter is None:
+            return self._send(method, url, self.session if retry else self.single_session, **kwargs)
+
+        retries: int = self.max_retries if retry else 0
+        attempt: int = 0
+        while True:
+            self.rate_limiter.acquire()
+            started: float = time.monotonic()
+            try:
+                response: requests.Response = self._send(method, url, self.session, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self.rate_limiter.on_error()
+                if attempt >= retries:
+                    raise
+            else:
+                self.rate_limiter.on_response(
+                    response.status_code, time.monotonic() - started, response.headers.get("Retry-After")
+                )
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                    return response
+                if response.status_code in THROTTLE_STATUS_CODES:
+                    attempt += 1
+                    continue  # the limiter already holds the next request back (Retry-After, lower rate)
+            time.sleep(self.retry_backoff * 2**attempt)
+            attempt += 1
+
+    def _send(self, method: str, url: str, session: requests.Session, **kwargs: Any) -> requests.Response:
+        """Send one request through a pooled session and record its latency, size and status in the metrics.
+
+        :param method: HTTP method.
+        :param url: Full request URL.
+        :param session: The session to send the request through.
+        :param kwargs: Additional arguments passed to `requests.Session.request`.
+        :return: The HTTP response.
+        """
+        endpoint: str = endpoint_label(self.base_url, url)
+        status: str = "error"
+        HTTP_REQUESTS_IN_FLIGHT.inc(service="immich")
+        started: float = time.perf_counter()
+        try:
+            response: requests.Response = session.request(method, url, **kwargs)
+            status = str(response.status_code)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(service="immich")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, service="immich", method=method, endpoint=endpoint, status=status
+            )
+        HTTP_BYTES.inc(len(response.request.body or b""), service="immich", direction="sent")
+        HTTP_BYTES.inc(len(response.content), service="immich", direction="received")
+        return response
+
+    def close(self) -> None:
+        """Close the pooled HTTP sessions and release their connections."""
+        self.session.close()
+        self.single_session.close()
 
     def find_asset_by_filename(self, filename: str) -> str | None:
         """Find an asset by its filename.
@@ -32,36 +174,78 @@ class ImmichClient:
         :param filename: The filename of the asset to search for.
         :return: The asset ID if found, otherwise None.
         """
+        asset: dict[str, Any] | None = self.search_asset_by_filename(filename)
+        return asset["id"] if asset else None
+
+    def search_asset_by_filename(self, filename: str, with_exif: bool = False) -> dict[str, Any] | None:
+        """Search for an asset by its filename and return the first match.
+
+        :param filename: The filename of the asset to search for.
+        :param with_exif: Include EXIF info (e.g. the current description) in the result.
+        :return: The asset dictionary as returned by the Immich API if found, otherwise None.
+        """
         url: str = f"{self.base_url}/search/metadata"
-        payload: dict[str, str] = {"originalFileName": filename}
+        payload: dict[str, Any] = {"originalFileName": filename}
+        if with_exif:
+            payload["withExif"] = True
         self.logger.debug("Searching for asset by filename: %s", filename)
 
-        response: requests.Response = requests.post(url, headers=self.headers, json=payload)
+        response: requests.Response = self._request("POST", url, json=payload)
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             self.logger.error("Immich search failed: %s", e)
             return None
 
-        data: Any = response.json()
+        data: Any = codec.loads(response.content)
         assets: Any = data.get("assets", {}).get("items", [])
         if assets:
-            asset_id: str = assets[0]["id"]
-            self.logger.debug("Found asset ID: %s", asset_id)
-            return asset_id
+            asset: dict[str, Any] = assets[0]
+            self.logger.debug("Found asset ID: %s", asset["id"])
+            return asset
 
         self.logger.debug("No matching asset found for filename: %s", filename)
         return None
 
+    def iter_assets(self, page_size: int = 1000, **filters: Any) -> Iterator[dict[str, Any]]:
+        """Iterate over all assets matching the given filters, page by page.
+
+        :param page_size: Number of assets requested per page.
+        :param filters: Additional `/search/metadata` filters (e.g. `takenAfter`).
+        :return: Iterator over asset dictionaries as returned by the Immich API.
+        """
+        url: str = f"{self.base_url}/search/metadata"
+        page: int | None = 1
+        while page is not None:
+            payload: dict[str, Any] = {**filters, "page": page, "size": page_size}
+            self.logger.debug("Fetching asset page %d", page)
+            response: requests.Response = self._request("POST", url, json=payload)
+            response.raise_for_status()
+
+            assets: Any = codec.loads(response.content).get("assets", {})
+            yield from assets.get("items", [])
+            next_page: Any = assets.get("nextPage")
+            page = int(next_page) if next_page else None
+
     def update_asset_description(self, asset_id: str, description: str) -> bool:
         """Update the description of an asset.
 
         :param asset_id: The ID of the asset to update.
         :param description: The new description for the asset.
+        :return: True if the update was successful, otherwise False.
+        """
+        return self.update_asset(asset_id, {"description": description})
+
+    def update_asset(self, asset_id: str, fields: dict[str, Any]) -> bool:
+        """Update several metadata fields of an asset in one request.
+
+        :param asset_id: The ID of the asset to update.
+        :param fields: Asset fields to set, e.g. {"description": "...", "dateTimeOriginal": "...", "latitude": 1.0}.
+        :return: True if the update was successful, otherwise False.
         """
-        url: str = f"{self.base_url}/asset/{asset_id}"
-        self.logger.debug("Updating description for asset %s", asset_id)
-        response: requests.Response = requests.put(url, headers=self.headers, json={"description": description})
+        url: str = f"{self.base_url}/assets/{asset_id}"
+        self.logger.debug("Updating %s for asset %s", ", ".join(fields), asset_id)
+        response: requests.Response = self._request("PUT", url, json=fields)
         if response.status_code == HTTP_OK:
             self.logger.debug("Successfully updated asset %s", asset_id)
             return True
@@ -69,6 +253,23 @@ class ImmichClient:
         self.logger.error("Failed to update asset %s: HTTP %d", asset_id, response.status_code)
         return False
 
+    def update_assets(self, asset_ids: list[str], fields: dict[str, Any]) -> bool:
+        """Set the same fields on many assets in one bulk request.
+
+        :param asset_ids: The IDs of the assets to update.
+        :param fields: Asset fields accepted by the bulk update, e.g. {"isFavorite": True}.
+        :return: True if the update was successful, otherwise False.
+        """
+        url: str = f"{self.base_url}/assets"
+        self.logger.debug("Updating %s for %d assets", ", ".join(fields), len(asset_ids))
+        response: requests.Response = self._request("PUT", url, json={"ids": asset_ids, **fields})
+        if response.status_code in (HTTP_OK, HTTP_NO_CONTENT):
+            self.logger.debug("Successfully updated %d assets", len(asset_ids))
+            return True
+
+        self.logger.error("Failed to update %d assets: HTTP %d", len(asset_ids), response.status_code)
+        return False
+
     def get_asset_description(self, asset_id: str) -> str:
         """Get the description of an asset.
 
@@ -78,13 +279,105 @@ class ImmichClient:
         url: str = f"{self.base_url}/assets/{asset_id}"
         self.logger.debug("Fetching asset description for ID: %s", asset_id)
 
-        response: requests.Response = requests.get(url, headers=self.headers)
+        response: requests.Response = self._request("GET", url)
         try:
             response.raise_for_status()
         except requests.HTTPError as e:
             self.logger.error("Failed to retrieve asset description: %s", e)
             return ""
 
-        description: str = response.json().get("exifInfo", {}).get("description") or ""
+        description: str = codec.loads(response.content).get("exifInfo", {}).get("description") or ""
         self.logger.debug("Retrieved description for asset %s - %s", asset_id, description)
         return description
+
+    def list_albums(self) -> list[dict[str, Any]]:
+        """List all albums of the user.
+
+        :return: Album dictionaries as returned by the Immich API (without their assets).
+        """
+        url: str = f"{self.base_url}/albums"
+        self.logger.debug("Listing albums")
+        response: requests.Response = self._request("GET", url)
+        response.raise_for_status()
+        albums: list[dict[str, Any]] = codec.loads(response.content)
+        return albums
+
+    def get_album_asset_ids(self, album_id: str) -> set[str]:
+        """Get the IDs of the assets in an album.
+
+        :param album_id: The ID of the album.
+        :return: Set of asset IDs in the album.
+        """
+        url: str = f"{self.base_url}/albums/{album_id}"
+        self.logger.debug("Fetching assets of album %s", album_id)
+        response: requests.Response = self._request("GET", url)
+        response.raise_for_status()
+        return {asset["id"] for asset in codec.loads(response.content).get("assets", [])}
+
+    def create_album(self, name: str, description: str = "") -> str | None:
+        """Create an empty album.
+
+        Creating an album is not idempotent, so the request is never resent as is: after a connection error or a
+        429/5xx response the albums are listed again and an album the failed request did create is returned.
+
+        :param name: Name of the album.
+        :param description: Description of the album.
+        :return: The ID of the created album, or None if the request failed.
+        """
+        url: str = f"{self.base_url}/albums"
+        self.logger.debug("Creating album %s", name)
+        attempt: int = 0
+        while True:
+            try:
+                response: requests.Response = self._request(
+                    "POST", url, retry=False, json={"albumName": name, "description": description}
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    break
+            time.sleep(self.retry_backoff * 2**attempt)
+            attempt += 1
+            album_id: str | None = self._find_album(name)
+            if album_id is not None:
+                self.logger.debug("Album %s was created by the failed request", name)
+                return album_id
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            self.logger.error("Failed to create album %s: %s", name, e)
+            return None
+        created_id: str = codec.loads(response.content)["id"]
+        return created_id
+
+    def _find_album(self, name: str) -> str | None:
+        """Find an album by name.
+
+        :param name: Name of the album.
+        :return: The ID of the first album with this name, or None if there is none.
+        """
+        return next((album["id"] for album in self.list_albums() if album.get("albumName") == name), None)
+
+    def add_assets_to_album(self, album_id: str, asset_ids: list[str], batch_size: int = 500) -> int:
+        """Add assets to an album with the bulk endpoint, `batch_size` assets per request.
+
+        :param album_id: The ID of the album.
+        :param asset_ids: IDs of the assets to add.
+        :param batch_size: Maximum number of asset IDs sent in one request.
+        :return: Number of assets added (assets already in the album are not counted).
+        """
+        url: str = f"{self.base_url}/albums/{album_id}/assets"
+        added: int = 0
+        for start in range(0, len(asset_ids), batch_size):
+            batch: list[str] = asset_ids[start : start + batch_size]
+            self.logger.debug("Adding %d assets to album %s", len(batch), album_id)
+            response: requests.Response = self._request("PUT", url, json={"ids": batch})
+            try:
+                response.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                self.logger.error("Failed to add %d assets to album %s: %s", len(batch), album_id, e)
+                continue
+            added += sum(1 for result in codec.loads(response.content) if result.get("success"))
+        return added
@@ -0,0 +1,131 @@
+"""Append-only journal of descriptions pushed to Immich, used to resume and skip unchanged items."""
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+from logging import Logger
+from typing import TextIO
+
+from app.log import get_logger
+
+RESULT_UPDATED: str = "updated"
+RESULT_SKIPPED: str = "skipped"
+RESULT_FAILED: str = "failed"
+RESULT_NOT_FOUND: str = "not_found"
+DONE_RESULTS: frozenset[str] = frozenset({RESULT_UPDATED, RESULT_SKIPPED})
+
+
+def content_hash(description: str) -> str:
+    """Compute the content hash of a description.
+
+    :param description: The description text.
+    :return: Hex-encoded SHA-256 of the description.
+    """
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+class SyncJournal:
+    """Append-only JSON-lines journal recording, per source item, the description hash and sync result."""
+
+    path: str
+    done: dict[str, str]
+    hits: int
+    logger: Logger
+    _file: TextIO
+    _lock: threading.Lock
+
+    def __init__(self, path: str) -> None:
+        """Open the journal, replaying existing entries.
+
+        :param path: Path to the journal file.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.path = path
+        self.done = {}
+        self.hits = 0
+        self._lock = threading.Lock()
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        lines: int = self._replay()
+        if lines > 2 * len(self.done) + 1000:
+            self._compact()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self) -> int:
+        """Load the last successful hash per item from the journal file.
+
+        :return: Number of lines read.
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        lines: int = 0
+        with open(self.path, encoding="utf-8") as journal_file:
+            for line in journal_file:
+                lines += 1
+                try:
+                    entry: dict[str, str] = json.loads(line)
+                except ValueError:
+                    self.logger.warning("Ignoring corrupt journal line %d in %s", lines, self.path)
+                    continue
+                if entry.get("result") in DONE_RESULTS:
+                    self.done[entry["id"]] = entry["hash"]
+                else:
+                    self.done.pop(entry["id"], None)
+        self.logger.debug("Replayed %d journal lines (%d items done) from %s", lines, len(self.done), self.path)
+        return lines
+
+    def _compact(self) -> None:
+        """Rewrite the journal keeping only the latest successful entry per item."""
+        temporary_path: str = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as journal_file:
+            for item_id, description_hash in self.done.items():
+                journal_file.write(json.dumps({"id": item_id, "hash": description_hash, "result": RESULT_UPDATED}))
+                journal_file.write("\n")
+        os.replace(temporary_path, self.path)
+        self.logger.info("Compacted journal %s to %d entries", self.path, len(self.done))
+
+    def is_unchanged(self, item_id: str, description: str) -> bool:
+        """Check whether the description was already pushed successfully for the item.
+
+        :param item_id: Source item ID.
+        :param description: The description about to be synchronized.
+        :return: True if the same description was already pushed, False otherwise.
+        """
+        with self._lock:
+            unchanged: bool = self.done.get(item_id) == content_hash(description)
+            if unchanged:
+                self.hits += 1
+            return unchanged
+
+    def record(self, item_id: str, description: str, result: str) -> None:
+        """Append the result of syncing an item to the journal.
+
+        :param item_id: Source item ID.
+        :param description: The description that was synchronized.
+        :param result: One of the `RESULT_*` constants.
+        """
+        description_hash: str = content_hash(description)
+        entry: str = json.dumps(
+            {
+                "id": item_id,
+                "hash": description_hash,
+                "result": result,
+                "time": datetime.datetime.now(datetime.UTC).isoformat(),
+            }
+        )
+        with self._lock:
+            self._file.write(entry + "\n")
+            self._file.flush()
+            if result in DONE_RESULTS:
+                self.done[item_id] = description_hash
+            else:
+                self.done.pop(item_id, None)
+
+    def close(self) -> None:
+        """Close the journal file."""
+        self._file.close()
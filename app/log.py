@@ -1,38 +1,190 @@
-"""Logging wrapper for Google Photos 2 Immich."""
+"""Logging wrapper for Google Photos 2 Immich.
 
+Records are handed to a background thread through a queue, so formatting and writing to stdout stay off the
+sync's hot path. `LOG_FORMAT=json` switches the output to JSON lines.
+"""
+
+import atexit
+import json
 import logging
 import os
+import queue
 import sys
-from datetime import UTC, datetime, timezone
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+IMMUTABLE_ARG_TYPES: tuple[type, ...] = (str, int, float, type(None))  # log arguments safe to format later
+
+
+class TimestampCache:
+    """Formats record timestamps as local ISO 8601, rebuilding the date/time part only once per second."""
+
+    _second: int
+    _prefix: str
+    _offset: str
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._second = -1
+        self._prefix = ""
+        self._offset = ""
+        self._lock = threading.Lock()
+
+    def format(self, created: float) -> str:
+        """Format a record creation time.
+
+        :param created: Record creation time as returned by `time.time()`.
+        :return: Timestamp such as "2025-04-20T12:00:00.123+0200".
+        """
+        second: int = int(created)
+        with self._lock:
+            if second != self._second:
+                local: time.struct_time = time.localtime(second)
+                self._prefix = time.strftime("%Y-%m-%dT%H:%M:%S.", local)
+                self._offset = time.strftime("%z", local)
+                self._second = second
+            prefix, offset = self._prefix, self._offset
+        return f"{prefix}{int((created - second) * 1000):03d}{offset}"
 
 
 class FixedWidthFormatter(logging.Formatter):
     """Formatter that formats log messages with fixed-width fields."""
 
-    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str: # noqa: N802
+    timestamps: TimestampCache
+
+    def __init__(self, fmt: str | None = None) -> None:
+        """Initialize the formatter.
+
+        :param fmt: Log format string.
+        """
+        super().__init__(fmt)
+        self.timestamps = TimestampCache()
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:  # noqa: N802
         """Format the time of the log record.
 
         :param record: The log record to format.
-        :param datefmt: Optional date format string. If None, the default format is used.
+        :param datefmt: Ignored; timestamps are always local ISO 8601 with milliseconds.
         :return: The formatted time string.
         """
-        dt: datetime = datetime.fromtimestamp(record.created, tz=UTC).astimezone()
-        return dt.strftime("%Y-%m-%dT%H:%M:%S.") + f"{int(record.msecs):03d}" + dt.strftime("%z")
+        return self.timestamps.format(record.created)
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatter that renders each record as one JSON object per line."""
+
+    timestamps: TimestampCache
+
+    def __init__(self) -> None:
+        """Initialize the formatter."""
+        super().__init__()
+        self.timestamps = TimestampCache()
 
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record.
 
         :param record: The log record to format.
-        :return: The formatted log message.
+        :return: The record as a JSON object.
         """
-        record.levelname = f"{record.levelname:<8}"  # Pad level name to 8 chars
-        return super().format(record)
+        entry: dict[str, object] = {
+            "time": self.timestamps.format(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "function": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves message formatting to the listener thread.
+
+    The stock handler merges the arguments into the message before enqueueing; here the record is passed as is,
+    which is safe because the queue never leaves the process. Arguments that may change once the caller continues
+    (anything but strings, numbers and None) are merged eagerly, and so is the exception text.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare a record for queuing.
+
+        :param record: The log record.
+        :return: The same record, with mutable arguments merged and the exception text rendered.
+        """
+        if record.args and not (
+            isinstance(record.args, tuple) and all(isinstance(arg, IMMUTABLE_ARG_TYPES) for arg in record.args)
+        ):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        return record
+
+
+def create_formatter(log_format: str = LOG_FORMAT) -> logging.Formatter:
+    """Create the formatter for the configured output format.
+
+    :param log_format: "json" for JSON lines, anything else for fixed-width text.
+    :return: A formatter instance.
+    """
+    if log_format == "json":
+        return JsonFormatter()
+    return FixedWidthFormatter("%(asctime)s - %(levelname)-8s (%(name)s.%(funcName)s:%(lineno)d) - %(message)s")
+
+
+_queue_handler: DeferredQueueHandler = DeferredQueueHandler(queue.SimpleQueue())
+_listener: QueueListener | None = None
+_listener_lock: threading.Lock = threading.Lock()
+
+
+def _start_listener() -> None:
+    """Start the background thread writing queued records to stdout, once per process."""
+    global _listener  # noqa: PLW0603
+    with _listener_lock:
+        if _listener is not None:
+            return
+        stream_handler: logging.StreamHandler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(create_formatter())
+        _listener = QueueListener(_queue_handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown() -> None:
+    """Flush the queued records and stop the background thread."""
+    global _listener  # noqa: PLW0603
+    with _listener_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+
+
+def _restart_after_fork() -> None:
+    """Give a forked child process its own queue, lock and writer thread (threads do not survive a fork)."""
+    global _listener, _listener_lock  # noqa: PLW0603
+    _listener_lock = threading.Lock()
+    if _listener is None:
+        return
+    _listener = None
+    _queue_handler.queue = queue.SimpleQueue()
+    _start_listener()
+
+
+atexit.register(shutdown)
+os.register_at_fork(after_in_child=_restart_after_fork)
 
 
 def get_logger(name: str) -> logging.Logger:
-    """Get a logger with the specified name. If no handlers are set, add a StreamHandler with a specific format.
+    """Get a logger with the specified name. If no handlers are set, attach the shared queue handler.
 
     :param name: The name of the logger.
     :return: A logger instance.
@@ -40,10 +192,8 @@ def get_logger(name: str) -> logging.Logger:
     logger: logging.Logger = logging.getLogger(name)
 
     if not logger.handlers:
-        handler = logging.StreamHandler(sys.stdout)
-        formatter = FixedWidthFormatter("%(asctime)s - %(levelname)s (%(name)s.%(funcName)s:%(lineno)d) - %(message)s")
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        _start_listener()
+        logger.addHandler(_queue_handler)
         logger.setLevel(LOG_LEVEL)
 
     return logger
@@ -0,0 +1,37 @@
+"""Compact record of a source media item holding only the fields the sync needs."""
+
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(slots=True)
+class MediaRecord:
+    """Metadata of one source media item, built once when its API page or Takeout sidecar is parsed.
+
+    The raw API dictionary (base URL, product URL, photo/video blocks, ...) is dropped right after parsing, and
+    the slotted record carries no per-instance `__dict__`. File names are interned, as camera naming schemes
+    repeat them across a library.
+    """
+
+    id: str
+    filename: str
+    description: str | None = None
+    creation_time: str | None = None
+    checksum: str | None = None
+    size: int | None = None
+    latitude: float | None = None
+    longitude: float | None = None
+    favorite: bool = False
+    archived: bool = False
+
+    def __post_init__(self) -> None:
+        """Intern the file name."""
+        self.filename = sys.intern(self.filename)
+
+    def __reduce__(self) -> tuple[type["MediaRecord"], tuple[Any, ...]]:
+        """Pickle as constructor arguments, so records from Takeout worker processes are interned again.
+
+        :return: Tuple of (class, constructor arguments).
+        """
+        return MediaRecord, tuple(getattr(self, name) for name in self.__slots__)
@@ -0,0 +1,494 @@
+"""In-process metrics (counters, gauges, histograms) with Prometheus/OpenMetrics text export."""
+
+import bisect
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE: str = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition formats.
+
+    :param value: Raw label value.
+    :return: Escaped label value.
+    """
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value.
+
+    :param value: Sample value.
+    :return: Value as text, with infinities spelled as in the exposition formats.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Base class of a metric family with a fixed set of label names."""
+
+    kind: str = "untyped"
+    name: str
+    help: str
+    label_names: tuple[str, ...]
+    _lock: threading.Lock
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        """Initialize the metric family.
+
+        :param name: Metric name (without the `_total` suffix for counters).
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        """
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        """Build the sample key from label values.
+
+        :param labels: Label values by name; must match the label names of the family.
+        :return: Label values in declaration order.
+        """
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"Metric {self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[label]) for label in self.label_names)
+
+    def _labels(self, key: LabelValues, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        """Format the label set of a sample.
+
+        :param key: Label values in declaration order.
+        :param extra: Additional label pairs (e.g. the histogram `le`).
+        :return: Label set such as `{method="GET"}`, or an empty string.
+        """
+        pairs: list[tuple[str, str]] = [*zip(self.label_names, key, strict=True), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{label}="{_escape(value)}"' for label, value in pairs) + "}"
+
+    @abstractmethod
+    def samples(self, openmetrics: bool) -> Iterator[str]:
+        """Yield the sample lines of the family.
+
+        :param openmetrics: Render for OpenMetrics instead of the Prometheus text format.
+        :return: Iterator over sample lines.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Drop all samples."""
+
+
+class Counter(Metric):
+    """Monotonically increasing counter."""
+
+    kind = "counter"
+    _values: dict[LabelValues, float]
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        """Initialize the counter.
+
+        :param name: Metric name without the `_total` suffix.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        """
+        super().__init__(name, help_text, label_names)
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter.
+
+        :param amount: Non-negative increment.
+        :param labels: Label values.
+        """
+        key: LabelValues = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a sample.
+
+        :param labels: Label values.
+        :return: Counter value (0 if never increased).
+        """
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self, openmetrics: bool) -> Iterator[str]:
+        """Yield the `_total` sample lines.
+
+        :param openmetrics: Render for OpenMetrics instead of the Prometheus text format.
+        :return: Iterator over sample lines.
+        """
+        with self._lock:
+            values: list[tuple[LabelValues, float]] = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}_total{self._labels(key)} {_format_value(value)}"
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+    _values: dict[LabelValues, float]
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        """Initialize the gauge.
+
+        :param name: Metric name.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        """
+        super().__init__(name, help_text, label_names)
+        self._values = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge.
+
+        :param value: New value.
+        :param labels: Label values.
+        """
+        key: LabelValues = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase (or with a negative amount, decrease) the gauge.
+
+        :param amount: Increment.
+        :param labels: Label values.
+        """
+        key: LabelValues = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Decrease the gauge.
+
+        :param amount: Decrement.
+        :param labels: Label values.
+        """
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a sample.
+
+        :param labels: Label values.
+        :return: Gauge value (0 if never set).
+        """
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self, openmetrics: bool) -> Iterator[str]:
+        """Yield the sample lines.
+
+        :param openmetrics: Render for OpenMetrics instead of the Prometheus text format.
+        :return: Iterator over sample lines.
+        """
+        with self._lock:
+            values: list[tuple[LabelValues, float]] = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+    buckets: tuple[float, ...]
+    _counts: dict[LabelValues, list[int]]
+    _sums: dict[LabelValues, float]
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram.
+
+        :param name: Metric name.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        :param buckets: Sorted upper bounds of the buckets; `+Inf` is added automatically.
+        """
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._counts = {}
+        self._sums = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation.
+
+        :param value: Observed value (e.g. seconds).
+        :param labels: Label values.
+        """
+        key: LabelValues = self._key(labels)
+        position: int = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts: list[int] | None = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[position] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds.
+
+        :param labels: Label values.
+        :return: Context manager timing the block.
+        """
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations of a sample.
+
+        :param labels: Label values.
+        :return: Number of observations.
+        """
+        return sum(self._counts.get(self._key(labels), []))
+
+    def samples(self, openmetrics: bool) -> Iterator[str]:
+        """Yield the `_bucket`, `_count` and `_sum` sample lines.
+
+        :param openmetrics: Render for OpenMetrics instead of the Prometheus text format.
+        :return: Iterator over sample lines.
+        """
+        with self._lock:
+            series: list[tuple[LabelValues, list[int], float]] = [
+                (key, list(counts), self._sums[key]) for key, counts in sorted(self._counts.items())
+            ]
+        for key, counts, total in series:
+            cumulative: int = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts, strict=True):
+                cumulative += bucket_count
+                labels: str = self._labels(key, (("le", _format_value(bound)),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_count{self._labels(key)} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+
+    def reset(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+
+class MetricsRegistry:
+    """Collection of metric families rendered together."""
+
+    _metrics: dict[str, Metric]
+    _lock: threading.Lock
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family to the registry.
+
+        :param metric: The metric family.
+        :return: The registered metric family.
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter.
+
+        :param name: Metric name without the `_total` suffix.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        :return: The new counter.
+        """
+        counter: Counter = Counter(name, help_text, label_names)
+        self.register(counter)
+        return counter
+
+    def gauge(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Gauge:
+        """Create and register a gauge.
+
+        :param name: Metric name.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        :return: The new gauge.
+        """
+        gauge: Gauge = Gauge(name, help_text, label_names)
+        self.register(gauge)
+        return gauge
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram.
+
+        :param name: Metric name.
+        :param help_text: Description shown in the `# HELP` line.
+        :param label_names: Names of the labels every sample carries.
+        :param buckets: Upper bounds of the buckets.
+        :return: The new histogram.
+        """
+        histogram: Histogram = Histogram(name, help_text, label_names, buckets)
+        self.register(histogram)
+        return histogram
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Render all metric families.
+
+        :param openmetrics: Render the OpenMetrics format instead of the Prometheus text format 0.0.4.
+        :return: Exposition text.
+        """
+        lines: list[str] = []
+        with self._lock:
+            metrics: list[Metric] = list(self._metrics.values())
+        for metric in metrics:
+            family: str = metric.name if openmetrics or metric.kind != "counter" else f"{metric.name}_total"
+            lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+            lines.extend(metric.samples(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the metrics for the node_exporter textfile collector.
+
+        :param path: Target `.prom` file.
+        """
+        directory: str = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path: str = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render())
+        os.replace(temporary_path, path)
+
+    def reset(self) -> None:
+        """Drop the samples of all metric families (the families stay registered)."""
+        with self._lock:
+            metrics: list[Metric] = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server exposing a registry on `/metrics`."""
+
+    daemon_threads = True
+    registry: MetricsRegistry
+
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = "") -> None:
+        """Bind the server.
+
+        :param registry: Registry to expose.
+        :param port: Port to listen on (0 = any free port).
+        :param host: Interface to listen on (all by default).
+        """
+        self.registry = registry
+        super().__init__((host, port), _MetricsHandler)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Request handler rendering the server's registry."""
+
+    server: MetricsServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Silence the per-request access log.
+
+        :param format: Log format string.
+        :param args: Log arguments.
+        """
+
+    def do_GET(self) -> None:
+        """Serve the metrics in the format negotiated by the `Accept` header."""
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        openmetrics: bool = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body: bytes = self.server.registry.render(openmetrics).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(port: int, registry: "MetricsRegistry | None" = None) -> MetricsServer:
+    """Serve a registry on `/metrics` from a daemon thread.
+
+    :param port: Port to listen on (0 = any free port).
+    :param registry: Registry to expose, defaults to the application registry.
+    :return: The running server; call `shutdown()` to stop it.
+    """
+    server: MetricsServer = MetricsServer(registry or REGISTRY, port)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
+
+
+REGISTRY: MetricsRegistry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS: Histogram = REGISTRY.histogram(
+    "gphoto2immich_http_request_seconds",
+    "Latency of API requests by service, method, endpoint and status.",
+    ("service", "method", "endpoint", "status"),
+)
+HTTP_REQUESTS_IN_FLIGHT: Gauge = REGISTRY.gauge(
+    "gphoto2immich_http_requests_in_flight", "API requests currently in flight by service.", ("service",)
+)
+HTTP_BYTES: Counter = REGISTRY.counter(
+    "gphoto2immich_http_bytes", "Request and response body bytes by service and direction.", ("service", "direction")
+)
+SOURCE_PAGES: Counter = REGISTRY.counter(
+    "gphoto2immich_source_pages", "Result pages fetched from the metadata source.", ("source",)
+)
+SYNC_ITEMS: Counter = REGISTRY.counter(
+    "gphoto2immich_sync_items",
+    "Source items read (seen) and by sync result (not_found, ambiguous, skipped, updated, dry_run, failed).",
+    ("result",),
+)
+SYNC_STAGE_SECONDS: Histogram = REGISTRY.histogram(
+    "gphoto2immich_sync_stage_seconds", "Time spent per sync stage (index, lookup, update).", ("stage",)
+)
+SYNC_LAST_RUN: Gauge = REGISTRY.gauge(
+    "gphoto2immich_sync_last_run_timestamp_seconds", "Unix time at which the last sync run finished."
+)
+IMMICH_RATE_LIMIT: Gauge = REGISTRY.gauge(
+    "gphoto2immich_immich_rate_limit", "Current adaptive Immich request rate in requests per second."
+)
@@ -0,0 +1,158 @@
+"""Adaptive token-bucket rate limiter shared by all Immich requests."""
+
+import asyncio
+import datetime
+import email.utils
+import threading
+import time
+from collections.abc import Callable
+from logging import Logger
+
+from app.log import get_logger
+from app.metrics import IMMICH_RATE_LIMIT
+
+THROTTLE_STATUS_CODES: frozenset[int] = frozenset({429, 503})
+
+
+def parse_retry_after(value: str | None, now: datetime.datetime | None = None) -> float:
+    """Parse a `Retry-After` header value.
+
+    :param value: Header value, either delay seconds or an HTTP date.
+    :param now: Current time used for HTTP dates, defaults to now.
+    :return: Delay in seconds (0 if missing or invalid).
+    """
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at: datetime.datetime = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(0.0, (retry_at - (now or datetime.datetime.now(datetime.UTC))).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """Thread-safe token bucket whose rate adapts with AIMD to latency and throttling responses.
+
+    Every successful fast response increases the rate so that it grows by `increase` requests/s per second of
+    traffic; a throttling (429/503) or slow response multiplies it by `decrease`, at most once per `cooldown`.
+    A `Retry-After` header pauses all callers until it expires.
+    """
+
+    rate: float
+    min_rate: float
+    max_rate: float
+    target_latency: float
+    increase: float
+    decrease: float
+    cooldown: float
+    logger: Logger
+    _tokens: float
+    _updated: float
+    _blocked_until: float
+    _last_decrease: float
+    _clock: Callable[[], float]
+    _lock: threading.Lock
+
+    def __init__(  # noqa: PLR0913
+        self,
+        rate: float,
+        *,
+        min_rate: float = 1.0,
+        max_rate: float = 200.0,
+        target_latency: float = 1.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        :param rate: Initial rate in requests per second.
+        :param min_rate: Lower bound of the rate.
+        :param max_rate: Upper bound of the rate.
+        :param target_latency: Response latency in seconds above which the rate is decreased.
+        :param increase: Additive increase in requests/s per second of successful traffic.
+        :param decrease: Multiplicative decrease factor applied on throttling or slow responses.
+        :param cooldown: Minimum time in seconds between two decreases.
+        :param clock: Monotonic clock, replaceable for testing.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = 1.0
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        IMMICH_RATE_LIMIT.set(self.rate)
+
+    def reserve(self) -> float:
+        """Reserve one request slot.
+
+        :return: Delay in seconds the caller has to wait before sending the request.
+        """
+        with self._lock:
+            now: float = self._clock()
+            self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            delay: float = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(delay, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+        delay: float = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a request may be sent."""
+        delay: float = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_response(self, status_code: int, latency: float, retry_after: str | None = None) -> None:
+        """Adapt the rate to a response.
+
+        :param status_code: HTTP status code of the response.
+        :param latency: Response latency in seconds.
+        :param retry_after: Value of the `Retry-After` header, if any.
+        """
+        with self._lock:
+            now: float = self._clock()
+            if status_code in THROTTLE_STATUS_CODES:
+                self._blocked_until = max(self._blocked_until, now + parse_retry_after(retry_after))
+                self._decrease(now, f"HTTP {status_code}")
+            elif latency > self.target_latency:
+                self._decrease(now, f"latency {latency:.2f}s")
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+            IMMICH_RATE_LIMIT.set(self.rate)
+
+    def on_error(self) -> None:
+        """Adapt the rate to a connection error or timeout."""
+        with self._lock:
+            self._decrease(self._clock(), "connection error")
+            IMMICH_RATE_LIMIT.set(self.rate)
+
+    def _decrease(self, now: float, reason: str) -> None:
+        """Multiplicatively decrease the rate unless it was decreased within the cooldown.
+
+        :param now: Current clock value.
+        :param reason: Reason logged with the new rate.
+        """
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.logger.debug("Decreased Immich request rate to %.1f req/s (%s)", self.rate, reason)
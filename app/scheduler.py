@@ -0,0 +1,285 @@
+"""Schedules (fixed interval or cron expression) and the long-running daemon loop."""
+
+import datetime
+import random
+import signal
+import threading
+import time
+from collections.abc import Callable
+from logging import Logger
+from types import FrameType
+from typing import Protocol
+
+from app.log import get_logger
+
+CRON_MACROS: dict[str, str] = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+CRON_FIELD_RANGES: tuple[tuple[int, int], ...] = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+CRON_SEARCH_DAYS: int = 5 * 366  # give up on expressions that never match (e.g. "0 0 30 2 *")
+
+
+class Schedule(Protocol):
+    """Computes when the next run is due."""
+
+    def next_run(self, now: datetime.datetime) -> datetime.datetime:
+        """Return the time of the next run strictly after `now`.
+
+        :param now: Current local time (naive).
+        :return: Time of the next run.
+        """
+        ...
+
+
+class IntervalSchedule:
+    """Runs every `interval` seconds, on a grid anchored at the first call."""
+
+    interval: datetime.timedelta
+    anchor: datetime.datetime | None
+
+    def __init__(self, interval: float) -> None:
+        """Initialize the schedule.
+
+        :param interval: Seconds between the starts of two runs.
+        """
+        if interval <= 0:
+            raise ValueError(f"Sync interval must be positive, got {interval}")
+        self.interval = datetime.timedelta(seconds=interval)
+        self.anchor = None
+
+    def next_run(self, now: datetime.datetime) -> datetime.datetime:
+        """Return the next grid point after `now`; grid points missed by an overrunning run are skipped.
+
+        :param now: Current local time (naive).
+        :return: Time of the next run.
+        """
+        if self.anchor is None:
+            self.anchor = now
+        elapsed: int = int((now - self.anchor) / self.interval)
+        return self.anchor + (elapsed + 1) * self.interval
+
+
+class CronSchedule:
+    """Standard five-field cron expression (minute hour day-of-month month day-of-week) in local time.
+
+    Fields accept `*`, numbers, ranges (`1-5`), lists (`1,15`) and steps (`*/15`, `0-30/10`); day-of-week 0 and 7
+    are Sunday. As in cron, when both day fields are restricted a day matches if either does. The `@hourly`,
+    `@daily`, `@weekly`, `@monthly` and `@yearly` macros are supported.
+    """
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool
+    any_weekday: bool
+
+    def __init__(self, expression: str) -> None:
+        """Parse a cron expression.
+
+        :param expression: The cron expression.
+        """
+        self.expression = expression
+        fields: list[str] = CRON_MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != len(CRON_FIELD_RANGES):
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+
+        parsed: list[frozenset[int]] = [
+            self._parse_field(field, low, high, expression)
+            for field, (low, high) in zip(fields, CRON_FIELD_RANGES, strict=True)
+        ]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = frozenset(weekday % 7 for weekday in weekdays)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int, expression: str) -> frozenset[int]:
+        """Parse one cron field.
+
+        :param field: Field text.
+        :param low: Smallest allowed value.
+        :param high: Largest allowed value.
+        :param expression: Whole expression, for error messages.
+        :return: Set of matching values.
+        """
+        values: set[int] = set()
+        for part in field.split(","):
+            range_text, _, step_text = part.partition("/")
+            try:
+                step: int = int(step_text) if step_text else 1
+                if range_text == "*":
+                    start, end = low, high
+                elif "-" in range_text:
+                    start_text, end_text = range_text.split("-", 1)
+                    start, end = int(start_text), int(end_text)
+                else:
+                    start = int(range_text)
+                    end = high if step_text else start
+            except ValueError:
+                raise ValueError(f"Invalid cron field {part!r} in {expression!r}") from None
+            if step < 1 or start < low or end > high or start > end:
+                raise ValueError(f"Cron field {part!r} out of range {low}-{high} in {expression!r}")
+            values.update(range(start, end + 1, step))
+        return frozenset(values)
+
+    def _day_matches(self, day: datetime.datetime) -> bool:
+        """Check the day-of-month and day-of-week fields.
+
+        :param day: The day to check.
+        :return: True if the day matches.
+        """
+        day_match: bool = day.day in self.days
+        weekday_match: bool = (day.weekday() + 1) % 7 in self.weekdays  # cron counts from Sunday = 0
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_run(self, now: datetime.datetime) -> datetime.datetime:
+        """Return the first matching minute after `now`.
+
+        :param now: Current local time (naive).
+        :return: Time of the next run.
+        """
+        candidate: datetime.datetime = now.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit: datetime.datetime = candidate + datetime.timedelta(days=CRON_SEARCH_DAYS)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                next_month: datetime.datetime = (candidate.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+                candidate = next_month.replace(hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression!r}")
+
+
+def create_schedule(interval: float, cron: str = "") -> Schedule:
+    """Create the schedule of the daemon.
+
+    :param interval: Seconds between runs, used when no cron expression is given.
+    :param cron: Cron expression; takes precedence over the interval.
+    :return: A schedule instance.
+    """
+    if cron.strip():
+        return CronSchedule(cron)
+    return IntervalSchedule(interval)
+
+
+class Daemon:
+    """Runs a job repeatedly on a schedule until stopped.
+
+    Runs never overlap: the loop starts the next run only after the previous one returned, and schedule points
+    missed in the meantime are skipped. A failed run is logged and does not stop the daemon.
+    """
+
+    job: Callable[[], None]
+    schedule: Schedule
+    jitter: float
+    run_on_start: bool
+    stop_event: threading.Event
+    on_stop: Callable[[], None] | None
+    runs: int
+    logger: Logger
+    _running: threading.Lock
+    _now: Callable[[], datetime.datetime]
+    _random: Callable[[], float]
+
+    def __init__(  # noqa: PLR0913
+        self,
+        job: Callable[[], None],
+        schedule: Schedule,
+        *,
+        jitter: float = 0.0,
+        run_on_start: bool = True,
+        on_stop: Callable[[], None] | None = None,
+        now: Callable[[], datetime.datetime] = datetime.datetime.now,
+        random_fraction: Callable[[], float] = random.random,
+    ) -> None:
+        """Initialize the daemon.
+
+        :param job: The job to run (one sync run).
+        :param schedule: Schedule of the runs.
+        :param jitter: Maximum random delay in seconds added to every scheduled run.
+        :param run_on_start: Run the job immediately when the daemon starts.
+        :param on_stop: Called when a stop is requested, e.g. to interrupt a running sync.
+        :param now: Clock returning the current local time, replaceable for testing.
+        :param random_fraction: Random number source in [0, 1), replaceable for testing.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.job = job
+        self.schedule = schedule
+        self.jitter = jitter
+        self.run_on_start = run_on_start
+        self.on_stop = on_stop
+        self.stop_event = threading.Event()
+        self.runs = 0
+        self._running = threading.Lock()
+        self._now = now
+        self._random = random_fraction
+
+    def install_signal_handlers(self) -> None:
+        """Stop gracefully on SIGTERM and SIGINT (must be called from the main thread)."""
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signal_number, self._handle_signal)
+
+    def _handle_signal(self, signal_number: int, frame: FrameType | None) -> None:
+        """Handle a termination signal.
+
+        :param signal_number: The received signal.
+        :param frame: Current stack frame (unused).
+        """
+        self.logger.info("Received %s, stopping after the current item...", signal.Signals(signal_number).name)
+        self.stop()
+
+    def stop(self) -> None:
+        """Request the daemon to stop; a running job is asked to finish early."""
+        self.stop_event.set()
+        if self.on_stop is not None:
+            self.on_stop()
+
+    def run_forever(self) -> None:
+        """Run the job on the schedule until `stop` is called."""
+        self.logger.info("Daemon started.")
+        if self.run_on_start:
+            self.run_once()
+        while not self.stop_event.is_set():
+            due: datetime.datetime = self.schedule.next_run(self._now())
+            delay: float = max(0.0, (due - self._now()).total_seconds()) + self.jitter * self._random()
+            next_start: datetime.datetime = self._now() + datetime.timedelta(seconds=delay)
+            self.logger.info("Next sync at %s.", next_start.isoformat(timespec="seconds"))
+            if self.stop_event.wait(delay):
+                break
+            self.run_once()
+        self.logger.info("Daemon stopped after %d runs.", self.runs)
+
+    def run_once(self) -> bool:
+        """Run the job unless a run is already in progress.
+
+        :return: True if the job ran, False if it was skipped.
+        """
+        if not self._running.acquire(blocking=False):
+            self.logger.warning("Previous sync is still running, skipping this run.")
+            return False
+        started: float = time.monotonic()
+        try:
+            self.job()
+        except Exception as e:
+            self.logger.exception("Sync run failed: %s", e)
+        finally:
+            self._running.release()
+            self.runs += 1
+        self.logger.info("Sync run finished in %.1f s.", time.monotonic() - started)
+        return True
@@ -1,21 +1,61 @@
 """Sync Service"""
 
+import asyncio
+import datetime
+import itertools
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from logging import Logger
 from typing import Any
 
+from app.album_sync import AlbumSync
+from app.asset_cache import AssetCache
+from app.asset_index import AssetIndex, IndexedAsset, normalize_timestamp
+from app.asset_patch import SYNC_FIELDS, asset_fields, build_patch, changed_fields, describe, is_bulk, patch_key
 from app.config import Config
 from app.gphotos_client import GooglePhotosClient
+from app.immich_async_client import AsyncImmichClient
 from app.immich_client import ImmichClient
+from app.journal import DONE_RESULTS, RESULT_FAILED, RESULT_NOT_FOUND, RESULT_SKIPPED, RESULT_UPDATED, SyncJournal
 from app.log import get_logger
+from app.media_record import MediaRecord
+from app.metrics import REGISTRY, SYNC_ITEMS, SYNC_LAST_RUN, SYNC_STAGE_SECONDS
+from app.rate_limiter import AdaptiveRateLimiter
+from app.takeout_client import TakeoutClient
+from app.watermark import TIME_FORMAT, SyncWatermark
+
+ASYNC_BATCH_SIZE: int = 500  # source items pulled per helper-thread hop in async mode
+BULK_UPDATE_SIZE: int = 500  # assets per bulk update request
+
+BulkEntry = tuple[str, str, str, str]  # (asset ID, item ID, file name, journal content)
+BulkBatch = tuple[tuple[tuple[str, Any], ...], list[BulkEntry]]  # (fields written, entries)
 
 
 class SyncService:
     """Service for syncing Google Photos items to Immich."""
 
     config: Config
-    gphotos: GooglePhotosClient
+    source: GooglePhotosClient | TakeoutClient
     immich: ImmichClient
+    immich_async: AsyncImmichClient
+    _async_client_open: bool
+    rate_limiter: AdaptiveRateLimiter | None
+    index: AssetIndex | None
+    library_index: AssetIndex | None
+    journal: SyncJournal | None
+    watermark: SyncWatermark | None
+    days_back: int
+    stats: Counter[str]
+    stopping: threading.Event
+    sync_fields: frozenset[str]
     logger: Logger
+    _stats_lock: threading.Lock
+    _bulk_updates: dict[tuple[tuple[str, Any], ...], list[BulkEntry]]
+    _bulk_lock: threading.Lock
+    _bulk_updated: int
 
     def __init__(self, config: Config) -> None:
         """Initialize the SyncService.
@@ -24,45 +64,754 @@ class SyncService:
         """
         self.logger = get_logger("sync")
         self.config: Config = config
-        self.gphotos = GooglePhotosClient(config.google_credentials_path)
-        self.immich = ImmichClient(config.immich_base_url, config.immich_api_key)
-        self.logger.debug(f"Initialized with config: {config}")
+        self.source = (
+            TakeoutClient(
+                config.takeout_paths,
+                workers=config.takeout_workers,
+                hash_media=config.takeout_hash_media,
+                collect_albums=config.sync_albums,
+            )
+            if config.source == "takeout"
+            else GooglePhotosClient(
+                config.google_credentials_path,
+                shards=config.google_fetch_shards,
+                shard_days=config.google_shard_days,
+                discovery_cache_path=config.google_discovery_cache_path,
+            )
+        )
+        self.rate_limiter = (
+            AdaptiveRateLimiter(
+                config.immich_rate_limit,
+                min_rate=config.immich_rate_min,
+                max_rate=config.immich_rate_max,
+                target_latency=config.immich_target_latency,
+            )
+            if config.immich_rate_limit > 0
+            else None
+        )
+        self.immich = ImmichClient(
+            config.immich_base_url,
+            config.immich_api_key,
+            pool_size=max(config.immich_pool_size, config.sync_workers),
+            connect_timeout=config.immich_connect_timeout,
+            read_timeout=config.immich_read_timeout,
+            max_retries=config.immich_max_retries,
+            retry_backoff=config.immich_retry_backoff,
+            rate_limiter=self.rate_limiter,
+        )
+        self._async_client_open = False
+        self.index = None
+        self.library_index = None
+        self.journal = None
+        self.watermark = None
+        self.days_back = config.days_back
+        self.stats = Counter()
+        self.stopping = threading.Event()
+        self.sync_fields = frozenset(config.sync_fields) & SYNC_FIELDS
+        for unknown in sorted(set(config.sync_fields) - SYNC_FIELDS):
+            self.logger.warning("Ignoring unknown sync field: %s", unknown)
+        self._stats_lock = threading.Lock()
+        self._bulk_updates = {}
+        self._bulk_lock = threading.Lock()
+        self._bulk_updated = 0
+        self.logger.debug("Initialized with config: %s", config)
 
     def run(self) -> None:
         """Run the sync process to update Immich with Google Photos items."""
-        self.logger.info("Fetching Google Photos items from last %d days...", self.config.days_back)
-        items: list[dict[Any, Any]] = self.gphotos.fetch_media_items(self.config.days_back)
-        self.logger.info("Found %d items.", len(items))
-
-        updated = 0
-        for item in items:
-            metadata: dict[str, str | None] = self.gphotos.extract_metadata(item)
-            filename: str = metadata["filename"] or ""
-            description: str | None = metadata["description"]
-
-            if not description:
-                self.logger.debug("Skipping %s (no description)", filename)
-                continue
+        items: Iterator[MediaRecord] = self._start_run()
 
-            asset_id: str | None = self.immich.find_asset_by_filename(filename)
-            if asset_id:
-                if self.config.sync_strategy == "skip_if_present":
-                    existing_description = self.immich.get_asset_description(asset_id)
-                    if existing_description:
-                        self.logger.info("Skipping %s - already has description in Immich", filename)
-                        continue
-
-                if self.config.dry_run:
-                    self.logger.info('[DRY-RUN] Would update: %s → "%s"', filename, description)
-                    updated += 1
-                else:
-                    success: bool = self.immich.update_asset_description(asset_id, description)
-                    if success:
-                        self.logger.info("Updated: %s", filename)
-                        updated += 1
-                    else:
-                        self.logger.error("Failed to update: %s", filename)
+        found: int = 0
+        updated: int = 0
+        completed: bool = False
+        try:
+            if self.config.sync_workers > 1:
+                found, updated = self._run_concurrent(items)
             else:
-                self.logger.warning("Not found in Immich: %s", filename)
+                for item in items:
+                    if self._stop_requested():
+                        break
+                    found += 1
+                    updated += self._process_item(item)
+            for batch in self._take_bulk_batches():
+                self._flush_bulk_batch(batch)
+            updated += self._bulk_updated
+            if self.config.sync_albums and not self.stopping.is_set():
+                self._sync_albums()
+            completed = not self.stopping.is_set()
+        finally:
+            self._finish_run(found, updated, completed)
+
+    def stop(self) -> None:
+        """Ask a running sync to stop taking new items; items already in progress are finished."""
+        self.stopping.set()
+
+    def _stop_requested(self) -> bool:
+        """Check whether `stop` was called.
+
+        :return: True if the run should stop taking new items.
+        """
+        if not self.stopping.is_set():
+            return False
+        self.logger.info("Stop requested, not processing further items.")
+        return True
+
+    async def run_async(self, *, keep_client: bool = False) -> None:
+        """Run the sync process on the event loop with an async Immich client.
+
+        Up to `sync_workers` items are in flight at once on a single thread; source pagination and the index
+        build run in a helper thread so they never block the loop. Like `run`, the first error of an item stops
+        taking new items and is raised once the items in flight are done, leaving the run incomplete.
 
+        :param keep_client: Keep the async client and its connections open for the next run on the same event
+            loop (daemon mode); close it with `aclose`.
+        """
+        items: Iterator[MediaRecord] = await asyncio.to_thread(self._start_run)
+        if not self._async_client_open:
+            self.immich_async = AsyncImmichClient(
+                self.config.immich_base_url,
+                self.config.immich_api_key,
+                max_connections=self.config.immich_pool_size,
+                connect_timeout=self.config.immich_connect_timeout,
+                read_timeout=self.config.immich_read_timeout,
+                max_retries=self.config.immich_max_retries,
+                retry_backoff=self.config.immich_retry_backoff,
+                http2=self.config.immich_http2,
+                rate_limiter=self.rate_limiter,
+            )
+            self._async_client_open = True
+
+        found: int = 0
+        updated: int = 0
+        completed: bool = False
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(self.config.sync_workers)
+        tasks: set[asyncio.Task[None]] = set()
+        failures: list[BaseException] = []
+
+        async def process(item: MediaRecord) -> None:
+            nonlocal updated
+            try:
+                updated += await self._process_item_async(item)
+            finally:
+                semaphore.release()
+
+        def finished(task: asyncio.Task[None]) -> None:
+            tasks.discard(task)
+            if not task.cancelled() and (error := task.exception()) is not None:
+                failures.append(error)
+
+        try:
+            while (
+                not self.stopping.is_set()
+                and not failures
+                and (batch := await asyncio.to_thread(list, itertools.islice(items, ASYNC_BATCH_SIZE)))
+            ):
+                for item in batch:
+                    if failures or self._stop_requested():
+                        break
+                    found += 1
+                    await semaphore.acquire()
+                    task: asyncio.Task[None] = asyncio.create_task(process(item))
+                    tasks.add(task)
+                    task.add_done_callback(finished)
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if failures:
+                raise failures[0]
+            for bulk_batch in self._take_bulk_batches():
+                await self._flush_bulk_batch_async(bulk_batch)
+            updated += self._bulk_updated
+            if self.config.sync_albums and not self.stopping.is_set():
+                await asyncio.to_thread(self._sync_albums)
+            completed = not self.stopping.is_set()
+        finally:
+            if not keep_client:
+                await self.aclose()
+            self._finish_run(found, updated, completed)
+
+    async def aclose(self) -> None:
+        """Close the async Immich client kept open by `run_async`, if any."""
+        if self._async_client_open:
+            self._async_client_open = False
+            await self.immich_async.aclose()
+
+    def _start_run(self) -> Iterator[MediaRecord]:
+        """Prepare a run: build the asset index, open the journal and start streaming source items.
+
+        :return: Stream of source media items.
+        """
+        self.days_back = self.config.days_back
+        if self.config.watermark_path:
+            self.watermark = SyncWatermark(
+                self.config.watermark_path, self.config.watermark_overlap, read_only=self.config.dry_run
+            )
+            self.days_back = self.watermark.days_back(self.config.days_back)
+            if self.watermark.since is not None:
+                self.logger.info(
+                    "Syncing items taken since %s (watermark %s).", self.watermark.since, self.watermark.time
+                )
+
+        with SYNC_STAGE_SECONDS.time(stage="index"):
+            if self.config.match_mode == "index":
+                self.index = self._build_index(self.index)
+            elif self.config.match_mode == "window":
+                self.index = self._build_window_index()
+
+        if self.config.source == "takeout":
+            self.logger.info("Reading Google Takeout archives from %s...", ", ".join(self.config.takeout_paths))
+        else:
+            self.logger.info("Fetching Google Photos items from last %d days...", self.days_back)
+
+        if self.config.journal_path and not self.config.dry_run:
+            self.journal = SyncJournal(self.config.journal_path)
+        self.stats.clear()
+        with self._bulk_lock:
+            self._bulk_updates.clear()
+            self._bulk_updated = 0
+        return self.source.iter_media_items(self.days_back)
+
+    def _finish_run(self, found: int, updated: int, completed: bool = True) -> None:
+        """Close run resources and log the run summary.
+
+        :param found: Number of source items processed.
+        :param updated: Number of items updated in Immich.
+        :param completed: Whether every source item was processed; only a complete run advances the watermark.
+        """
+        if self.journal is not None:
+            self.journal.close()
+        if self.watermark is not None:
+            if completed:
+                self.watermark.commit(self._retry_floor())
+            else:
+                self.logger.warning("Run did not complete, keeping the watermark at %s.", self.watermark.time)
+            self.watermark = None
+
+        self.logger.info("Found %d items.", found)
+        if self.stats["ambiguous"]:
+            self.logger.info("Skipped %d items with ambiguous matches in Immich.", self.stats["ambiguous"])
+        if self.journal is not None:
+            self.logger.info("Skipped %d items unchanged since the last sync.", self.journal.hits)
+            self.journal = None
+        if self.config.sync_strategy == "update_if_changed":
+            self.logger.info(
+                "Descriptions created: %d, changed: %d, unchanged: %d.",
+                self.stats["created"],
+                self.stats["changed"],
+                self.stats["unchanged"],
+            )
+        if self.rate_limiter is not None:
+            self.logger.info("Immich request rate settled at %.1f req/s.", self.rate_limiter.rate)
         self.logger.info("Updated %d items.", updated)
+
+        SYNC_LAST_RUN.set(time.time())
+        if self.config.metrics_textfile:
+            REGISTRY.write_textfile(self.config.metrics_textfile)
+            self.logger.debug("Wrote metrics to %s", self.config.metrics_textfile)
+
+    def _retry_floor(self) -> str | None:
+        """Return the oldest creation time an item that failed to sync may hold the watermark back to.
+
+        :return: Start of the `DAYS_BACK` window, or None when the window is unbounded.
+        """
+        if self.config.days_back <= 0:
+            return None
+        start: datetime.datetime = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=self.config.days_back)
+        return start.strftime(TIME_FORMAT)
+
+    def _run_concurrent(self, items: Iterator[MediaRecord]) -> tuple[int, int]:
+        """Process a stream of items on a bounded worker pool.
+
+        At most twice the number of workers are queued at once, so the item stream is consumed lazily and
+        Immich updates overlap with Google Photos pagination.
+
+        :param items: Stream of media items from Google Photos API.
+        :return: Tuple of (items found, items updated).
+        """
+        self.logger.debug("Processing items with %d workers", self.config.sync_workers)
+        found: int = 0
+        updated: int = 0
+        pending: set[Future[bool]] = set()
+        with ThreadPoolExecutor(max_workers=self.config.sync_workers, thread_name_prefix="sync") as executor:
+            for item in items:
+                if self._stop_requested():
+                    break
+                found += 1
+                if len(pending) >= self.config.sync_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    updated += sum(future.result() for future in done)
+                pending.add(executor.submit(self._process_item, item))
+            updated += sum(future.result() for future in wait(pending).done)
+        return found, updated
+
+    def _build_index(self, index: AssetIndex | None = None) -> AssetIndex:
+        """Build the local file name index of the Immich library, or refresh an index kept from a previous run.
+
+        When an asset cache is configured, the cached index is loaded and only refreshed with assets changed
+        since the stored watermark; otherwise the whole library is paged through once.
+
+        :param index: Index of a previous run to refresh in place, or None.
+        :return: Index of Immich assets keyed by original file name.
+        """
+        cache: AssetCache | None = AssetCache(self.config.asset_cache_path) if self.config.asset_cache_path else None
+        if cache is not None and self.config.rebuild_cache:
+            cache.clear()
+            self.config.rebuild_cache = False  # in daemon mode, later runs refresh the rebuilt cache
+        if index is None:
+            index = cache.load() if cache is not None else AssetIndex()
+
+        filters: dict[str, Any] = {"withExif": True}
+        if index.watermark:
+            self.logger.info("Refreshing Immich asset index with changes since %s...", index.watermark)
+            filters.update(updatedAfter=index.watermark, withDeleted=True)
+        else:
+            self.logger.info("Building Immich asset index...")
+
+        changed: list[IndexedAsset] = []
+        removed: list[str] = []
+        for api_asset in self.immich.iter_assets(page_size=self.config.immich_page_size, **filters):
+            if api_asset.get("isTrashed"):
+                index.remove(api_asset["id"])
+                removed.append(api_asset["id"])
+                continue
+            asset: IndexedAsset = IndexedAsset.from_api(api_asset)
+            index.add(asset)
+            changed.append(asset)
+
+        if cache is not None:
+            cache.store(changed, removed, index.watermark)
+            cache.close()
+        self.logger.info("Indexed %d Immich assets (%d changed, %d removed).", len(index), len(changed), len(removed))
+        return index
+
+    def _build_window_index(self) -> AssetIndex:
+        """Build an index of the Immich assets taken within the sync window.
+
+        One paginated `/search/metadata` query bounded by `takenAfter`/`takenBefore` replaces the per-item
+        searches, so the number of Immich requests grows with the window and not with the item count. The window
+        is widened by `match_window_margin` hours on both sides to absorb time zone differences between capture
+        times and the day granularity of the Google date filter.
+
+        :return: Index of the Immich assets taken within the window.
+        """
+        filters: dict[str, Any] = {"withExif": True}
+        if self.days_back > 0:
+            now: datetime.datetime = datetime.datetime.now(datetime.UTC)
+            margin: datetime.timedelta = datetime.timedelta(hours=self.config.match_window_margin)
+            filters["takenAfter"] = (now - datetime.timedelta(days=self.days_back) - margin).isoformat()
+            filters["takenBefore"] = (now + margin).isoformat()
+            self.logger.info(
+                "Fetching Immich assets taken between %s and %s...", filters["takenAfter"], filters["takenBefore"]
+            )
+        else:
+            self.logger.info("Fetching all Immich assets...")
+
+        index: AssetIndex = self._fetch_index(filters)
+        self.logger.info("Indexed %d Immich assets in the sync window.", len(index))
+        return index
+
+    def _fetch_index(self, filters: dict[str, Any]) -> AssetIndex:
+        """Build an index of the Immich assets matching the given search filters, skipping trashed assets.
+
+        :param filters: `/search/metadata` filters.
+        :return: Index of the matching assets.
+        """
+        index: AssetIndex = AssetIndex()
+        for api_asset in self.immich.iter_assets(page_size=self.config.immich_page_size, **filters):
+            if not api_asset.get("isTrashed"):
+                index.add(IndexedAsset.from_api(api_asset))
+        return index
+
+    def _sync_albums(self) -> None:
+        """Mirror the source albums into Immich albums.
+
+        Album members are matched against an index of the whole library, since albums are not limited to the
+        sync window: the run's index in `index` mode, otherwise a library index kept between runs and refreshed
+        like the `index` mode one (from `ASSET_CACHE_PATH` and with the changes since its watermark).
+        """
+        with SYNC_STAGE_SECONDS.time(stage="albums"):
+            index: AssetIndex
+            if self.config.match_mode == "index" and self.index is not None:
+                index = self.index
+            else:
+                self.library_index = index = self._build_index(self.library_index)
+
+            def resolve(record: MediaRecord) -> str | None:
+                candidates: list[IndexedAsset] = index.match(
+                    record.filename, record.checksum, record.creation_time, record.size
+                )
+                return candidates[0].id if len(candidates) == 1 else None
+
+            album_sync: AlbumSync = AlbumSync(
+                self.immich, batch_size=self.config.album_batch_size, dry_run=self.config.dry_run
+            )
+            album_sync.run(self.source.iter_albums(), resolve)
+
+    def _find_assets(self, filename: str, record: MediaRecord) -> list[IndexedAsset]:
+        """Find the candidate Immich assets for an item, using the local index when available.
+
+        The index matches by content checksum first and falls back to (file name, capture time, size). With the
+        `update_if_changed` strategy, a per-item search also returns the current description so no extra request
+        is needed to compare it.
+
+        :param filename: The file name to look up.
+        :param record: The source media record.
+        :return: Candidate assets; exactly one element means an unambiguous match.
+        """
+        if self.index is not None:
+            return self.index.match(filename, record.checksum, record.creation_time, record.size)
+
+        with_exif: bool = self.config.sync_strategy == "update_if_changed"
+        api_asset: dict[str, Any] | None = self.immich.search_asset_by_filename(filename, with_exif=with_exif)
+        return [IndexedAsset.from_api(api_asset)] if api_asset else []
+
+    async def _find_assets_async(self, filename: str, record: MediaRecord) -> list[IndexedAsset]:
+        """Find the candidate Immich assets for an item with the async client, using the index when available.
+
+        :param filename: The file name to look up.
+        :param record: The source media record.
+        :return: Candidate assets; exactly one element means an unambiguous match.
+        """
+        if self.index is not None:
+            return self._find_assets(filename, record)
+
+        with_exif: bool = self.config.sync_strategy == "update_if_changed"
+        api_asset: dict[str, Any] | None = await self.immich_async.search_asset_by_filename(
+            filename, with_exif=with_exif
+        )
+        if not api_asset:
+            return []
+        return [IndexedAsset.from_api(api_asset)]
+
+    def _count(self, key: str) -> None:
+        """Increment a sync statistics counter from any worker thread.
+
+        :param key: Name of the counter.
+        """
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _prepare_item(self, record: MediaRecord) -> tuple[str, str, dict[str, Any]] | None:
+        """Apply the checks to a source item that need no Immich request.
+
+        :param record: A media record from the source.
+        :return: Tuple of (item ID, file name, patch), or None if the item is skipped.
+        """
+        SYNC_ITEMS.inc(result="seen")
+        filename: str = record.filename
+        item_id: str = record.id or filename
+
+        if self.watermark is not None:
+            taken_at: str | None = normalize_timestamp(record.creation_time)
+            if self.watermark.is_done(item_id, taken_at):
+                self.logger.debug("Skipping %s (before the watermark)", filename)
+                SYNC_ITEMS.inc(result="skipped")
+                return None
+            self.watermark.observe(item_id, taken_at)
+
+        patch: dict[str, Any] = build_patch(record, self.sync_fields)
+        if not patch:
+            self.logger.debug("Skipping %s (no %s)", filename, "/".join(sorted(self.sync_fields)))
+            SYNC_ITEMS.inc(result="skipped")
+            self._record(item_id, "", RESULT_SKIPPED, journal=False)
+            return None
+
+        if self.journal is not None and self.journal.is_unchanged(item_id, patch_key(patch)):
+            self.logger.debug("Skipping %s (unchanged since last sync)", filename)
+            SYNC_ITEMS.inc(result="skipped")
+            self._record(item_id, patch_key(patch), RESULT_SKIPPED, journal=False)
+            return None
+
+        return item_id, filename, patch
+
+    def _process_item(self, record: MediaRecord) -> bool:
+        """Run the lookup → check → update chain for a single source item.
+
+        The method is safe to call from worker threads; it only reads shared state.
+
+        :param record: A media record from the source.
+        :return: True if the item was updated (or would be updated in dry-run mode), False otherwise.
+        """
+        prepared: tuple[str, str, dict[str, Any]] | None = self._prepare_item(record)
+        if prepared is None:
+            return False
+        item_id, filename, patch = prepared
+
+        with SYNC_STAGE_SECONDS.time(stage="lookup"):
+            candidates: list[IndexedAsset] = self._find_assets(filename, record)
+        if len(candidates) != 1:
+            return self._handle_unmatched(item_id, filename, patch_key(patch), len(candidates))
+        asset: IndexedAsset = candidates[0]
+
+        if self.config.sync_strategy == "skip_if_present" and self.immich.get_asset_description(asset.id):
+            return self._handle_present(item_id, filename, patch_key(patch))
+
+        changes: dict[str, Any] | None = self._changes(asset, item_id, filename, patch)
+        if changes is None:
+            return False
+
+        if self.config.dry_run:
+            return self._handle_dry_run(asset, filename, changes)
+
+        return self._update(asset, changes, item_id=item_id, filename=filename, key=patch_key(patch))
+
+    def _update(self, asset: IndexedAsset, changes: dict[str, Any], *, item_id: str, filename: str, key: str) -> bool:
+        """Write the changes to an asset, or queue them for a bulk update.
+
+        :param asset: The matching Immich asset.
+        :param changes: The fields to write.
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param key: Journal content of the synchronized patch.
+        :return: True if the asset was updated, False if it failed or was queued (a queued update is counted
+            when its batch is sent, see `_handle_bulk_update`).
+        """
+        if is_bulk(changes):
+            batch: BulkBatch | None = self._queue_bulk(asset.id, item_id, filename, changes, key)
+            if batch is not None:
+                self._flush_bulk_batch(batch)
+            return False
+
+        with SYNC_STAGE_SECONDS.time(stage="update"):
+            success: bool = self.immich.update_asset(asset.id, changes)
+        return self._handle_update(success, asset, changes, item_id=item_id, filename=filename, key=key)
+
+    async def _process_item_async(self, record: MediaRecord) -> bool:
+        """Run the lookup → check → update chain for a single item with the async Immich client.
+
+        :param record: A media record from the source.
+        :return: True if the item was updated (or would be updated in dry-run mode), False otherwise.
+        """
+        prepared: tuple[str, str, dict[str, Any]] | None = self._prepare_item(record)
+        if prepared is None:
+            return False
+        item_id, filename, patch = prepared
+
+        with SYNC_STAGE_SECONDS.time(stage="lookup"):
+            candidates: list[IndexedAsset] = await self._find_assets_async(filename, record)
+        if len(candidates) != 1:
+            return self._handle_unmatched(item_id, filename, patch_key(patch), len(candidates))
+        asset: IndexedAsset = candidates[0]
+
+        if self.config.sync_strategy == "skip_if_present" and await self.immich_async.get_asset_description(asset.id):
+            return self._handle_present(item_id, filename, patch_key(patch))
+
+        changes: dict[str, Any] | None = self._changes(asset, item_id, filename, patch)
+        if changes is None:
+            return False
+
+        if self.config.dry_run:
+            return self._handle_dry_run(asset, filename, changes)
+
+        return await self._update_async(asset, changes, item_id=item_id, filename=filename, key=patch_key(patch))
+
+    async def _update_async(
+        self, asset: IndexedAsset, changes: dict[str, Any], *, item_id: str, filename: str, key: str
+    ) -> bool:
+        """Write the changes to an asset with the async client, or queue them for a bulk update.
+
+        :param asset: The matching Immich asset.
+        :param changes: The fields to write.
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param key: Journal content of the synchronized patch.
+        :return: True if the asset was updated, False if it failed or was queued (a queued update is counted
+            when its batch is sent, see `_handle_bulk_update`).
+        """
+        if is_bulk(changes):
+            batch: BulkBatch | None = self._queue_bulk(asset.id, item_id, filename, changes, key)
+            if batch is not None:
+                await self._flush_bulk_batch_async(batch)
+            return False
+
+        with SYNC_STAGE_SECONDS.time(stage="update"):
+            success: bool = await self.immich_async.update_asset(asset.id, changes)
+        return self._handle_update(success, asset, changes, item_id=item_id, filename=filename, key=key)
+
+    def _handle_unmatched(self, item_id: str, filename: str, key: str, candidates: int) -> bool:
+        """Handle an item without exactly one matching Immich asset.
+
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param key: Journal content of the patch to synchronize.
+        :param candidates: Number of candidate assets found (0 = not found, more = ambiguous).
+        :return: Always False (nothing updated).
+        """
+        if candidates:
+            self.logger.warning("Ambiguous match in Immich: %s (%d candidates)", filename, candidates)
+            self._count("ambiguous")
+            SYNC_ITEMS.inc(result="ambiguous")
+        else:
+            self.logger.warning("Not found in Immich: %s", filename)
+            SYNC_ITEMS.inc(result="not_found")
+        self._record(item_id, key, RESULT_NOT_FOUND)
+        return False
+
+    def _handle_present(self, item_id: str, filename: str, key: str) -> bool:
+        """Handle an item skipped because Immich already has a description (`skip_if_present`).
+
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param key: Journal content of the patch to synchronize.
+        :return: Always False (nothing updated).
+        """
+        self.logger.info("Skipping %s - already has description in Immich", filename)
+        SYNC_ITEMS.inc(result="skipped")
+        self._record(item_id, key, RESULT_SKIPPED)
+        return False
+
+    def _changes(
+        self, asset: IndexedAsset, item_id: str, filename: str, patch: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Select the fields to write: all of them, or only those Immich does not hold (`update_if_changed`).
+
+        The fields are adapted to the asset fields of the Immich release (see `asset_fields`).
+
+        :param asset: The matching Immich asset.
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param patch: Fields to synchronize.
+        :return: The fields to write, or None if the write can be skipped.
+        """
+        changes: dict[str, Any] = patch
+        if self.config.sync_strategy == "update_if_changed":
+            changes = changed_fields(patch, asset)
+        changes = asset_fields(changes, asset)
+        if changes:
+            return changes
+
+        self.logger.debug("Skipping %s (unchanged in Immich)", filename)
+        SYNC_ITEMS.inc(result="skipped")
+        self._count("unchanged")
+        self._record(item_id, patch_key(patch), RESULT_SKIPPED)
+        return None
+
+    def _count_change(self, asset: IndexedAsset, changes: dict[str, Any]) -> None:
+        """Count a description write as created or changed (`update_if_changed` strategy only).
+
+        :param asset: The matching Immich asset, before its description is replaced.
+        :param changes: The fields written.
+        """
+        if self.config.sync_strategy == "update_if_changed" and "description" in changes:
+            self._count("changed" if asset.description else "created")
+
+    def _handle_dry_run(self, asset: IndexedAsset, filename: str, changes: dict[str, Any]) -> bool:
+        """Log the update that would be made in dry-run mode.
+
+        :param asset: The matching Immich asset.
+        :param filename: File name of the item.
+        :param changes: The fields that would be written.
+        :return: Always True (counted as updated).
+        """
+        self.logger.info("[DRY-RUN] Would update: %s → %s", filename, describe(changes))
+        SYNC_ITEMS.inc(result="dry_run")
+        self._count_change(asset, changes)
+        return True
+
+    def _handle_update(  # noqa: PLR0913
+        self, success: bool, asset: IndexedAsset, changes: dict[str, Any], *, item_id: str, filename: str, key: str
+    ) -> bool:
+        """Handle the result of an asset update.
+
+        :param success: Whether Immich accepted the update.
+        :param asset: The updated Immich asset.
+        :param changes: The fields that were written.
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param key: Journal content of the synchronized patch.
+        :return: True if the asset was updated, False otherwise.
+        """
+        if success:
+            self.logger.info("Updated: %s", filename)
+            SYNC_ITEMS.inc(result="updated")
+            self._count_change(asset, changes)
+            if "description" in changes:
+                asset.description = changes["description"]
+            if "dateTimeOriginal" in changes:
+                asset.taken_at = changes["dateTimeOriginal"]
+            self._record(item_id, key, RESULT_UPDATED)
+            return True
+
+        self.logger.error("Failed to update: %s", filename)
+        SYNC_ITEMS.inc(result="failed")
+        self._record(item_id, key, RESULT_FAILED)
+        return False
+
+    def _queue_bulk(
+        self, asset_id: str, item_id: str, filename: str, changes: dict[str, Any], key: str
+    ) -> BulkBatch | None:
+        """Queue a flag-only update for the bulk asset update, grouped by the fields written.
+
+        :param asset_id: The matching Immich asset ID.
+        :param item_id: Source item ID.
+        :param filename: File name of the item.
+        :param changes: The fields to write (see `is_bulk`).
+        :param key: Journal content of the synchronized patch.
+        :return: A full batch the caller has to send, or None.
+        """
+        fields: tuple[tuple[str, Any], ...] = tuple(sorted(changes.items()))
+        with self._bulk_lock:
+            queued: list[BulkEntry] = self._bulk_updates.setdefault(fields, [])
+            queued.append((asset_id, item_id, filename, key))
+            if len(queued) < BULK_UPDATE_SIZE:
+                return None
+            return fields, self._bulk_updates.pop(fields)
+
+    def _take_bulk_batches(self) -> list[BulkBatch]:
+        """Take all queued bulk updates.
+
+        :return: Batches of (fields, entries).
+        """
+        with self._bulk_lock:
+            batches: list[BulkBatch] = list(self._bulk_updates.items())
+            self._bulk_updates.clear()
+        return batches
+
+    def _flush_bulk_batch(self, batch: BulkBatch) -> None:
+        """Send one bulk update batch.
+
+        :param batch: Tuple of (fields, entries).
+        """
+        fields, entries = batch
+        with SYNC_STAGE_SECONDS.time(stage="update"):
+            success: bool = self.immich.update_assets([entry[0] for entry in entries], dict(fields))
+        self._handle_bulk_update(success, entries)
+
+    async def _flush_bulk_batch_async(self, batch: BulkBatch) -> None:
+        """Send one bulk update batch with the async client.
+
+        :param batch: Tuple of (fields, entries).
+        """
+        fields, entries = batch
+        with SYNC_STAGE_SECONDS.time(stage="update"):
+            success: bool = await self.immich_async.update_assets([entry[0] for entry in entries], dict(fields))
+        self._handle_bulk_update(success, entries)
+
+    def _handle_bulk_update(self, success: bool, entries: list[BulkEntry]) -> None:
+        """Handle the result of a bulk update, counting the entries as updated only if Immich accepted it.
+
+        :param success: Whether Immich accepted the update.
+        :param entries: The (asset ID, item ID, file name, journal content) entries of the batch.
+        """
+        if success:
+            with self._bulk_lock:
+                self._bulk_updated += len(entries)
+        for _, item_id, filename, key in entries:
+            if success:
+                self.logger.info("Updated: %s", filename)
+                SYNC_ITEMS.inc(result="updated")
+                self._record(item_id, key, RESULT_UPDATED)
+            else:
+                self.logger.error("Failed to update: %s", filename)
+                SYNC_ITEMS.inc(result="failed")
+                self._record(item_id, key, RESULT_FAILED)
+
+    def _record(self, item_id: str, key: str, result: str, journal: bool = True) -> None:
+        """Record the result of syncing an item in the journal and the watermark, if enabled.
+
+        :param item_id: Source item ID.
+        :param key: Journal content of the synchronized patch (see `patch_key`).
+        :param result: One of the journal `RESULT_*` constants.
+        :param journal: Whether to write a journal entry (False for items skipped before any Immich lookup).
+        """
+        if journal and self.journal is not None:
+            self.journal.record(item_id, key, result)
+        if self.watermark is not None:
+            self.watermark.complete(item_id, result in DONE_RESULTS)
@@ -0,0 +1,480 @@
+"""Google Takeout archive reader yielding photo metadata from JSON sidecars."""
+
+import base64
+import datetime
+import hashlib
+import itertools
+import os
+import pickle
+import re
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from logging import Logger
+from typing import IO, Any
+
+from app import codec
+from app.log import get_logger
+from app.media_record import MediaRecord
+from app.metrics import SOURCE_PAGES
+
+ARCHIVE_SUFFIXES: tuple[str, ...] = (".zip", ".tgz", ".tar.gz")
+SIDECAR_SUFFIX: str = ".json"
+SUPPLEMENTAL_SIDECAR_SUFFIX: str = ".supplemental-metadata.json"
+MAX_SIDECAR_SIZE: int = 1024 * 1024  # sidecars are a few KB; anything larger is not photo metadata
+HASH_CHUNK_SIZE: int = 1024 * 1024
+DUPLICATE_SUFFIX: re.Pattern[str] = re.compile(r"^(?P<stem>.+)(?P<ext>\.[^./]+)(?P<counter>\(\d+\))$")
+ALBUM_METADATA_NAME: str = "metadata.json"
+YEAR_FOLDER: re.Pattern[str] = re.compile(r"(^|/)Photos from \d{4}$")  # date folders are not albums
+SCAN_CHUNK_SIZE: int = 500  # records pickled to a spool file at once
+
+MediaInfo = tuple[str, int]  # (base64 SHA-1 checksum as stored by Immich, size in bytes)
+
+
+def media_name_for(sidecar_name: str) -> str:
+    """Derive the archive path of the media file described by a sidecar.
+
+    Takeout names duplicates `IMG.jpg(1).json` for the media file `IMG(1).jpg`.
+
+    :param sidecar_name: Archive path of the sidecar.
+    :return: Archive path of the media file.
+    """
+    suffix: str = SUPPLEMENTAL_SIDECAR_SUFFIX if sidecar_name.endswith(SUPPLEMENTAL_SIDECAR_SUFFIX) else SIDECAR_SUFFIX
+    media_name: str = sidecar_name[: -len(suffix)]
+    duplicate: re.Match[str] | None = DUPLICATE_SUFFIX.match(media_name)
+    if duplicate:
+        media_name = f"{duplicate['stem']}{duplicate['counter']}{duplicate['ext']}"
+    return media_name
+
+
+def hash_media(stream: IO[bytes]) -> MediaInfo:
+    """Hash a media file the way Immich computes asset checksums, reading it in chunks.
+
+    :param stream: Binary stream of the media file.
+    :return: Tuple of (base64 SHA-1 checksum, size in bytes).
+    """
+    digest = hashlib.sha1(usedforsecurity=False)  # Immich identifies assets by their SHA-1
+    size: int = 0
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    return base64.b64encode(digest.digest()).decode("ascii"), size
+
+
+@dataclass(slots=True)
+class SidecarTime:
+    """Timestamp block of a Takeout sidecar."""
+
+    timestamp: str | int
+
+
+@dataclass(slots=True)
+class SidecarGeo:
+    """GPS block of a Takeout sidecar; Takeout writes 0, 0 for an unknown position."""
+
+    latitude: float = 0.0
+    longitude: float = 0.0
+
+
+@dataclass(slots=True)
+class Sidecar:
+    """The fields of a Takeout JSON sidecar read by the sync, named after its JSON keys for typed decoding."""
+
+    title: str
+    description: str | None = None
+    photoTakenTime: SidecarTime | None = None  # noqa: N815
+    creationTime: SidecarTime | None = None  # noqa: N815
+    geoData: SidecarGeo | None = None  # noqa: N815
+    geoDataExif: SidecarGeo | None = None  # noqa: N815
+    favorited: bool = False
+    archived: bool = False
+
+    @staticmethod
+    def from_dict(value: Any) -> "Sidecar":
+        """Build a sidecar from decoded JSON, for backends without typed decoding.
+
+        :param value: The decoded document.
+        :return: The sidecar.
+        :raises ValueError: If the document is not a sidecar object.
+        """
+        if not isinstance(value, dict) or not isinstance(value.get("title"), str):
+            raise ValueError("Not a Takeout sidecar")
+        description: Any = value.get("description")
+        return Sidecar(
+            title=value["title"],
+            description=description if isinstance(description, str) else None,
+            photoTakenTime=_sidecar_time(value.get("photoTakenTime")),
+            creationTime=_sidecar_time(value.get("creationTime")),
+            geoData=_sidecar_geo(value.get("geoData")),
+            geoDataExif=_sidecar_geo(value.get("geoDataExif")),
+            favorited=value.get("favorited") is True,
+            archived=value.get("archived") is True,
+        )
+
+
+def _sidecar_time(value: Any) -> SidecarTime | None:
+    """Build a sidecar timestamp block from decoded JSON.
+
+    :param value: The decoded block.
+    :return: The timestamp block, or None if it is missing or malformed.
+    """
+    if isinstance(value, dict) and isinstance(value.get("timestamp"), str | int):
+        return SidecarTime(value["timestamp"])
+    return None
+
+
+def _sidecar_geo(value: Any) -> SidecarGeo | None:
+    """Build a sidecar GPS block from decoded JSON.
+
+    :param value: The decoded block.
+    :return: The GPS block, or None if it is missing or malformed.
+    """
+    if not isinstance(value, dict):
+        return None
+    latitude: Any = value.get("latitude", 0.0)
+    longitude: Any = value.get("longitude", 0.0)
+    if isinstance(latitude, int | float) and isinstance(longitude, int | float):
+        return SidecarGeo(float(latitude), float(longitude))
+    return None
+
+
+def parse_sidecar(member_name: str, data: bytes, media: MediaInfo | None = None) -> MediaRecord | None:
+    """Parse a Takeout JSON sidecar into a media record.
+
+    :param member_name: Path of the sidecar inside the archive, used as a stable item ID.
+    :param data: Raw sidecar content.
+    :param media: Checksum and size of the described media file, when hashed.
+    :return: Media record, or None if the file is not a photo sidecar.
+    """
+    try:
+        sidecar: Sidecar = codec.decode(data, Sidecar, Sidecar.from_dict)
+        taken: SidecarTime | None = sidecar.photoTakenTime or sidecar.creationTime
+        if taken is None:
+            return None  # album metadata.json and other non-photo JSON files
+        taken_at: datetime.datetime = datetime.datetime.fromtimestamp(int(taken.timestamp), datetime.UTC)
+    except (ValueError, OverflowError, OSError):
+        return None  # malformed JSON or timestamp, e.g. out of the platform's time range
+
+    creation_time: str = taken_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    latitude, longitude = parse_location(sidecar)
+    return MediaRecord(
+        id=member_name,
+        filename=sidecar.title,
+        description=sidecar.description or None,
+        creation_time=creation_time,
+        checksum=media[0] if media else None,
+        size=media[1] if media else None,
+        latitude=latitude,
+        longitude=longitude,
+        favorite=sidecar.favorited,
+        archived=sidecar.archived,
+    )
+
+
+def parse_location(sidecar: Sidecar) -> tuple[float | None, float | None]:
+    """Read the GPS position of a sidecar, preferring the one edited in Google Photos over the EXIF one.
+
+    :param sidecar: Parsed sidecar.
+    :return: Tuple of (latitude, longitude); (None, None) when unknown (Takeout writes 0, 0).
+    """
+    for geo in (sidecar.geoData, sidecar.geoDataExif):
+        if geo is not None and (geo.latitude or geo.longitude):
+            return geo.latitude, geo.longitude
+    return None, None
+
+
+def parse_album_metadata(member_name: str, data: bytes) -> str | None:
+    """Parse the `metadata.json` of a Takeout album folder.
+
+    :param member_name: Path of the file inside the archive.
+    :param data: Raw file content.
+    :return: Album title, or None if the file is not album metadata.
+    """
+    if member_name.rpartition("/")[2] != ALBUM_METADATA_NAME:
+        return None
+    try:
+        metadata: Any = codec.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(metadata, dict) or "photoTakenTime" in metadata or not metadata.get("title"):
+        return None
+    title: str = metadata["title"]
+    return title
+
+
+def iter_zip_sidecars(path: str, with_media: bool = False) -> Iterator[tuple[str, bytes, MediaInfo | None]]:
+    """Iterate over JSON sidecars in a zip archive, optionally hashing the media file each one describes.
+
+    :param path: Path to the zip archive.
+    :param with_media: Hash the media file of every sidecar (streamed, never extracted to disk).
+    :return: Iterator over (member name, content, media info) tuples.
+    """
+    with zipfile.ZipFile(path) as archive:
+        names: set[str] = set(archive.namelist()) if with_media else set()
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(SIDECAR_SUFFIX) or info.file_size > MAX_SIDECAR_SIZE:
+                continue
+            with archive.open(info) as member:
+                data: bytes = member.read()
+            media: MediaInfo | None = None
+            media_name: str = media_name_for(info.filename)
+            if media_name in names:
+                with archive.open(media_name) as media_member:
+                    media = hash_media(media_member)
+            yield info.filename, data, media
+
+
+def iter_tar_sidecars(path: str, with_media: bool = False) -> Iterator[tuple[str, bytes, MediaInfo | None]]:
+    """Iterate over JSON sidecars in a (compressed) tar archive in a single streaming pass.
+
+    Media members are decompressed and skipped (or hashed) in stream mode, never written to disk nor held in
+    memory. As sidecars and media files come in any order, whichever arrives first waits for its partner; a
+    sidecar whose media file is in another archive part is yielded without media info at the end.
+
+    :param path: Path to the tar archive.
+    :param with_media: Hash the media file of every sidecar.
+    :return: Iterator over (member name, content, media info) tuples.
+    """
+    waiting_sidecars: dict[str, tuple[str, bytes]] = {}
+    waiting_media: dict[str, MediaInfo] = {}
+    with tarfile.open(path, mode="r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            is_sidecar: bool = info.name.endswith(SIDECAR_SUFFIX) and info.size <= MAX_SIDECAR_SIZE
+            if not is_sidecar and not with_media:
+                continue
+            member = archive.extractfile(info)
+            if member is None:
+                continue
+
+            if not is_sidecar:
+                media: MediaInfo = hash_media(member)
+                if info.name in waiting_sidecars:
+                    yield *waiting_sidecars.pop(info.name), media
+                else:
+                    waiting_media[info.name] = media
+            elif not with_media:
+                yield info.name, member.read(), None
+            else:
+                media_name: str = media_name_for(info.name)
+                if media_name in waiting_media:
+                    yield info.name, member.read(), waiting_media.pop(media_name)
+                else:
+                    waiting_sidecars[media_name] = (info.name, member.read())
+
+    for sidecar_name, data in waiting_sidecars.values():
+        yield sidecar_name, data, None
+
+
+def scan_archive(path: str, with_media: bool = False, titles: dict[str, str] | None = None) -> Iterator[MediaRecord]:
+    """Iterate over photo metadata stored in a single Takeout archive.
+
+    :param path: Path to a `.zip`, `.tgz` or `.tar.gz` Takeout archive.
+    :param with_media: Add the checksum and size of the media file described by each sidecar.
+    :param titles: If given, filled with the album title of every folder that has a `metadata.json`.
+    :return: Iterator over media records.
+    """
+    for member_name, data, media in iter_sidecars(path, with_media):
+        if titles is not None and (title := parse_album_metadata(member_name, data)) is not None:
+            titles[member_name.rpartition("/")[0]] = title
+            continue
+        record: MediaRecord | None = parse_sidecar(member_name, data, media)
+        if record is not None:
+            yield record
+
+
+def iter_sidecars(path: str, with_media: bool = False) -> Iterator[tuple[str, bytes, MediaInfo | None]]:
+    """Iterate over the JSON sidecars of a zip or (compressed) tar archive.
+
+    :param path: Path to a `.zip`, `.tgz` or `.tar.gz` Takeout archive.
+    :param with_media: Hash the media file of every sidecar.
+    :return: Iterator over (member name, content, media info) tuples.
+    """
+    return iter_zip_sidecars(path, with_media) if path.endswith(".zip") else iter_tar_sidecars(path, with_media)
+
+
+def spool_archive(path: str, with_media: bool, spool_path: str) -> tuple[int, dict[str, str]]:
+    """Scan a Takeout archive in a worker process, spooling its photo metadata to a file in pickled chunks.
+
+    The worker never waits for the reader, so all parts are scanned at full speed, while the reader (and this
+    worker) hold at most one chunk of records in memory.
+
+    :param path: Path to a Takeout archive.
+    :param with_media: Add the checksum and size of the media file described by each sidecar.
+    :param spool_path: File receiving lists of up to `SCAN_CHUNK_SIZE` media records in archive order.
+    :return: Tuple of (number of media records, album title per folder).
+    """
+    titles: dict[str, str] = {}
+    count: int = 0
+    records: Iterator[MediaRecord] = scan_archive(path, with_media, titles)
+    with open(spool_path, "wb") as spool:
+        while chunk := list(itertools.islice(records, SCAN_CHUNK_SIZE)):
+            pickle.dump(chunk, spool, pickle.HIGHEST_PROTOCOL)
+            count += len(chunk)
+    return count, titles
+
+
+def replay_spool(spool_path: str) -> Iterator[MediaRecord]:
+    """Read back the records spooled by `spool_archive`, one chunk at a time.
+
+    :param spool_path: The spool file of an archive part.
+    :return: Iterator over media records in archive order.
+    """
+    with open(spool_path, "rb") as spool:
+        while True:
+            try:
+                chunk: list[MediaRecord] = pickle.load(spool)  # written by our own worker
+            except EOFError:
+                return
+            yield from chunk
+
+
+class TakeoutClient:
+    """Metadata source reading Google Takeout archives."""
+
+    paths: list[str]
+    workers: int
+    hash_media: bool
+    collect_albums: bool
+    album_titles: dict[str, str]
+    album_items: dict[str, list[str]]
+    logger: Logger
+    _album_records: dict[str, MediaRecord]
+    _albums_scanned: bool
+
+    def __init__(
+        self, paths: list[str], workers: int = 1, hash_media: bool = False, collect_albums: bool = False
+    ) -> None:
+        """Initialize the Takeout client.
+
+        :param paths: Takeout archive files or directories containing archive parts.
+        :param workers: Number of processes scanning archive parts in parallel (1 = scan in this process).
+        :param hash_media: Compute Immich-compatible checksums of the media files for exact matching.
+        :param collect_albums: Record album membership while scanning, for `iter_albums`.
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.paths = paths
+        self.workers = workers
+        self.hash_media = hash_media
+        self.collect_albums = collect_albums
+        self.album_titles = {}
+        self.album_items = {}
+        self._album_records = {}
+        self._albums_scanned = False
+
+    def list_archives(self) -> list[str]:
+        """Resolve the configured paths to a sorted list of archive files.
+
+        :return: Sorted list of archive paths.
+        """
+        archives: list[str] = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                archives.extend(
+                    os.path.join(path, name) for name in os.listdir(path) if name.endswith(ARCHIVE_SUFFIXES)
+                )
+            elif os.path.isfile(path):
+                archives.append(path)
+            else:
+                self.logger.warning("Takeout path does not exist: %s", path)
+        return sorted(archives)
+
+    def iter_media_items(self, days_back: int) -> Iterator[MediaRecord]:
+        """Iterate over photo metadata from all Takeout archives.
+
+        With `collect_albums`, the album membership of the whole export (not only of the yielded window) is recorded
+        along the way, so `iter_albums` needs no second pass over the archives.
+
+        :param days_back: Only yield items taken within this many days; 0 yields the whole export.
+        :return: Iterator over media records.
+        """
+        start_date: str | None = None
+        if days_back > 0:
+            start: datetime.datetime = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=days_back)
+            start_date = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        self.album_titles = {}
+        self.album_items = {}
+        self._album_records = {}
+        self._albums_scanned = False
+        archives: list[str] = self.list_archives()
+        for record in self._scan_archives(archives):
+            if self.collect_albums:
+                self._add_album_member(record)
+            if start_date is None or (record.creation_time and record.creation_time >= start_date):
+                yield record
+        self._albums_scanned = self.collect_albums
+
+    def _add_album_member(self, record: MediaRecord) -> None:
+        """Record the album folder of a scanned item; items in the per-year date folders are in no album.
+
+        :param record: A scanned media record, whose ID is the sidecar path in the archive.
+        """
+        folder: str = record.id.rpartition("/")[0]
+        if YEAR_FOLDER.search(folder):
+            return
+        self.album_items.setdefault(folder, []).append(record.id)
+        self._album_records[record.id] = record
+
+    def _scan_archives(self, archives: list[str]) -> Iterator[MediaRecord]:
+        """Scan archives sequentially, or on a process pool when several workers are configured.
+
+        Parallel results are merged back in archive order, so the stream is the same in both modes. Every worker
+        spools its part to a temporary file and moves on to the next part without waiting for the reader, which
+        replays the files in archive order; the time to ingest the export is that of the slowest worker, and
+        memory stays bounded by one chunk per process. Closing the stream early cancels the parts not started yet.
+
+        :param archives: Archive paths to scan.
+        :return: Iterator over media records.
+        """
+        titles: dict[str, str] | None = self.album_titles if self.collect_albums else None
+        if self.workers <= 1 or len(archives) <= 1:
+            for archive in archives:
+                self.logger.info("Scanning Takeout archive %s", archive)
+                yield from scan_archive(archive, self.hash_media, titles)
+                SOURCE_PAGES.inc(source="takeout")
+            return
+
+        workers: int = min(self.workers, len(archives))
+        self.logger.info("Scanning %d Takeout archives with %d processes", len(archives), workers)
+        with tempfile.TemporaryDirectory(prefix="takeout-scan-") as spool_dir:
+            executor: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=workers)
+            try:
+                parts: list[tuple[str, str, Future[tuple[int, dict[str, str]]]]] = []
+                for number, archive in enumerate(archives):
+                    spool_path: str = os.path.join(spool_dir, f"{number:05d}.pickle")
+                    parts.append(
+                        (archive, spool_path, executor.submit(spool_archive, archive, self.hash_media, spool_path))
+                    )
+                for archive, spool_path, future in parts:
+                    count, archive_titles = future.result()
+                    self.logger.info("Scanned Takeout archive %s (%d items)", archive, count)
+                    SOURCE_PAGES.inc(source="takeout")
+                    if titles is not None:
+                        titles.update(archive_titles)
+                    yield from replay_spool(spool_path)
+                    os.remove(spool_path)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def iter_albums(self) -> Iterator[dict[str, Any]]:
+        """Iterate over the albums of all Takeout archives with the metadata of their photos.
+
+        Albums come from the membership recorded by the last complete `iter_media_items` scan; without one (or
+        without `collect_albums`), the archives are scanned here once, and membership is collected from then on.
+
+        :return: Iterator over albums as {"id", "title", "items"} dictionaries, keyed by album folder.
+        """
+        if not self._albums_scanned:
+            self.collect_albums = True
+            for _ in self.iter_media_items(0):
+                pass
+
+        self.logger.info("Found %d albums in the Takeout archives", len(self.album_titles))
+        for folder in sorted(self.album_titles):
+            items: list[MediaRecord] = [self._album_records[item_id] for item_id in self.album_items.get(folder, [])]
+            yield {"id": folder, "title": self.album_titles[folder], "items": items}
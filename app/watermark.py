@@ -0,0 +1,189 @@
+"""High-water mark of the source items already synchronized, persisted between runs."""
+
+import datetime
+import json
+import math
+import os
+import threading
+from logging import Logger
+from typing import Any
+
+from app.log import get_logger
+
+TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%SZ"  # same format as `normalize_timestamp`, so strings compare in time order
+
+
+def parse_time(value: str) -> datetime.datetime:
+    """Parse a watermark timestamp.
+
+    :param value: Timestamp formatted as "YYYY-MM-DDTHH:MM:SSZ".
+    :return: Timezone-aware UTC datetime.
+    """
+    return datetime.datetime.strptime(value, TIME_FORMAT).replace(tzinfo=datetime.UTC)
+
+
+class SyncWatermark:
+    """Creation time up to which all source items are synchronized, plus the item IDs seen at that time.
+
+    During a run, every item is observed when it is picked up and completed with its result. Only a complete run
+    advances the watermark, to the newest completed item; an item that could not be synchronized (not found in
+    Immich yet, ambiguous, or a failed update) holds it back so the item is retried, but never further back than
+    the retry floor.
+    """
+
+    path: str
+    overlap: datetime.timedelta
+    read_only: bool
+    time: str | None
+    ids: frozenset[str]
+    logger: Logger
+    _newest: str | None
+    _newest_ids: set[str]
+    _held: str | None
+    _held_count: int
+    _pending: dict[str, str]
+    _lock: threading.Lock
+
+    def __init__(self, path: str, overlap_hours: float = 0.0, read_only: bool = False) -> None:
+        """Load the watermark.
+
+        :param path: Path to the watermark JSON file.
+        :param overlap_hours: Hours before the watermark that are processed again, for late-arriving edits.
+        :param read_only: Only filter items, never advance the stored watermark (dry-run mode).
+        """
+        self.logger = get_logger(self.__class__.__name__)
+        self.path = path
+        self.overlap = datetime.timedelta(hours=overlap_hours)
+        self.read_only = read_only
+        self.time = None
+        self.ids = frozenset()
+        self._newest = None
+        self._newest_ids = set()
+        self._held = None
+        self._held_count = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        """Read the stored watermark, if any."""
+        try:
+            with open(self.path, encoding="utf-8") as watermark_file:
+                stored: dict[str, Any] = json.load(watermark_file)
+            self.time = stored["time"]
+            parse_time(stored["time"])
+            self.ids = frozenset(stored.get("ids", []))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning("Ignoring unreadable watermark %s: %s", self.path, e)
+            self.time = None
+            self.ids = frozenset()
+
+    @property
+    def since(self) -> str | None:
+        """Return the creation time from which items are processed.
+
+        :return: The watermark minus the overlap, or None if there is no watermark yet.
+        """
+        if self.time is None:
+            return None
+        return (parse_time(self.time) - self.overlap).strftime(TIME_FORMAT)
+
+    def days_back(self, default: int) -> int:
+        """Return the number of days the source has to be fetched for.
+
+        :param default: Configured `DAYS_BACK`, used while there is no watermark yet.
+        :return: Whole days covering everything since the watermark minus the overlap.
+        """
+        since: str | None = self.since
+        if since is None:
+            return default
+        elapsed: datetime.timedelta = datetime.datetime.now(datetime.UTC) - parse_time(since)
+        return max(1, math.ceil(elapsed / datetime.timedelta(days=1)))
+
+    def is_done(self, item_id: str, taken_at: str | None) -> bool:
+        """Check whether an item was already synchronized by an earlier run.
+
+        :param item_id: Source item ID.
+        :param taken_at: Normalized creation time of the item.
+        :return: True if the item lies before the processed range.
+        """
+        since: str | None = self.since
+        if since is None or taken_at is None:
+            return False
+        if taken_at < since:
+            return True
+        return not self.overlap and taken_at == self.time and item_id in self.ids
+
+    def observe(self, item_id: str, taken_at: str | None) -> None:
+        """Register an item picked up by the current run.
+
+        :param item_id: Source item ID.
+        :param taken_at: Normalized creation time of the item; items without one do not move the watermark.
+        """
+        if self.read_only or taken_at is None:
+            return
+        with self._lock:
+            self._pending[item_id] = taken_at
+
+    def complete(self, item_id: str, done: bool) -> None:
+        """Register the result of an observed item.
+
+        :param item_id: Source item ID.
+        :param done: True if the item is synchronized (or needs no sync), False if it has to be retried.
+        """
+        with self._lock:
+            taken_at: str | None = self._pending.pop(item_id, None)
+            if taken_at is None:
+                return
+            if not done:
+                self._held_count += 1
+                if self._held is None or taken_at < self._held:
+                    self._held = taken_at
+            elif self._newest is None or taken_at > self._newest:
+                self._newest = taken_at
+                self._newest_ids = {item_id}
+            elif taken_at == self._newest:
+                self._newest_ids.add(item_id)
+
+    def commit(self, floor: str | None = None) -> None:
+        """Advance and store the watermark after a complete run.
+
+        :param floor: Oldest time a held-back item may pin the watermark to (e.g. the `DAYS_BACK` window start).
+        """
+        if self.read_only:
+            return
+        time: str | None = self.time
+        ids: set[str] = set(self.ids)
+        if self._newest is not None and (time is None or self._newest >= time):
+            ids = ids | self._newest_ids if self._newest == time else set(self._newest_ids)
+            time = self._newest
+
+        if self._held is not None and time is not None:
+            held: str = max(self._held, floor) if floor else self._held
+            if held <= time:
+                self.logger.warning(
+                    "Holding back the watermark at %s for %d items not synchronized yet.", held, self._held_count
+                )
+                time, ids = held, set()
+
+        if time is None or (time == self.time and ids == self.ids):
+            return
+        self._store(time, ids)
+        self.time, self.ids = time, frozenset(ids)
+        self.logger.info("Stored watermark %s.", time)
+
+    def _store(self, time: str, ids: set[str]) -> None:
+        """Atomically write the watermark file.
+
+        :param time: Watermark creation time.
+        :param ids: IDs of the synchronized items taken exactly at that time.
+        """
+        directory: str = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path: str = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as watermark_file:
+            json.dump({"time": time, "ids": sorted(ids)}, watermark_file)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1 @@
+"""Throughput benchmarks for the sync against a local Immich stand-in server."""
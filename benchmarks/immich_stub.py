@@ -0,0 +1,283 @@
+"""Local HTTP stand-in for the Immich endpoints used by `ImmichClient`.
+
+The library is generated on demand from photo numbers (see `benchmarks.synthetic`), so even a million-asset
+library costs no memory until descriptions are written.
+"""
+
+import datetime
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from benchmarks.synthetic import ASSET_INTERVAL, make_asset, photo_number
+
+ASSET_ID_PREFIX: str = "00000000-0000-4000-8000-"
+
+
+class StubLibrary:
+    """Synthetic Immich library with the descriptions written during a benchmark."""
+
+    size: int
+    base_time: datetime.datetime
+    latency: float
+    error_rate: float
+    descriptions: dict[int, str]
+    requests: int
+    errors: int
+    _random: random.Random
+    _lock: threading.Lock
+
+    def __init__(
+        self, size: int, base_time: datetime.datetime, *, latency: float = 0.0, error_rate: float = 0.0, seed: int = 0
+    ) -> None:
+        """Initialize the library.
+
+        :param size: Number of assets in the library.
+        :param base_time: Capture time of asset 0.
+        :param latency: Delay in seconds added to every response.
+        :param error_rate: Fraction of requests answered with HTTP 503.
+        :param seed: Seed of the error injection.
+        """
+        self.size = size
+        self.base_time = base_time
+        self.latency = latency
+        self.error_rate = error_rate
+        self.descriptions = {}
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def should_fail(self) -> bool:
+        """Count a request and decide whether to inject an error.
+
+        :return: True if the request should be answered with HTTP 503.
+        """
+        with self._lock:
+            self.requests += 1
+            failed: bool = self._random.random() < self.error_rate
+            self.errors += failed
+            return failed
+
+    def asset(self, n: int) -> dict[str, Any]:
+        """Return the API representation of asset `n`.
+
+        :param n: Photo number.
+        :return: Asset dictionary.
+        """
+        return make_asset(self.base_time, n, self.descriptions.get(n))
+
+    def number(self, asset_id: str) -> int | None:
+        """Resolve an asset ID to a photo number of the library.
+
+        :param asset_id: Immich asset ID.
+        :return: Photo number, or None if the asset does not exist.
+        """
+        if not asset_id.startswith(ASSET_ID_PREFIX):
+            return None
+        try:
+            n: int = int(asset_id[len(ASSET_ID_PREFIX) :])
+        except ValueError:
+            return None
+        return n if 0 <= n < self.size else None
+
+    def search(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Answer a `/search/metadata` request.
+
+        :param payload: Request body.
+        :return: Response body.
+        """
+        filename: str | None = payload.get("originalFileName")
+        if filename is not None:
+            n: int | None = photo_number(filename)
+            items: list[dict[str, Any]] = [self.asset(n)] if n is not None and 0 <= n < self.size else []
+            return {"assets": {"items": items, "total": len(items), "nextPage": None}}
+
+        first, last = self._number_range(payload)
+        page: int = int(payload.get("page", 1))
+        size: int = int(payload.get("size", 250))
+        start: int = first + (page - 1) * size
+        stop: int = min(last, start + size)
+        items = [self.asset(n) for n in range(start, stop)]
+        next_page: str | None = str(page + 1) if stop < last else None
+        return {"assets": {"items": items, "total": len(items), "nextPage": next_page}}
+
+    def _number_range(self, payload: dict[str, Any]) -> tuple[int, int]:
+        """Translate `takenAfter`/`takenBefore`/`updatedAfter` filters to a range of photo numbers.
+
+        :param payload: Request body.
+        :return: Tuple of (first, last) photo numbers, last exclusive.
+        """
+        first: int = 0
+        last: int = self.size
+        step: float = ASSET_INTERVAL.total_seconds()
+        if payload.get("takenBefore"):
+            before: datetime.datetime = datetime.datetime.fromisoformat(payload["takenBefore"])
+            first = max(first, int(-(-(self.base_time - before).total_seconds() // step)))
+        if payload.get("takenAfter"):
+            after: datetime.datetime = datetime.datetime.fromisoformat(payload["takenAfter"])
+            last = min(last, int((self.base_time - after).total_seconds() // step) + 1)
+        if payload.get("updatedAfter") and datetime.datetime.fromisoformat(payload["updatedAfter"]) >= self.base_time:
+            last = first
+        return first, max(first, last)
+
+    def update(self, asset_id: str, payload: dict[str, Any]) -> dict[str, Any] | None:
+        """Answer a `PUT /assets/{id}` request.
+
+        :param asset_id: Immich asset ID.
+        :param payload: Request body.
+        :return: Updated asset, or None if it does not exist.
+        """
+        n: int | None = self.number(asset_id)
+        if n is None:
+            return None
+        with self._lock:
+            self.descriptions[n] = payload.get("description", "")
+        return self.asset(n)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Request handler serving the Immich endpoints from the server's `StubLibrary`."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real Immich server behind a reverse proxy
+    disable_nagle_algorithm = True  # headers and body are written separately; avoid delayed-ACK stalls
+    server: "StubServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence the per-request access log.
+
+        :param format: Log format string.
+        :param args: Log arguments.
+        """
+
+    def do_POST(self) -> None:
+        """Handle `POST /search/metadata`."""
+        payload: dict[str, Any] = self._read_json()
+        if self._inject_error():
+            return
+        if self.path.rstrip("/").endswith("/search/metadata"):
+            self._send_json(200, self.server.library.search(payload))
+        else:
+            self._send_json(404, {"message": "Not found"})
+
+    def do_PUT(self) -> None:
+        """Handle `PUT /assets/{id}`."""
+        payload: dict[str, Any] = self._read_json()
+        if self._inject_error():
+            return
+        asset: dict[str, Any] | None = self.server.library.update(self.path.rstrip("/").rsplit("/", 1)[-1], payload)
+        self._send_json(200 if asset else 404, asset or {"message": "Not found"})
+
+    def do_GET(self) -> None:
+        """Handle `GET /assets/{id}`."""
+        if self._inject_error():
+            return
+        n: int | None = self.server.library.number(self.path.rstrip("/").rsplit("/", 1)[-1])
+        if n is None:
+            self._send_json(404, {"message": "Not found"})
+        else:
+            self._send_json(200, self.server.library.asset(n))
+
+    def _read_json(self) -> dict[str, Any]:
+        """Read the JSON request body.
+
+        :return: Parsed body, or an empty dict if there is none.
+        """
+        length: int = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        body: dict[str, Any] = json.loads(self.rfile.read(length))
+        return body
+
+    def _inject_error(self) -> bool:
+        """Apply the configured latency and answer with HTTP 503 if an error is injected.
+
+        :return: True if an error response was sent.
+        """
+        library: StubLibrary = self.server.library
+        if library.latency:
+            time.sleep(library.latency)
+        if not library.should_fail():
+            return False
+        self._send_json(503, {"message": "Injected error"}, {"Retry-After": "0"})
+        return True
+
+    def _send_json(self, status: int, body: dict[str, Any], headers: dict[str, str] | None = None) -> None:
+        """Send a JSON response.
+
+        :param status: HTTP status code.
+        :param body: Response body.
+        :param headers: Additional response headers.
+        """
+        data: bytes = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the synthetic library."""
+
+    daemon_threads = True
+    library: StubLibrary
+
+    def __init__(self, library: StubLibrary, port: int = 0) -> None:
+        """Bind the server to localhost.
+
+        :param library: Library served by the stub.
+        :param port: Port to listen on (0 = any free port).
+        """
+        self.library = library
+        super().__init__(("127.0.0.1", port), StubHandler)
+
+    @property
+    def url(self) -> str:
+        """Return the base URL to configure as `IMMICH_BASE_URL`.
+
+        :return: Base URL of the stub API.
+        """
+        return f"http://127.0.0.1:{self.server_address[1]}/api"
+
+
+def start_in_thread(library: StubLibrary) -> StubServer:
+    """Start the stub on a daemon thread of the current process.
+
+    :param library: Library served by the stub.
+    :return: The running server; call `shutdown()` to stop it.
+    """
+    server: StubServer = StubServer(library)
+    threading.Thread(target=server.serve_forever, name="immich-stub", daemon=True).start()
+    return server
+
+
+def _serve(options: dict[str, Any], urls: "multiprocessing.Queue[str]") -> None:
+    """Serve the stub forever and report its URL (subprocess entry point).
+
+    :param options: Keyword arguments of `StubLibrary`.
+    :param urls: Queue receiving the base URL once the server is listening.
+    """
+    server: StubServer = StubServer(StubLibrary(**options))
+    urls.put(server.url)
+    server.serve_forever()
+
+
+def start_in_process(**options: Any) -> tuple[multiprocessing.Process, str]:
+    """Start the stub in a separate process, so it does not share the GIL or the RSS of the measured sync.
+
+    :param options: Keyword arguments of `StubLibrary` (size, base_time, latency, error_rate, seed).
+    :return: Tuple of (server process, base URL); terminate the process to stop the stub.
+    """
+    urls: multiprocessing.Queue[str] = multiprocessing.Queue()
+    process: multiprocessing.Process = multiprocessing.Process(
+        target=_serve, args=(options, urls), name="immich-stub", daemon=True
+    )
+    process.start()
+    return process, urls.get(timeout=30)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Measure `SyncService.run` throughput against the local Immich stand-in server.
+
+Usage: `python -m benchmarks.run --scale 100k --latency-ms 2 --workers 8`
+"""
+
+import os
+
+# Per-item INFO lines would dominate the measurement; must be set before the app loggers are created.
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import array
+import datetime
+import json
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from app.config import Config
+from app.media_record import MediaRecord
+from app.sync import SyncService
+from benchmarks.immich_stub import start_in_process
+from benchmarks.synthetic import SyntheticGooglePhotosClient, days_spanned, write_takeout_archive
+
+SCALES: dict[str, int] = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+RESULTS_DIR: str = os.path.join(os.path.dirname(__file__), "results")
+
+
+@dataclass
+class BenchmarkOptions:
+    """Parameters of one benchmark scenario."""
+
+    items: int = 10_000
+    library_size: int = 0  # 0 = same as items
+    source: str = "google"
+    match_mode: str = "search"
+    sync_strategy: str = "overwrite"
+    workers: int = 1
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    @property
+    def scenario(self) -> str:
+        """Return a stable scenario name used to group results across versions.
+
+        :return: Scenario name.
+        """
+        return (
+            f"{self.source}-{self.items}-lib{self.library_size or self.items}-{self.match_mode}-{self.sync_strategy}"
+            f"-w{self.workers}-lat{self.latency_ms:g}ms-err{self.error_rate:g}"
+        )
+
+
+class TimedSyncService(SyncService):
+    """Sync service recording the latency of every processed item."""
+
+    latencies: "array.array[float]"
+    updated: int
+
+    def __init__(self, config: Config) -> None:
+        """Initialize the service.
+
+        :param config: Configuration object containing settings for the sync process.
+        """
+        super().__init__(config)
+        self.latencies = array.array("d")
+        self.updated = 0
+
+    def _process_item(self, record: MediaRecord) -> bool:
+        """Process an item and record its latency.
+
+        :param record: A media record from the source.
+        :return: True if the item was updated, False otherwise.
+        """
+        started: float = time.perf_counter()
+        try:
+            updated: bool = super()._process_item(record)
+        finally:
+            self.latencies.append(time.perf_counter() - started)
+        self.updated += updated
+        return updated
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of the current process.
+
+    :return: Peak RSS in MiB.
+    """
+    max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024  # bytes on macOS, KiB elsewhere
+
+
+def code_version() -> str:
+    """Describe the checked out code version.
+
+    :return: Output of `git describe`, or "unknown" outside a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "describe", "--tags", "--always", "--dirty"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(options: BenchmarkOptions) -> dict[str, Any]:
+    """Run one benchmark scenario.
+
+    :param options: Scenario parameters.
+    :return: Result record with the scenario, environment and measured metrics.
+    """
+    base_time: datetime.datetime = datetime.datetime.now(datetime.UTC).replace(microsecond=0) - datetime.timedelta(
+        hours=1
+    )
+    process, url = start_in_process(
+        size=options.library_size or options.items,
+        base_time=base_time,
+        latency=options.latency_ms / 1000,
+        error_rate=options.error_rate,
+        seed=options.seed,
+    )
+    try:
+        with tempfile.TemporaryDirectory(prefix="gphoto2immich-bench-") as directory:
+            config: Config = Config(
+                google_credentials_path="unused",
+                immich_base_url=url,
+                immich_api_key="benchmark",
+                days_back=days_spanned(options.items),
+                sync_strategy=options.sync_strategy,
+                sync_workers=options.workers,
+                source=options.source,
+                takeout_paths=[directory],
+                match_mode=options.match_mode,
+                immich_pool_size=max(10, options.workers),
+                immich_retry_backoff=0.01,
+            )
+            if options.source == "takeout":
+                write_takeout_archive(directory, options.items, base_time)
+
+            sync: TimedSyncService = TimedSyncService(config)
+            if options.source != "takeout":
+                sync.source = SyntheticGooglePhotosClient(options.items, base_time)  # type: ignore[assignment]
+
+            started: float = time.perf_counter()
+            sync.run()
+            elapsed: float = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.join()
+
+    latencies: list[float] = sorted(sync.latencies)
+    percentiles: list[float] = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "scenario": options.scenario,
+        "options": asdict(options),
+        "version": code_version(),
+        "timestamp": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "items": len(latencies),
+        "updated": sync.updated,
+        "elapsed_s": round(elapsed, 3),
+        "items_per_sec": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentiles[49] * 1000, 3) if percentiles else 0.0,
+        "p99_ms": round(percentiles[98] * 1000, 3) if percentiles else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def load_previous(results_dir: str, scenario: str) -> dict[str, Any] | None:
+    """Load the most recent stored result of a scenario.
+
+    :param results_dir: Directory with the per-scenario result histories.
+    :param scenario: Scenario name.
+    :return: The last stored result, or None if the scenario was never run.
+    """
+    path: str = os.path.join(results_dir, f"{scenario}.jsonl")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as results_file:
+        lines: list[str] = [line for line in results_file if line.strip()]
+    previous: dict[str, Any] | None = json.loads(lines[-1]) if lines else None
+    return previous
+
+
+def store_result(results_dir: str, result: dict[str, Any]) -> str:
+    """Append a result to the history of its scenario.
+
+    :param results_dir: Directory with the per-scenario result histories.
+    :param result: Result record.
+    :return: Path of the history file.
+    """
+    os.makedirs(results_dir, exist_ok=True)
+    path: str = os.path.join(results_dir, f"{result['scenario']}.jsonl")
+    with open(path, "a", encoding="utf-8") as results_file:
+        results_file.write(json.dumps(result) + "\n")
+    return path
+
+
+def compare(previous: dict[str, Any], current: dict[str, Any]) -> float:
+    """Print the change of every metric against a previous result.
+
+    :param previous: Earlier result of the same scenario.
+    :param current: New result.
+    :return: Relative throughput change (e.g. -0.1 for 10% fewer items/sec).
+    """
+    print(f"Compared with {previous['version']} ({previous['timestamp']}):")
+    for metric in ("items_per_sec", "p50_ms", "p99_ms", "peak_rss_mb"):
+        before: float = previous[metric]
+        after: float = current[metric]
+        change: str = f"{(after - before) / before:+.1%}" if before else "n/a"
+        print(f"  {metric:<14} {before:>12} → {after:<12} ({change})")
+    return (
+        (current["items_per_sec"] - previous["items_per_sec"]) / previous["items_per_sec"]
+        if previous["items_per_sec"]
+        else 0.0
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :param argv: Argument list to parse, defaults to `sys.argv[1:]`.
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the sync against a local Immich stand-in server.")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="number of source items (overrides --items)")
+    parser.add_argument("--items", type=int, default=10_000, help="number of source items")
+    parser.add_argument("--library-size", type=int, default=0, help="assets in the Immich library (0 = --items)")
+    parser.add_argument("--source", choices=("google", "takeout"), default="google")
+    parser.add_argument("--match-mode", choices=("search", "index", "window"), default="search")
+    parser.add_argument(
+        "--sync-strategy", choices=("overwrite", "skip_if_present", "update_if_changed"), default="overwrite"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="SYNC_WORKERS")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency added to every stub response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the error injection")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="directory of the stored result histories")
+    parser.add_argument(
+        "--fail-on-regression",
+        type=float,
+        default=0.0,
+        metavar="PERCENT",
+        help="exit with status 1 if items/sec dropped by more than PERCENT against the previous result",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a benchmark scenario, store its result and compare it with the previous one.
+
+    :param argv: Argument list to parse, defaults to `sys.argv[1:]`.
+    :return: Process exit status.
+    """
+    args: argparse.Namespace = parse_args(argv)
+    options: BenchmarkOptions = BenchmarkOptions(
+        items=SCALES[args.scale] if args.scale else args.items,
+        library_size=args.library_size,
+        source=args.source,
+        match_mode=args.match_mode,
+        sync_strategy=args.sync_strategy,
+        workers=args.workers,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+
+    previous: dict[str, Any] | None = load_previous(args.results_dir, options.scenario)
+    result: dict[str, Any] = run_benchmark(options)
+    path: str = store_result(args.results_dir, result)
+
+    print(f"Scenario {result['scenario']} ({result['version']}):")
+    print(f"  items          {result['items']} in {result['elapsed_s']} s ({result['updated']} updated)")
+    print(f"  items/sec      {result['items_per_sec']}")
+    print(f"  p50 / p99      {result['p50_ms']} ms / {result['p99_ms']} ms")
+    print(f"  peak RSS       {result['peak_rss_mb']} MiB")
+    print(f"Stored in {path}")
+
+    if previous is None:
+        return 0
+    change: float = compare(previous, result)
+    if args.fail_on_regression and change < -args.fail_on_regression / 100:
+        print(f"Throughput regressed by {-change:.1%} (limit {args.fail_on_regression:g}%).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
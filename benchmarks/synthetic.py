@@ -0,0 +1,137 @@
+"""Synthetic Immich library and Google Photos / Takeout metadata for benchmarks.
+
+Asset `n` of the library and source item `n` describe the same photo: both use the file name `IMG_<n>.jpg` and
+are taken `n` seconds before the base time, so the sync matches them in every match mode. Source items beyond
+the library size are not found in Immich.
+"""
+
+import datetime
+import json
+import os
+import zipfile
+from collections.abc import Iterator
+from typing import Any
+
+from app.media_record import MediaRecord
+
+ASSET_INTERVAL: datetime.timedelta = datetime.timedelta(seconds=1)
+
+
+def file_name(n: int) -> str:
+    """Return the original file name of synthetic photo `n`.
+
+    :param n: Photo number.
+    :return: File name such as "IMG_00000042.jpg".
+    """
+    return f"IMG_{n:08d}.jpg"
+
+
+def photo_number(filename: str) -> int | None:
+    """Return the number of a synthetic photo from its file name.
+
+    :param filename: File name as produced by `file_name`.
+    :return: Photo number, or None for foreign file names.
+    """
+    if not (filename.startswith("IMG_") and filename.endswith(".jpg")):
+        return None
+    try:
+        return int(filename[4:-4])
+    except ValueError:
+        return None
+
+
+def asset_id(n: int) -> str:
+    """Return the Immich asset ID of synthetic photo `n`.
+
+    :param n: Photo number.
+    :return: UUID-shaped asset ID.
+    """
+    return f"00000000-0000-4000-8000-{n:012d}"
+
+
+def taken_at(base_time: datetime.datetime, n: int) -> datetime.datetime:
+    """Return the capture time of synthetic photo `n`.
+
+    :param base_time: Capture time of photo 0.
+    :param n: Photo number.
+    :return: Capture time, one `ASSET_INTERVAL` earlier per photo.
+    """
+    return base_time - n * ASSET_INTERVAL
+
+
+def make_asset(base_time: datetime.datetime, n: int, description: str | None = None) -> dict[str, Any]:
+    """Build the Immich API representation of synthetic asset `n`.
+
+    :param base_time: Capture time of photo 0.
+    :param n: Photo number.
+    :param description: Current description stored in Immich.
+    :return: Asset dictionary shaped like an Immich `/search/metadata` item.
+    """
+    created: str = taken_at(base_time, n).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    return {
+        "id": asset_id(n),
+        "originalFileName": file_name(n),
+        "fileCreatedAt": created,
+        "updatedAt": base_time.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "isTrashed": False,
+        "exifInfo": {"description": description or "", "dateTimeOriginal": created},
+    }
+
+
+def days_spanned(count: int) -> int:
+    """Return the `DAYS_BACK` value that covers `count` synthetic photos.
+
+    :param count: Number of photos.
+    :return: Number of days, with one day of slack.
+    """
+    return int(count * ASSET_INTERVAL.total_seconds() // 86400) + 2
+
+
+class SyntheticGooglePhotosClient:
+    """Stand-in for `GooglePhotosClient` yielding generated media items without any network access."""
+
+    count: int
+    base_time: datetime.datetime
+
+    def __init__(self, count: int, base_time: datetime.datetime) -> None:
+        """Initialize the synthetic source.
+
+        :param count: Number of media items to generate.
+        :param base_time: Capture time of item 0.
+        """
+        self.count = count
+        self.base_time = base_time
+
+    def iter_media_items(self, days_back: int) -> Iterator[MediaRecord]:
+        """Generate media records shaped like parsed Google Photos API responses.
+
+        :param days_back: Ignored; all generated items are yielded.
+        :return: Iterator over media records.
+        """
+        for n in range(self.count):
+            yield MediaRecord(
+                id=f"google-{n}",
+                filename=file_name(n),
+                description=f"Synthetic description {n}",
+                creation_time=taken_at(self.base_time, n).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            )
+
+
+def write_takeout_archive(directory: str, count: int, base_time: datetime.datetime) -> str:
+    """Write a Takeout-style zip archive with one JSON sidecar per synthetic photo (no media bytes).
+
+    :param directory: Directory to create the archive in.
+    :param count: Number of sidecars to write.
+    :param base_time: Capture time of photo 0.
+    :return: Path of the written archive.
+    """
+    path: str = os.path.join(directory, "takeout-001.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for n in range(count):
+            sidecar: dict[str, Any] = {
+                "title": file_name(n),
+                "description": f"Synthetic description {n}",
+                "photoTakenTime": {"timestamp": str(int(taken_at(base_time, n).timestamp()))},
+            }
+            archive.writestr(f"Takeout/Google Photos/Photos/{file_name(n)}.json", json.dumps(sidecar))
+    return path
@@ -1,28 +1,102 @@
 #!/usr/bin/env python3
 """The main entry point for the application."""
 
+import argparse
+import asyncio
 from logging import Logger
 
+from app import codec
 from app.config import Config
 from app.log import get_logger
+from app.metrics import start_http_server
+from app.scheduler import Daemon, create_schedule
 from app.sync import SyncService
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    :param argv: Argument list to parse, defaults to `sys.argv[1:]`.
+    :return: Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Synchronize Google Photos metadata to Immich.")
+    parser.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="discard the local Immich asset cache and rebuild it with a full library scan",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="keep running and sync on the SYNC_INTERVAL / SYNC_CRON schedule until SIGTERM",
+    )
+    return parser.parse_args(argv)
+
+
+def run(config: Config) -> None:
+    """Run one sync, or keep syncing on the schedule in daemon mode.
+
+    :param config: Configuration of the sync.
+    """
+    sync = SyncService(config)
+    # One event loop for all runs, so the async Immich client and its connections stay open between daemon runs
+    runner: asyncio.Runner = asyncio.Runner()
+
+    def run_sync() -> None:
+        if config.sync_async:
+            runner.run(sync.run_async(keep_client=True))
+        else:
+            sync.run()
+
+    try:
+        if config.daemon:
+            daemon: Daemon = Daemon(
+                run_sync,
+                create_schedule(config.sync_interval, config.sync_cron),
+                jitter=config.sync_jitter,
+                on_stop=sync.stop,
+            )
+            daemon.install_signal_handlers()
+            daemon.run_forever()
+        else:
+            run_sync()
+    finally:
+        if config.sync_async:
+            runner.run(sync.aclose())
+        runner.close()
+
+
 def main() -> None:
     """Start the main synchronization service."""
+    args: argparse.Namespace = parse_args()
     logger: Logger = get_logger("main")
     try:
         config: Config = Config.load()
+        if args.rebuild_cache:
+            config.rebuild_cache = True
+        if args.daemon:
+            config.daemon = True
+        json_backend: str = codec.set_backend(config.json_backend)
         logger.info("Configuration loaded successfully.")
         print("Config loaded:")
+        print(f"- Source: {config.source}")
         print(f"- Google credentials: {config.google_credentials_path}")
         print(f"- Immich URL: {config.immich_base_url}")
         print(f"- Days back: {config.days_back}")
         print(f"- Sync strategy: {config.sync_strategy}")
         print(f"- Dry run: {config.dry_run}")
+        print(f"- Sync workers: {config.sync_workers}")
+        print(f"- Async mode: {config.sync_async}")
+        print(f"- Match mode: {config.match_mode}")
+        print(f"- Asset cache: {config.asset_cache_path or 'disabled'}")
+        print(f"- JSON backend: {json_backend}")
+        if config.daemon:
+            print(f"- Schedule: {config.sync_cron or f'every {config.sync_interval:g} s'}")
         print(f"- Log level: {logger.level}")
-        sync = SyncService(config)
-        sync.run()
+        if config.metrics_port:
+            start_http_server(config.metrics_port)
+            logger.info("Serving metrics on port %d", config.metrics_port)
+        run(config)
         logger.info("Sync process completed.")
     except Exception as e:
         logger.exception("Unhandled exception occurred: %s", e)
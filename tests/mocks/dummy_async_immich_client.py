@@ -0,0 +1,70 @@
+"""Dummy async Immich Client for testing purposes."""
+
+from typing import Any
+
+
+class DummyAsyncImmichClient:
+    """Dummy async Immich client for testing."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the dummy client."""
+        self.updated: list[Any] = []
+        self.bulk_updated: list[Any] = []
+        self.closed: bool = False
+
+    async def search_asset_by_filename(self, filename: str, with_exif: bool = False) -> dict[str, Any] | None:
+        """Search for an asset by filename.
+
+        :param filename: The filename of the asset to search for.
+        :param with_exif: Include EXIF info in the result.
+        :return: The asset dictionary if found, otherwise None.
+        """
+        if filename == "test1.jpg":
+            return {"id": "asset123", "originalFileName": filename, "exifInfo": {"description": ""}}
+        return None
+
+    async def update_asset(self, asset_id: str, fields: dict[str, Any]) -> bool:
+        """Update several metadata fields of an asset.
+
+        :param asset_id: The ID of the asset to update.
+        :param fields: Asset fields to set.
+        :return: True if the update was successful, otherwise False.
+        """
+        self.updated.append((asset_id, fields))
+        return True
+
+    async def update_assets(self, asset_ids: list[str], fields: dict[str, Any]) -> bool:
+        """Set the same fields on many assets.
+
+        :param asset_ids: The IDs of the assets to update.
+        :param fields: Asset fields to set.
+        :return: True if the update was successful, otherwise False.
+        """
+        self.bulk_updated.append((asset_ids, fields))
+        return True
+
+    async def get_asset_description(self, asset_id: str) -> str:
+        """Get the description of an asset.
+
+        :param asset_id: The ID of the asset to retrieve the description for.
+        :return: The description of the asset, or an empty string if not found.
+        """
+        return ""
+
+    async def aclose(self) -> None:
+        """Close the dummy client."""
+        self.closed = True
+
+
+class DummyAsyncImmichClientFailing(DummyAsyncImmichClient):
+    """Dummy async Immich client whose updates raise a connection error."""
+
+    async def update_asset(self, asset_id: str, fields: dict[str, Any]) -> bool:
+        """Fail to update an asset.
+
+        :param asset_id: The ID of the asset to update.
+        :param fields: Asset fields to set.
+        :return: Never returns.
+        :raises ConnectionError: Always.
+        """
+        raise ConnectionError("Immich is unreachable")
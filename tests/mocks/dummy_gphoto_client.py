@@ -1,48 +1,55 @@
 """Dummy gphoto client for testing purposes."""
 
+from collections.abc import Iterator
 from typing import Any
 
+from app.media_record import MediaRecord
+
 
 class DummyGooglePhotosClient:
     """Dummy Google Photos client for testing."""
 
-    def __init__(self, credentials_path: str) -> None:
+    def __init__(
+        self, credentials_path: str, *, shards: int = 1, shard_days: int = 30, discovery_cache_path: str = ""
+    ) -> None:
         """Initialize the dummy client.
 
         :param credentials_path: Path to the Google API credentials JSON file.
+        :param shards: Number of date shards fetched concurrently.
+        :param shard_days: Length of one date shard in days.
+        :param discovery_cache_path: Path of the discovery document cache.
         """
         pass
 
-    def fetch_media_items(self, days_back: int) -> list[dict[str, Any]]:
+    def fetch_media_items(self, days_back: int) -> list[MediaRecord]:
         """Fetch media items from Google Photos.
 
         :param days_back: Number of days back to fetch items.
-        :return: List of media items.
+        :return: List of media records.
         """
         return [
-            {
-                "id": "1",
-                "filename": "test1.jpg",
-                "description": "Test photo",
-                "mediaMetadata": {"creationTime": "2024-04-15T10:00:00Z"},
-            },
-            {
-                "id": "2",
-                "filename": "test2.jpg",
-                "description": None,  # No description = should be skipped
-                "mediaMetadata": {"creationTime": "2024-04-14T10:00:00Z"},
-            },
+            MediaRecord(id="1", filename="test1.jpg", description="Test photo", creation_time="2024-04-15T10:00:00Z"),
+            MediaRecord(
+                id="2",
+                filename="test2.jpg",
+                description=None,  # No description = should be skipped
+                creation_time="2024-04-14T10:00:00Z",
+            ),
         ]
 
-    def extract_metadata(self, item: dict[str, Any]) -> dict[str, Any]:
-        """Extract metadata from a media item.
+    def iter_media_items(self, days_back: int) -> Iterator[MediaRecord]:
+        """Iterate over media items from Google Photos.
+
+        :param days_back: Number of days back to fetch items.
+        :return: Iterator over media records.
+        """
+        yield from self.fetch_media_items(days_back)
+
+    def iter_albums(self) -> Iterator[dict[str, Any]]:
+        """Iterate over albums with the metadata of their media items.
 
-        :param item: A media item dictionary from Google Photos API.
-        :return: A dictionary containing the extracted metadata.
+        :return: Iterator over album dictionaries.
         """
-        return {
-            "id": item["id"],
-            "filename": item["filename"],
-            "description": item["description"],
-            "creationTime": item["mediaMetadata"]["creationTime"],
-        }
+        items: list[MediaRecord] = self.fetch_media_items(0)
+        yield {"id": "album1", "title": "Holiday", "items": items}
+        yield {"id": "album2", "title": "Not in Immich", "items": items[1:]}
@@ -1,6 +1,7 @@
 """Dummy Immich Client for testing purposes."""
 
-from typing import Any, Optional
+from collections.abc import Iterator
+from typing import Any
 
 
 class DummyImmichClient:
@@ -9,6 +10,10 @@ class DummyImmichClient:
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Initialize the dummy client."""
         self.updated: list[Any] = []
+        self.bulk_updated: list[Any] = []
+        self.searched: list[str] = []
+        self.asset_filters: list[dict[str, Any]] = []
+        self.albums: dict[str, set[str]] = {}
 
     def find_asset_by_filename(self, filename: str) -> str | None:
         """Find an asset by filename.
@@ -16,18 +21,61 @@ class DummyImmichClient:
         :param filename: The filename of the asset to search for.
         :return: The asset ID if found, otherwise None.
         """
+        self.searched.append(filename)
         if filename == "test1.jpg":
             return "asset123"
         return None
 
-    def update_asset_description(self, asset_id: str, description: str) -> bool:
-        """Update the description of an asset.
+    def search_asset_by_filename(self, filename: str, with_exif: bool = False) -> dict[str, Any] | None:
+        """Search for an asset by filename.
+
+        :param filename: The filename of the asset to search for.
+        :param with_exif: Include EXIF info in the result.
+        :return: The asset dictionary if found, otherwise None.
+        """
+        asset_id: str | None = self.find_asset_by_filename(filename)
+        if asset_id is None:
+            return None
+        return {"id": asset_id, "originalFileName": filename, "exifInfo": {"description": ""}}
+
+    def iter_assets(self, page_size: int = 1000, **filters: Any) -> Iterator[dict[str, Any]]:
+        """Iterate over all assets in the library.
+
+        :param page_size: Number of assets requested per page.
+        :param filters: Additional search filters.
+        :return: Iterator over asset dictionaries.
+        """
+        self.asset_filters.append(filters)
+        assets: list[dict[str, Any]] = [
+            {
+                "id": "asset123",
+                "originalFileName": "test1.jpg",
+                "updatedAt": "2024-04-15T00:00:00.000Z",
+                "exifInfo": {"description": "Test photo"},
+            },
+            {"id": "asset456", "originalFileName": "other.jpg", "updatedAt": "2024-04-16T00:00:00.000Z"},
+        ]
+        updated_after: str | None = filters.get("updatedAfter")
+        yield from (asset for asset in assets if updated_after is None or asset["updatedAt"] > updated_after)
+
+    def update_asset(self, asset_id: str, fields: dict[str, Any]) -> bool:
+        """Update several metadata fields of an asset.
 
         :param asset_id: The ID of the asset to update.
-        :param description: The new description for the asset.
+        :param fields: Asset fields to set.
         :return: True if the update was successful, otherwise False.
         """
-        self.updated.append((asset_id, description))
+        self.updated.append((asset_id, fields))
+        return True
+
+    def update_assets(self, asset_ids: list[str], fields: dict[str, Any]) -> bool:
+        """Set the same fields on many assets.
+
+        :param asset_ids: The IDs of the assets to update.
+        :param fields: Asset fields to set.
+        :return: True if the update was successful, otherwise False.
+        """
+        self.bulk_updated.append((asset_ids, fields))
         return True
 
     def get_asset_description(self, asset_id: str) -> str:
@@ -38,6 +86,43 @@ class DummyImmichClient:
         """
         return ""
 
+    def list_albums(self) -> list[dict[str, Any]]:
+        """List all albums.
+
+        :return: Album dictionaries.
+        """
+        return [{"id": name, "albumName": name, "assetCount": len(assets)} for name, assets in self.albums.items()]
+
+    def get_album_asset_ids(self, album_id: str) -> set[str]:
+        """Get the IDs of the assets in an album.
+
+        :param album_id: The ID of the album.
+        :return: Set of asset IDs.
+        """
+        return set(self.albums[album_id])
+
+    def create_album(self, name: str, description: str = "") -> str | None:
+        """Create an empty album, using its name as ID.
+
+        :param name: Name of the album.
+        :param description: Description of the album.
+        :return: The ID of the created album.
+        """
+        self.albums[name] = set()
+        return name
+
+    def add_assets_to_album(self, album_id: str, asset_ids: list[str], batch_size: int = 500) -> int:
+        """Add assets to an album.
+
+        :param album_id: The ID of the album.
+        :param asset_ids: IDs of the assets to add.
+        :param batch_size: Maximum number of asset IDs sent in one request.
+        :return: Number of assets added.
+        """
+        added: set[str] = set(asset_ids) - self.albums[album_id]
+        self.albums[album_id] |= added
+        return len(added)
+
 
 class DummyImmichClientWithDescription(DummyImmichClient):
     """Dummy Immich client that returns a description."""
@@ -49,3 +134,33 @@ class DummyImmichClientWithDescription(DummyImmichClient):
         :return: The description of the asset, or an empty string if not found.
         """
         return "Existing description"
+
+
+class DummyImmichClientWithDuplicates(DummyImmichClient):
+    """Dummy Immich client whose library contains two assets with the same file name."""
+
+    def iter_assets(self, page_size: int = 1000, **filters: Any) -> Iterator[dict[str, Any]]:
+        """Iterate over all assets in the library.
+
+        :param page_size: Number of assets requested per page.
+        :param filters: Additional search filters.
+        :return: Iterator over asset dictionaries.
+        """
+        yield from (
+            {"id": asset_id, "originalFileName": "test1.jpg", "updatedAt": "2024-04-15T00:00:00.000Z"}
+            for asset_id in ("asset123", "asset789")
+        )
+
+
+class DummyImmichClientBulkFails(DummyImmichClient):
+    """Dummy Immich client that rejects bulk asset updates."""
+
+    def update_assets(self, asset_ids: list[str], fields: dict[str, Any]) -> bool:
+        """Fail to set the same fields on many assets.
+
+        :param asset_ids: The IDs of the assets to update.
+        :param fields: Asset fields to set.
+        :return: Always False.
+        """
+        self.bulk_updated.append((asset_ids, fields))
+        return False
@@ -0,0 +1,44 @@
+"""Dummy Takeout client for testing purposes."""
+
+from collections.abc import Iterator
+
+from app.media_record import MediaRecord
+
+
+class DummyTakeoutClient:
+    """Dummy Takeout client for testing."""
+
+    def __init__(
+        self, paths: list[str], workers: int = 1, hash_media: bool = False, collect_albums: bool = False
+    ) -> None:
+        """Initialize the dummy client.
+
+        :param paths: Takeout archive paths.
+        :param workers: Number of scanning processes.
+        :param hash_media: Compute media checksums.
+        :param collect_albums: Record album membership while scanning.
+        """
+        self.paths = paths
+
+    def iter_media_items(self, days_back: int) -> Iterator[MediaRecord]:
+        """Iterate over metadata parsed from Takeout sidecars.
+
+        :param days_back: Number of days back to fetch items.
+        :return: Iterator over media records.
+        """
+        yield MediaRecord(
+            id="Takeout/test1.jpg.json",
+            filename="test1.jpg",
+            description="Test photo",
+            creation_time="2024-04-15T10:00:00Z",
+            latitude=50.0875,
+            longitude=14.4214,
+            favorite=True,
+        )
+        yield MediaRecord(
+            id="Takeout/test2.jpg.json",
+            filename="test2.jpg",
+            creation_time="2024-04-14T10:00:00Z",
+            favorite=True,
+            archived=True,
+        )
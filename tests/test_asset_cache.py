@@ -0,0 +1,66 @@
+"""Test cases for the AssetCache class."""
+
+from pathlib import Path
+
+from app.asset_cache import AssetCache
+from app.asset_index import IndexedAsset
+
+
+def test_store_and_load_roundtrip(tmp_path: Path) -> None:
+    """Test that stored assets and the watermark survive reopening the cache.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: str = str(tmp_path / "cache" / "assets.sqlite3")
+    cache = AssetCache(path)
+    cache.store(
+        [
+            IndexedAsset("1", "photo.jpg", "c1", "Sunset", "2024-04-10T12:00:00.000Z"),
+            IndexedAsset(
+                "2",
+                "video.mp4",
+                "c2",
+                None,
+                "2024-04-11T12:00:00.000Z",
+                is_favorite=True,
+                is_archived=False,
+                latitude=50.0875,
+                longitude=14.4214,
+                visibility="timeline",
+            ),
+        ],
+        [],
+        "2024-04-11T12:00:00.000Z",
+    )
+    cache.close()
+
+    reopened = AssetCache(path)
+    index = reopened.load()
+
+    assert len(index) == 2  # noqa: PLR2004
+    assert index.watermark == "2024-04-11T12:00:00.000Z"
+    assert index.assets["1"].description == "Sunset"
+    assert index.find_by_filename("video.mp4") == "2"
+    assert index.assets["2"].is_favorite is True
+    assert index.assets["2"].is_archived is False
+    assert (index.assets["2"].latitude, index.assets["2"].longitude) == (50.0875, 14.4214)
+    assert index.assets["2"].visibility == "timeline"
+    assert index.assets["1"].is_favorite is None
+
+
+def test_store_removes_and_clear(tmp_path: Path) -> None:
+    """Test deleting removed assets and clearing the cache.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    cache = AssetCache(str(tmp_path / "assets.sqlite3"))
+    cache.store([IndexedAsset("1", "photo.jpg"), IndexedAsset("2", "other.jpg")], [], "2024-04-10T12:00:00.000Z")
+    cache.store([], ["1"], None)
+
+    assert list(cache.load().assets) == ["2"]
+    assert cache.watermark == "2024-04-10T12:00:00.000Z"
+
+    cache.clear()
+
+    assert len(cache.load()) == 0
+    assert cache.watermark is None
@@ -0,0 +1,116 @@
+"""Test cases for the AssetIndex class."""
+
+from app.asset_index import AssetIndex, IndexedAsset
+
+
+def test_find_by_filename() -> None:
+    """Test resolving assets by original file name."""
+    index = AssetIndex()
+    index.add_all(
+        [
+            {"id": "1", "originalFileName": "photo.jpg"},
+            {"id": "2", "originalFileName": "photo.jpg"},
+            {"id": "3", "originalFileName": "video.mp4"},
+        ]
+    )
+
+    assert len(index) == 3  # noqa: PLR2004
+    assert index.by_filename["photo.jpg"] == ["1", "2"]
+    assert index.find_by_filename("photo.jpg") == "1"
+    assert index.find_by_filename("video.mp4") == "3"
+    assert index.find_by_filename("missing.jpg") is None
+
+
+def test_add_replaces_existing_asset() -> None:
+    """Test that re-adding an asset with a new file name moves it in the lookup table."""
+    index = AssetIndex()
+    index.add(IndexedAsset(id="1", original_file_name="old.jpg"))
+    index.add(IndexedAsset(id="1", original_file_name="new.jpg"))
+
+    assert len(index) == 1
+    assert index.find_by_filename("old.jpg") is None
+    assert index.find_by_filename("new.jpg") == "1"
+
+
+def test_match_prefers_checksum_then_time_and_size() -> None:
+    """Test matching duplicate file names by checksum, then capture time and size."""
+    index = AssetIndex()
+    index.add_all(
+        [
+            {
+                "id": "1",
+                "originalFileName": "IMG_0001.jpg",
+                "checksum": "aaa",
+                "exifInfo": {"dateTimeOriginal": "2024-04-10T12:00:00.000Z", "fileSizeInByte": 100},
+            },
+            {
+                "id": "2",
+                "originalFileName": "IMG_0001.jpg",
+                "checksum": "bbb",
+                "exifInfo": {"dateTimeOriginal": "2024-04-10T12:00:00.000Z", "fileSizeInByte": 200},
+            },
+            {
+                "id": "3",
+                "originalFileName": "IMG_0001.jpg",
+                "checksum": "ccc",
+                "fileCreatedAt": "2023-01-01T08:00:00.000+02:00",
+            },
+        ]
+    )
+
+    assert [asset.id for asset in index.match("renamed.jpg", checksum="bbb")] == ["2"]
+    assert [asset.id for asset in index.match("IMG_0001.jpg", taken_at="2024-04-10T12:00:00Z", size=200)] == ["2"]
+    assert [asset.id for asset in index.match("IMG_0001.jpg", taken_at="2023-01-01T06:00:00Z")] == ["3"]
+    assert len(index.match("IMG_0001.jpg", taken_at="2024-04-10T12:00:00Z")) == 2  # noqa: PLR2004
+    assert index.match("missing.jpg") == []
+
+
+def test_match_rejects_contradicting_single_candidate() -> None:
+    """Test that the only asset with the file name is not matched when its content or capture time differ."""
+    index = AssetIndex()
+    index.add_all(
+        [
+            {
+                "id": "1",
+                "originalFileName": "IMG_0001.jpg",
+                "checksum": "aaa",
+                "exifInfo": {"dateTimeOriginal": "2019-06-01T09:00:00.000Z", "fileSizeInByte": 100},
+            }
+        ]
+    )
+
+    assert index.match("IMG_0001.jpg", checksum="zzz", taken_at="2024-04-10T12:00:00Z", size=999) == []
+    assert index.match("IMG_0001.jpg", checksum="zzz") == []
+    assert index.match("IMG_0001.jpg", size=999) == []
+    assert index.match("IMG_0001.jpg", taken_at="2024-04-10T12:00:00Z") == []
+    assert [asset.id for asset in index.match("IMG_0001.jpg", taken_at="2019-06-01T11:00:00+02:00")] == ["1"]
+    assert [asset.id for asset in index.match("IMG_0001.jpg", taken_at="2019-06-01T17:00:00Z")] == ["1"]
+    assert [asset.id for asset in index.match("IMG_0001.jpg")] == ["1"]
+
+
+def test_remove_unlinks_checksum() -> None:
+    """Test that removing an asset also removes it from the checksum table."""
+    index = AssetIndex()
+    index.add(IndexedAsset(id="1", original_file_name="photo.jpg", checksum="aaa"))
+    index.remove("1")
+
+    assert index.by_checksum == {}
+    assert index.match("photo.jpg", checksum="aaa") == []
+
+
+def test_from_api_reads_flags_and_location() -> None:
+    """Test that the favorite and archived flags and the EXIF location are kept for change detection."""
+    asset: IndexedAsset = IndexedAsset.from_api(
+        {
+            "id": "1",
+            "originalFileName": "photo.jpg",
+            "isFavorite": True,
+            "visibility": "archive",
+            "exifInfo": {"latitude": 50.0875, "longitude": 14.4214},
+        }
+    )
+
+    assert (asset.is_favorite, asset.is_archived, asset.latitude, asset.longitude) == (True, True, 50.0875, 14.4214)
+    assert asset.visibility == "archive"
+    assert IndexedAsset.from_api({"id": "2", "isArchived": False}).is_archived is False
+    assert IndexedAsset.from_api({"id": "3"}).is_favorite is None
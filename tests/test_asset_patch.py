@@ -0,0 +1,74 @@
+"""Test building and diffing asset metadata patches."""
+
+from app.asset_index import IndexedAsset
+from app.asset_patch import SYNC_FIELDS, asset_fields, build_patch, changed_fields, describe, is_bulk, patch_key
+from app.media_record import MediaRecord
+
+RECORD: MediaRecord = MediaRecord(
+    id="1",
+    filename="a.jpg",
+    description="Sunset",
+    creation_time="2024-04-10T12:00:00Z",
+    latitude=50.0875,
+    longitude=14.4214,
+    favorite=True,
+)
+
+
+def test_build_patch_selects_fields() -> None:
+    """Test that only the configured fields with a value end up in the patch."""
+    assert build_patch(RECORD, frozenset({"description"})) == {"description": "Sunset"}
+    assert build_patch(RECORD, SYNC_FIELDS) == {
+        "description": "Sunset",
+        "dateTimeOriginal": "2024-04-10T12:00:00Z",
+        "latitude": 50.0875,
+        "longitude": 14.4214,
+        "isFavorite": True,
+    }
+    assert build_patch(MediaRecord(id="2", filename="b.jpg", latitude=1.0), SYNC_FIELDS) == {}
+
+
+def test_changed_fields_drops_known_values() -> None:
+    """Test that fields Immich already holds are not written again."""
+    asset: IndexedAsset = IndexedAsset(
+        id="asset123", original_file_name="a.jpg", description="Sunset", taken_at="2024-04-10T12:00:00Z"
+    )
+    patch: dict = build_patch(RECORD, SYNC_FIELDS)
+
+    assert changed_fields(patch, asset) == {"latitude": 50.0875, "longitude": 14.4214, "isFavorite": True}
+    assert changed_fields({"description": "Sunset"}, asset) == {}
+
+    asset.is_favorite = True
+    asset.latitude = 50.08750000001
+    asset.longitude = 14.4214
+    assert changed_fields(patch, asset) == {}
+    assert changed_fields({"isArchived": True}, asset) == {"isArchived": True}
+    asset.is_archived = True
+    assert changed_fields({"isArchived": True}, asset) == {}
+    asset.longitude = 14.5
+    assert changed_fields(patch, asset) == {"latitude": 50.0875, "longitude": 14.4214}
+
+
+def test_asset_fields_archive_through_visibility() -> None:
+    """Test that servers reporting `visibility` are archived through it and locked assets stay where they are."""
+    patch: dict = {"description": "Sunset", "isArchived": True}
+
+    assert asset_fields(patch, IndexedAsset(id="1", original_file_name="a.jpg")) == patch
+    assert asset_fields(patch, IndexedAsset(id="1", original_file_name="a.jpg", visibility="timeline")) == {
+        "description": "Sunset",
+        "visibility": "archive",
+    }
+    assert asset_fields(patch, IndexedAsset(id="1", original_file_name="a.jpg", visibility="locked")) == {
+        "description": "Sunset"
+    }
+    assert is_bulk({"visibility": "archive"})
+
+
+def test_patch_key_and_bulk() -> None:
+    """Test the journal content, log format and bulk eligibility of patches."""
+    assert patch_key({"description": "Sunset"}) == "Sunset"
+    assert patch_key({"isFavorite": True, "description": "Sunset"}) == '{"description": "Sunset", "isFavorite": true}'
+    assert describe({"description": "Sunset"}) == '"Sunset"'
+    assert is_bulk({"isFavorite": True, "isArchived": True})
+    assert not is_bulk({"isFavorite": True, "description": "Sunset"})
+    assert not is_bulk({})
@@ -0,0 +1,56 @@
+"""Test the benchmark harness and its Immich stand-in server."""
+
+import datetime
+from pathlib import Path
+from typing import Any
+
+from app.immich_client import ImmichClient
+from benchmarks.immich_stub import StubLibrary, start_in_thread
+from benchmarks.run import BenchmarkOptions, load_previous, run_benchmark, store_result
+from benchmarks.synthetic import asset_id, file_name, taken_at
+
+BASE_TIME: datetime.datetime = datetime.datetime(2025, 1, 1, tzinfo=datetime.UTC)
+LIBRARY_SIZE: int = 50
+BENCHMARK_ITEMS: int = 20
+
+
+def test_stub_serves_immich_endpoints() -> None:
+    """Test that the stub answers the searches, pagination and updates used by ImmichClient."""
+    server = start_in_thread(StubLibrary(LIBRARY_SIZE, BASE_TIME))
+    client: ImmichClient = ImmichClient(server.url, "key", max_retries=0)
+    try:
+        assert client.find_asset_by_filename(file_name(7)) == asset_id(7)
+        assert client.find_asset_by_filename(file_name(LIBRARY_SIZE)) is None
+
+        window: list[dict[str, Any]] = list(
+            client.iter_assets(
+                page_size=3,
+                takenAfter=taken_at(BASE_TIME, 9).isoformat(),
+                takenBefore=taken_at(BASE_TIME, 2).isoformat(),
+            )
+        )
+        assert [asset["id"] for asset in window] == [asset_id(n) for n in range(2, 10)]
+        assert len(list(client.iter_assets(page_size=7))) == LIBRARY_SIZE
+
+        assert client.update_asset_description(asset_id(3), "New")
+        assert client.get_asset_description(asset_id(3)) == "New"
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_run_benchmark_stores_results(tmp_path: Path) -> None:
+    """Test a small benchmark run end to end and the stored result history.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    options: BenchmarkOptions = BenchmarkOptions(items=BENCHMARK_ITEMS, library_size=BENCHMARK_ITEMS - 5)
+
+    result: dict[str, Any] = run_benchmark(options)
+    store_result(str(tmp_path), result)
+
+    assert result["items"] == BENCHMARK_ITEMS
+    assert result["updated"] == BENCHMARK_ITEMS - 5
+    assert result["items_per_sec"] > 0
+    assert result["p99_ms"] >= result["p50_ms"]
+    assert load_previous(str(tmp_path), options.scenario) == result
@@ -0,0 +1,170 @@
+"""Test the pluggable JSON codec."""
+
+import json
+from collections.abc import Iterator
+from types import SimpleNamespace
+
+import pytest
+from pytest import LogCaptureFixture, MonkeyPatch
+
+from app import codec
+from app.media_record import MediaRecord
+from app.takeout_client import Sidecar, SidecarTime, parse_sidecar
+
+SIDECAR: bytes = json.dumps(
+    {
+        "title": "IMG_0001.jpg",
+        "description": "Sunset at the beach",
+        "photoTakenTime": {"timestamp": "1712750400", "formatted": "Apr 10, 2024, 12:00:00 PM UTC"},
+        "geoData": {"latitude": 50.0875, "longitude": 14.4214, "altitude": 0.0},
+        "favorited": True,
+        "url": "https://photos.google.com/photo/abc",
+    }
+).encode()
+
+
+@pytest.fixture(autouse=True)
+def restore_backend() -> Iterator[None]:
+    """Restore the automatically selected backend after each test."""
+    yield
+    codec.set_backend()
+
+
+@pytest.mark.parametrize("backend", codec.available_backends())
+def test_round_trip(backend: str) -> None:
+    """Test encoding and decoding with every installed backend.
+
+    :param backend: JSON backend name.
+    """
+    assert codec.set_backend(backend) == backend
+    value: dict = {"id": "asset123", "tags": ["a", "ü"], "size": 42, "ok": True, "none": None}
+
+    assert codec.loads(codec.dumps(value)) == value
+    assert codec.loads('{"a": 1}') == {"a": 1}
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+
+@pytest.mark.parametrize("backend", codec.available_backends())
+def test_parse_sidecar_with_every_backend(backend: str) -> None:
+    """Test that every backend decodes a Takeout sidecar into the same media record.
+
+    :param backend: JSON backend name.
+    """
+    codec.set_backend(backend)
+
+    assert parse_sidecar("Takeout/IMG_0001.jpg.json", SIDECAR) == MediaRecord(
+        id="Takeout/IMG_0001.jpg.json",
+        filename="IMG_0001.jpg",
+        description="Sunset at the beach",
+        creation_time="2024-04-10T12:00:00Z",
+        latitude=50.0875,
+        longitude=14.4214,
+        favorite=True,
+    )
+    assert parse_sidecar("Trip/metadata.json", b'{"title": "Trip", "date": {"timestamp": "1"}}') is None
+    assert parse_sidecar("print-subscriptions.json", b"[]") is None
+
+
+@pytest.mark.parametrize("backend", codec.available_backends())
+def test_parse_sidecar_malformed_blocks(backend: str) -> None:
+    """Test that every backend drops only the malformed blocks of a sidecar and keeps the rest.
+
+    :param backend: JSON backend name.
+    """
+    codec.set_backend(backend)
+    data: bytes = json.dumps(
+        {
+            "title": "IMG_0001.jpg",
+            "photoTakenTime": {"timestamp": "1712750400"},
+            "geoData": {"latitude": "north", "longitude": 14.4214},
+            "geoDataExif": {"latitude": 50.0875, "longitude": 14.4214},
+            "favorited": None,
+        }
+    ).encode()
+
+    assert parse_sidecar("Takeout/IMG_0001.jpg.json", data) == MediaRecord(
+        id="Takeout/IMG_0001.jpg.json",
+        filename="IMG_0001.jpg",
+        creation_time="2024-04-10T12:00:00Z",
+        latitude=50.0875,
+        longitude=14.4214,
+    )
+
+
+def test_decode_typed_falls_back_on_validation_error(monkeypatch: MonkeyPatch) -> None:
+    """Test that a document failing the typed validation is built with the converter instead.
+
+    :param monkeypatch: The pytest monkeypatch fixture.
+    """
+
+    class DecodeError(ValueError):
+        """Stand-in for msgspec.DecodeError."""
+
+    class ValidationError(DecodeError):
+        """Stand-in for msgspec.ValidationError."""
+
+    def typed_decode(data: bytes | str, type: object = None) -> object:
+        if type is not None:
+            raise ValidationError("Expected `bool`, got `null`")
+        return json.loads(data)
+
+    monkeypatch.setattr(
+        codec,
+        "msgspec",
+        SimpleNamespace(
+            DecodeError=DecodeError, ValidationError=ValidationError, json=SimpleNamespace(decode=typed_decode)
+        ),
+    )
+    monkeypatch.setattr(codec, "backend", "msgspec")
+
+    sidecar: Sidecar = codec.decode(b'{"title": "IMG_0001.jpg", "favorited": null}', Sidecar, Sidecar.from_dict)
+
+    assert sidecar == Sidecar(title="IMG_0001.jpg")
+
+
+def test_decode_converts_without_typed_backend() -> None:
+    """Test that backends without typed decoding build the record with the converter."""
+    codec.set_backend("json")
+
+    sidecar: Sidecar = codec.decode(SIDECAR, Sidecar, Sidecar.from_dict)
+
+    assert sidecar.title == "IMG_0001.jpg"
+    assert sidecar.photoTakenTime == SidecarTime("1712750400")
+    with pytest.raises(ValueError, match="Not a Takeout sidecar"):
+        codec.decode(b'{"description": "no title"}', Sidecar, Sidecar.from_dict)
+
+
+def test_decode_typed_with_msgspec() -> None:
+    """Test that msgspec decodes straight into the record type without calling the converter."""
+    pytest.importorskip("msgspec")
+    codec.set_backend("msgspec")
+
+    def convert(value: object) -> Sidecar:
+        raise AssertionError("converter must not be called")
+
+    sidecar: Sidecar = codec.decode(SIDECAR, Sidecar, convert)
+
+    assert sidecar.title == "IMG_0001.jpg"
+    assert sidecar.favorited is True
+    with pytest.raises(ValueError, match="Not a Takeout sidecar"):
+        codec.decode(b'{"title": 1}', Sidecar, Sidecar.from_dict)
+    with pytest.raises(ValueError):
+        codec.decode(b"{not json", Sidecar, convert)
+
+
+def test_set_backend_falls_back(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that a backend that is not installed falls back to the best installed one.
+
+    :param monkeypatch: The pytest monkeypatch fixture.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    monkeypatch.setattr(codec, "msgspec", None)
+    monkeypatch.setattr(codec, "orjson", None)
+
+    with caplog.at_level("WARNING"):
+        assert codec.set_backend("msgspec") == "json"
+
+    assert "JSON backend msgspec is not installed, using json" in caplog.text
+    with pytest.raises(ValueError, match="Unknown JSON backend"):
+        codec.set_backend("simplejson")
@@ -5,6 +5,7 @@ from pytest import MonkeyPatch
 from app.config import Config
 
 TEST_DAY_BACK: int = 7
+TEST_SYNC_WORKERS: int = 8
 
 def test_load_config(monkeypatch: MonkeyPatch) -> None:
     """Test loading configuration from environment variables.
@@ -15,6 +16,7 @@ def test_load_config(monkeypatch: MonkeyPatch) -> None:
     monkeypatch.setenv("IMMICH_BASE_URL", "http://localhost:2283/api")
     monkeypatch.setenv("IMMICH_API_KEY", "dummy-api-key")
     monkeypatch.setenv("DAYS_BACK", f"{TEST_DAY_BACK}")
+    monkeypatch.setenv("SYNC_WORKERS", f"{TEST_SYNC_WORKERS}")
 
     config: Config = Config.load()
 
@@ -22,3 +24,4 @@ def test_load_config(monkeypatch: MonkeyPatch) -> None:
     assert config.immich_base_url == "http://localhost:2283/api"
     assert config.immich_api_key == "dummy-api-key"
     assert config.days_back == TEST_DAY_BACK
+    assert config.sync_workers == TEST_SYNC_WORKERS
@@ -1,26 +1,249 @@
 """Test Google Photos Client functionality."""
 
+import datetime
+import json
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
 from typing import Any
+from unittest.mock import MagicMock
 
-from app.gphotos_client import GooglePhotosClient
+import pytest
+import requests
+import requests_mock
+from googleapiclient.http import HttpMockSequence, HttpRequest
+from googleapiclient.model import JsonModel
+
+from app.gphotos_client import DISCOVERY_CACHE_TTL, DISCOVERY_URL, GooglePhotosClient, parse_media_item
 from app.log import get_logger
+from app.media_record import MediaRecord
+from app.metrics import HTTP_BYTES
 
 
-def test_extract_metadata() -> None:
-    """Test extracting metadata from a Google Photos media item."""
+def test_parse_media_item() -> None:
+    """Test building a compact record from a Google Photos media item."""
     media_item: dict[str, Any] = {
         "id": "abc123",
         "filename": "photo.jpg",
         "description": "Sunset at the beach",
-        "mediaMetadata": {"creationTime": "2024-04-10T12:00:00Z"},
+        "mediaMetadata": {"creationTime": "2024-04-10T12:00:00Z", "width": "4032", "photo": {}},
+        "baseUrl": "https://lh3.googleusercontent.com/abc123",
     }
 
+    record: MediaRecord = parse_media_item(media_item)
+
+    assert record == MediaRecord(
+        id="abc123", filename="photo.jpg", description="Sunset at the beach", creation_time="2024-04-10T12:00:00Z"
+    )
+    assert record.filename is sys.intern("photo" + ".jpg")
+    assert not hasattr(record, "__dict__")
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_iter_media_items_yields_page_by_page() -> None:
+    """Test that media items are streamed page by page without collecting the whole result set."""
+    pages: list[dict[str, Any]] = [
+        {"mediaItems": [{"id": "1"}, {"id": "2"}], "nextPageToken": "t"},
+        {"mediaItems": [{"id": "3"}]},
+    ]
+    first_request, second_request = MagicMock(), MagicMock()
+    first_request.execute.return_value = pages[0]
+    second_request.execute.return_value = pages[1]
+
+    service = MagicMock()
+    service.mediaItems.return_value.search.return_value = first_request
+    service.mediaItems.return_value.search_next.side_effect = [second_request, None]
+
+    client: GooglePhotosClient = GooglePhotosClient.__new__(GooglePhotosClient)  # Avoid __init__ (no auth)
+    client.logger = get_logger("TestClient")
+    client.service = service
+    client.shards = 1
+
+    items = client.iter_media_items(days_back=7)
+
+    assert next(items).id == "1"
+    second_request.execute.assert_not_called()
+    assert [item.id for item in items] == ["2", "3"]
+
+
+def test_iter_media_items_sharded() -> None:
+    """Test that a long window is split into date shards fetched concurrently and merged without duplicates."""
+    bodies: list[dict[str, Any]] = []
+
+    def search(body: dict[str, Any]) -> MagicMock:
+        bodies.append(body)
+        date_range: dict[str, Any] = body["filters"]["dateFilter"]["ranges"][0]
+        request = MagicMock()
+        shard: str = f"{date_range['endDate']['month']}-{date_range['endDate']['day']}"
+        request.execute.return_value = {"mediaItems": [{"id": shard}, {"id": "shared"}]}
+        return request
+
+    service = MagicMock()
+    service.mediaItems.return_value.search.side_effect = search
+    service.mediaItems.return_value.search_next.return_value = None
+
     client: GooglePhotosClient = GooglePhotosClient.__new__(GooglePhotosClient)  # Avoid __init__ (no auth)
-    client.logger = get_logger("TestClient")  # Use a test logger
+    client.logger = get_logger("TestClient")
+    client.service = service
+    client.shards = 3
+    client.shard_days = 7
+    client.credentials = MagicMock()
+    client._local = threading.local()
+
+    items: list[MediaRecord] = list(client.iter_media_items(days_back=20))
+
+    today: datetime.date = datetime.datetime.now(datetime.UTC).date()
+    ends: list[datetime.date] = [today - datetime.timedelta(days=days) for days in (0, 7, 14)]
+    assert len(bodies) == len(ends)
+    assert [item.id for item in items] == [f"{ends[0].month}-{ends[0].day}", "shared"] + [
+        f"{end.month}-{end.day}" for end in ends[1:]
+    ]
+    oldest: dict[str, int] = min(
+        (body["filters"]["dateFilter"]["ranges"][0]["startDate"] for body in bodies),
+        key=lambda date: (date["year"], date["month"], date["day"]),
+    )
+    start: datetime.date = today - datetime.timedelta(days=20)
+    assert oldest == {"year": start.year, "month": start.month, "day": start.day}
+
+
+def _list_service(pages: list[list[int]]) -> tuple[MagicMock, list[MagicMock]]:
+    """Build a service mock whose `mediaItems.list` returns pages of items taken the given days ago.
+
+    :param pages: Per page, the age in days of each item.
+    :return: Tuple of (service, page requests).
+    """
+    now: datetime.datetime = datetime.datetime.now(datetime.UTC)
+
+    def taken(age: int) -> str:
+        return (now - datetime.timedelta(days=age)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    requests_: list[MagicMock] = []
+    for number, ages in enumerate(pages):
+        request = MagicMock()
+        request.execute.return_value = {
+            "mediaItems": [{"id": f"{number}-{age}", "mediaMetadata": {"creationTime": taken(age)}} for age in ages]
+        }
+        requests_.append(request)
+    service = MagicMock()
+    service.mediaItems.return_value.list.return_value = requests_[0]
+    service.mediaItems.return_value.list_next.side_effect = [*requests_[1:], None]
+    return service, requests_
+
+
+def test_iter_media_items_all_stops_past_window() -> None:
+    """Test that the full listing stops once pages are past the window instead of walking the whole library."""
+    service, pages = _list_service([[1, 3], [6, 9], [20, 25], [30, 31], [2]])
+
+    client: GooglePhotosClient = GooglePhotosClient.__new__(GooglePhotosClient)  # Avoid __init__ (no auth)
+    client.logger = get_logger("TestClient")
+    client.service = service
+
+    items: list[MediaRecord] = client.fetch_media_items_all(days_back=7)
+
+    assert [item.id for item in items] == ["0-1", "0-3", "1-6"]
+    pages[3].execute.assert_called_once()
+    pages[4].execute.assert_not_called()
+
+
+def test_iter_media_items_all_falls_back_to_search(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that an out-of-order listing falls back to the server-side filtered search without duplicates.
+
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    service, _ = _list_service([[1], [20], [2]])
+    search_request = MagicMock()
+    search_request.execute.return_value = {"mediaItems": [{"id": "0-1"}, {"id": "2-2"}]}
+    service.mediaItems.return_value.search.return_value = search_request
+    service.mediaItems.return_value.search_next.return_value = None
+
+    client: GooglePhotosClient = GooglePhotosClient.__new__(GooglePhotosClient)  # Avoid __init__ (no auth)
+    client.logger = get_logger("TestClient")
+    client.service = service
+    client.shards = 1
+
+    with caplog.at_level("WARNING"):
+        items: list[MediaRecord] = client.fetch_media_items_all(days_back=7)
+
+    assert [item.id for item in items] == ["0-1", "2-2"]
+    assert "falling back to the filtered search" in caplog.text
+
+
+def test_client_construction_is_lazy(tmp_path: Path) -> None:
+    """Test that constructing the client reads no files and builds no service.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    client: GooglePhotosClient = GooglePhotosClient(str(tmp_path / "missing.json"))
+
+    assert "service" not in vars(client)
+    assert "credentials" not in vars(client)
+
+
+def test_discovery_document_is_cached(tmp_path: Path) -> None:
+    """Test that the discovery document is downloaded once and then served from the on-disk cache.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    cache_path: Path = tmp_path / "cache" / "discovery.json"
+    client: GooglePhotosClient = GooglePhotosClient("dummy", discovery_cache_path=str(cache_path))
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get(DISCOVERY_URL, json={"name": "photoslibrary"})
+        assert client._load_discovery_document() == {"name": "photoslibrary"}
+        assert client._load_discovery_document() == {"name": "photoslibrary"}
+        assert mocker.call_count == 1
+
+    assert json.loads(cache_path.read_text())["url"] == DISCOVERY_URL
+
+
+def test_stale_discovery_document_used_when_refresh_fails(tmp_path: Path) -> None:
+    """Test that an expired cache entry is refreshed, and still used if the download fails.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    cache_path: Path = tmp_path / "discovery.json"
+    fetched: float = time.time() - DISCOVERY_CACHE_TTL - 1
+    cache_path.write_text(json.dumps({"url": DISCOVERY_URL, "fetched": fetched, "document": {"name": "old"}}))
+    client: GooglePhotosClient = GooglePhotosClient("dummy", discovery_cache_path=str(cache_path))
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get(DISCOVERY_URL, exc=requests.ConnectionError)
+        assert client._load_discovery_document() == {"name": "old"}
+
+        mocker.get(DISCOVERY_URL, json={"name": "new"})
+        assert client._load_discovery_document() == {"name": "new"}
+
+
+def test_discovery_cache_for_other_version_is_ignored(tmp_path: Path) -> None:
+    """Test that a cache entry written for another discovery URL is not used.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    cache_path: Path = tmp_path / "discovery.json"
+    cache_path.write_text(json.dumps({"url": "other", "fetched": time.time(), "document": {"name": "old"}}))
+    client: GooglePhotosClient = GooglePhotosClient("dummy", discovery_cache_path=str(cache_path))
+
+    with requests_mock.Mocker() as mocker:
+        mocker.get(DISCOVERY_URL, exc=requests.ConnectionError)
+        with pytest.raises(requests.ConnectionError):
+            client._load_discovery_document()
+
 
-    metadata: dict[str, str | None] = client.extract_metadata(media_item)
+def test_execute_records_page_sizes() -> None:
+    """Test that the request and response body sizes of a page are recorded in the metrics."""
+    content: bytes = b'{"mediaItems": [{"id": "1"}]}'
+    request: HttpRequest = HttpRequest(
+        HttpMockSequence([({"status": "200"}, content)]),
+        JsonModel().response,
+        "https://photoslibrary.googleapis.com/v1/mediaItems:search",
+        method="POST",
+        body='{"pageSize": 100}',
+    )
+    sent: float = HTTP_BYTES.value(service="google", direction="sent")
+    received: float = HTTP_BYTES.value(service="google", direction="received")
 
-    assert metadata["id"] == "abc123"
-    assert metadata["filename"] == "photo.jpg"
-    assert metadata["description"] == "Sunset at the beach"
-    assert metadata["creationTime"] == "2024-04-10T12:00:00Z"
+    assert GooglePhotosClient._execute(request, "POST", "/v1/mediaItems:search") == {"mediaItems": [{"id": "1"}]}
+    assert HTTP_BYTES.value(service="google", direction="sent") == sent + len('{"pageSize": 100}')
+    assert HTTP_BYTES.value(service="google", direction="received") == received + len(content)
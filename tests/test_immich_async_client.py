@@ -0,0 +1,73 @@
+"""Test cases for the AsyncImmichClient class."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+
+import httpx
+
+from app.immich_async_client import AsyncImmichClient
+
+
+def _client(handler: httpx.MockTransport) -> AsyncImmichClient:
+    """Create an async client backed by a mock transport.
+
+    :param handler: Mock transport answering the requests.
+    :return: AsyncImmichClient instance for testing.
+    """
+    return AsyncImmichClient(
+        base_url="http://immich.local/api", api_key="test-key", http2=False, retry_backoff=0, transport=handler
+    )
+
+
+def test_find_asset_by_filename_found() -> None:
+    """Test finding an asset by filename."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["x-api-key"] == "test-key"
+        assert json.loads(request.content) == {"originalFileName": "photo.jpg"}
+        return httpx.Response(200, json={"assets": {"items": [{"id": "123"}], "nextPage": None}})
+
+    async def scenario() -> str | None:
+        client = _client(httpx.MockTransport(handler))
+        try:
+            return await client.find_asset_by_filename("photo.jpg")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == "123"
+
+
+def test_update_asset_description_retries_on_503() -> None:
+    """Test that a 503 response is retried before the update succeeds."""
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(503 if len(calls) == 1 else 200)
+
+    async def scenario() -> bool:
+        client = _client(httpx.MockTransport(handler))
+        try:
+            return await client.update_asset_description("123", "A lovely view")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) is True
+    assert calls == ["/api/assets/123", "/api/assets/123"]
+
+
+def test_get_asset_description_error() -> None:
+    """Test getting an asset description when the request fails."""
+
+    async def scenario() -> str:
+        client = _client(httpx.MockTransport(lambda request: httpx.Response(404)))
+        try:
+            return await client.get_asset_description("abc123")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(scenario()) == ""
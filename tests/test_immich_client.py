@@ -1,9 +1,13 @@
 """Test cases for the ImmichClient class."""
 
 import pytest
+import requests
 import requests_mock
+from requests.adapters import HTTPAdapter
 
-from app.immich_client import ImmichClient
+from app.immich_client import ImmichClient, endpoint_label
+from app.metrics import HTTP_BYTES, HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_FLIGHT
+from app.rate_limiter import AdaptiveRateLimiter
 
 
 @pytest.fixture
@@ -65,7 +69,7 @@ def test_update_asset_description_success(requests_mock: requests_mock.Mocker, c
     :param requests_mock: The requests_mock fixture to mock HTTP requests.
     :param client: The ImmichClient instance to test.
     """
-    requests_mock.put("http://immich.local/api/asset/123", status_code=200)
+    requests_mock.put("http://immich.local/api/assets/123", status_code=200)
 
     result: bool = client.update_asset_description("123", "A lovely view")
     assert result is True
@@ -77,12 +81,28 @@ def test_update_asset_description_failure(requests_mock: requests_mock.Mocker, c
     :param requests_mock: The requests_mock fixture to mock HTTP requests.
     :param client: The ImmichClient instance to test.
     """
-    requests_mock.put("http://immich.local/api/asset/123", status_code=400)
+    requests_mock.put("http://immich.local/api/assets/123", status_code=400)
 
     result: bool = client.update_asset_description("123", "A lovely view")
     assert result is False
 
 
+def test_update_asset_fields(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test updating several fields of one asset and flags of many assets at once.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    single = requests_mock.put("http://immich.local/api/assets/123", status_code=200)
+    bulk = requests_mock.put("http://immich.local/api/assets", status_code=204)
+
+    assert client.update_asset("123", {"description": "A lovely view", "latitude": 1.5, "longitude": 2.5}) is True
+    assert client.update_assets(["123", "456"], {"isFavorite": True}) is True
+
+    assert single.request_history[0].json() == {"description": "A lovely view", "latitude": 1.5, "longitude": 2.5}
+    assert bulk.request_history[0].json() == {"ids": ["123", "456"], "isFavorite": True}
+
+
 def test_get_asset_description_success(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
     """Test getting an asset description successfully.
 
@@ -125,3 +145,184 @@ def test_get_asset_description_error(requests_mock: requests_mock.Mocker, client
 
     desc: str = client.get_asset_description(asset_id)
     assert desc == ""
+
+
+def test_client_reuses_pooled_session(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test that all requests go through the client's session with auth headers and timeouts.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    requests_mock.put("http://immich.local/api/assets/123", status_code=200)
+    requests_mock.get("http://immich.local/api/assets/123", json={})
+
+    client.update_asset_description("123", "A lovely view")
+    client.get_asset_description("123")
+
+    assert requests_mock.call_count == 2  # noqa: PLR2004
+    for request in requests_mock.request_history:
+        assert request.headers["x-api-key"] == "test-key"
+        assert request.timeout == client.timeout
+
+
+def test_client_session_retry_configuration() -> None:
+    """Test that the pooled session retries on 429/5xx with the configured pool size."""
+    client = ImmichClient(base_url="http://immich.local/api", api_key="test-key", pool_size=4, max_retries=5)
+
+    adapter = client.session.adapters["https://"]
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_maxsize == 4  # type: ignore[attr-defined]  # noqa: PLR2004
+    assert adapter.max_retries.total == 5  # noqa: PLR2004
+    assert 429 in adapter.max_retries.status_forcelist  # noqa: PLR2004
+
+
+def test_iter_assets_paginates(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test iterating over all assets follows `nextPage` until exhausted.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    requests_mock.post(
+        "http://immich.local/api/search/metadata",
+        [
+            {"json": {"assets": {"items": [{"id": "1"}, {"id": "2"}], "nextPage": "2"}}},
+            {"json": {"assets": {"items": [{"id": "3"}], "nextPage": None}}},
+        ],
+    )
+
+    assets = list(client.iter_assets(page_size=2))
+
+    assert [asset["id"] for asset in assets] == ["1", "2", "3"]
+    assert [request.json()["page"] for request in requests_mock.request_history] == [1, 2]
+    assert requests_mock.request_history[0].json()["size"] == 2  # noqa: PLR2004
+
+
+def test_search_asset_by_filename_with_exif(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test searching an asset with EXIF info returns the full asset.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    requests_mock.post(
+        "http://immich.local/api/search/metadata",
+        json={"assets": {"items": [{"id": "123", "exifInfo": {"description": "A lovely view"}}], "nextPage": None}},
+    )
+
+    asset = client.search_asset_by_filename("photo.jpg", with_exif=True)
+
+    assert asset is not None
+    assert asset["exifInfo"]["description"] == "A lovely view"
+    assert requests_mock.request_history[0].json() == {"originalFileName": "photo.jpg", "withExif": True}
+
+
+def test_rate_limited_client_retries_throttled_request(requests_mock: requests_mock.Mocker) -> None:
+    """Test that a rate-limited client retries 429 responses and reports them to the limiter.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    """
+    limiter = AdaptiveRateLimiter(100.0)
+    client = ImmichClient(base_url="http://immich.local/api", api_key="test-key", rate_limiter=limiter)
+    requests_mock.put(
+        "http://immich.local/api/assets/123",
+        [{"status_code": 429, "headers": {"Retry-After": "0"}}, {"status_code": 200}],
+    )
+
+    assert client.update_asset_description("123", "A lovely view") is True
+    assert requests_mock.call_count == 2  # noqa: PLR2004
+    assert limiter.rate == pytest.approx(50.0, abs=0.1)
+
+
+def test_rate_limited_client_paces_every_retry(requests_mock: requests_mock.Mocker) -> None:
+    """Test that a rate-limited client retries timeouts and 5xx itself, reporting every attempt to the limiter.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    """
+    limiter = AdaptiveRateLimiter(100.0, cooldown=0.0)
+    client = ImmichClient(
+        base_url="http://immich.local/api", api_key="test-key", retry_backoff=0.0, rate_limiter=limiter
+    )
+    requests_mock.put(
+        "http://immich.local/api/assets/123",
+        [{"exc": requests.exceptions.ReadTimeout}, {"status_code": 502}, {"status_code": 200}],
+    )
+
+    assert client.session.adapters["https://"].max_retries.total == 0  # type: ignore[attr-defined]
+    assert client.update_asset_description("123", "A lovely view") is True
+    assert requests_mock.call_count == 3  # noqa: PLR2004
+    assert limiter.rate < 100.0  # noqa: PLR2004
+
+    requests_mock.put("http://immich.local/api/assets/123", exc=requests.exceptions.ConnectTimeout)
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        client.update_asset_description("123", "A lovely view")
+
+
+def test_requests_are_instrumented(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test that request latency and transferred bytes are recorded per endpoint.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    requests_mock.put("http://immich.local/api/assets/abc", status_code=200, text="{}")
+    labels: dict[str, str] = {"service": "immich", "method": "PUT", "endpoint": "/assets/{id}", "status": "200"}
+    before: int = HTTP_REQUEST_SECONDS.count(**labels)
+    received: float = HTTP_BYTES.value(service="immich", direction="received")
+
+    client.update_asset_description("abc", "New")
+
+    assert HTTP_REQUEST_SECONDS.count(**labels) == before + 1
+    assert HTTP_BYTES.value(service="immich", direction="received") == received + 2
+    assert HTTP_REQUESTS_IN_FLIGHT.value(service="immich") == 0
+
+
+def test_endpoint_label() -> None:
+    """Test that asset IDs are collapsed in endpoint metric labels."""
+    assert endpoint_label("http://immich.local/api", "http://immich.local/api/assets/abc") == "/assets/{id}"
+    assert endpoint_label("http://immich.local/api", "http://immich.local/api/search/metadata") == "/search/metadata"
+
+
+def test_album_endpoints(requests_mock: requests_mock.Mocker, client: ImmichClient) -> None:
+    """Test listing, reading and creating albums and adding assets in batches.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    :param client: The ImmichClient instance to test.
+    """
+    requests_mock.get("http://immich.local/api/albums", json=[{"id": "a1", "albumName": "Trip", "assetCount": 1}])
+    requests_mock.get("http://immich.local/api/albums/a1", json={"id": "a1", "assets": [{"id": "x"}]})
+    requests_mock.post("http://immich.local/api/albums", json={"id": "a2"})
+    add = requests_mock.put(
+        "http://immich.local/api/albums/a2/assets",
+        [
+            {"json": [{"id": "1", "success": True}, {"id": "2", "success": False, "error": "duplicate"}]},
+            {"status_code": 500},
+            {"json": [{"id": "5", "success": True}]},
+        ],
+    )
+
+    assert client.list_albums()[0]["albumName"] == "Trip"
+    assert client.get_album_asset_ids("a1") == {"x"}
+    assert client.create_album("Beach") == "a2"
+    assert client.add_assets_to_album("a2", ["1", "2", "3", "4", "5"], batch_size=2) == 2  # noqa: PLR2004
+    batches: list[dict[str, list[str]]] = [request.json() for request in add.request_history]
+    assert batches == [{"ids": ["1", "2"]}, {"ids": ["3", "4"]}, {"ids": ["5"]}]
+    assert endpoint_label(client.base_url, "http://immich.local/api/albums/a2/assets") == "/albums/{id}/assets"
+
+
+def test_create_album_is_not_resent(requests_mock: requests_mock.Mocker) -> None:
+    """Test that a timed-out album creation is looked up instead of being sent again.
+
+    :param requests_mock: The requests_mock fixture to mock HTTP requests.
+    """
+    client = ImmichClient(base_url="http://immich.local/api", api_key="test-key", retry_backoff=0.0)
+    create = requests_mock.post(
+        "http://immich.local/api/albums", [{"exc": requests.exceptions.ReadTimeout}, {"json": {"id": "a3"}}]
+    )
+    albums = requests_mock.get(
+        "http://immich.local/api/albums", [{"json": []}, {"json": [{"id": "a2", "albumName": "Beach"}]}]
+    )
+
+    assert client.single_session.adapters["https://"].max_retries.total == 0  # type: ignore[attr-defined]
+    assert client.create_album("Beach") == "a3"
+    assert (create.call_count, albums.call_count) == (2, 1)
+
+    requests_mock.post("http://immich.local/api/albums", exc=requests.exceptions.ReadTimeout)
+    assert client.create_album("Beach") == "a2"
@@ -0,0 +1,42 @@
+"""Test cases for the SyncJournal class."""
+
+from pathlib import Path
+
+from app.journal import RESULT_FAILED, RESULT_NOT_FOUND, RESULT_UPDATED, SyncJournal
+
+
+def test_journal_replays_successful_pushes(tmp_path: Path) -> None:
+    """Test that a reopened journal skips items whose description did not change.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: str = str(tmp_path / "state" / "journal.jsonl")
+    journal = SyncJournal(path)
+    journal.record("1", "Sunset", RESULT_UPDATED)
+    journal.record("2", "Beach", RESULT_NOT_FOUND)
+    journal.record("3", "Hills", RESULT_UPDATED)
+    journal.record("3", "Hills", RESULT_FAILED)
+    journal.close()
+
+    reopened = SyncJournal(path)
+
+    assert reopened.is_unchanged("1", "Sunset")
+    assert not reopened.is_unchanged("1", "Sunset at the beach")
+    assert not reopened.is_unchanged("2", "Beach")
+    assert not reopened.is_unchanged("3", "Hills")
+    assert reopened.hits == 1
+
+
+def test_journal_ignores_truncated_line(tmp_path: Path) -> None:
+    """Test that a line truncated by a crash does not break replay.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: Path = tmp_path / "journal.jsonl"
+    journal = SyncJournal(str(path))
+    journal.record("1", "Sunset", RESULT_UPDATED)
+    journal.close()
+    with open(path, "a", encoding="utf-8") as journal_file:
+        journal_file.write('{"id": "2", "ha')
+
+    assert SyncJournal(str(path)).is_unchanged("1", "Sunset")
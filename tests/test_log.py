@@ -0,0 +1,82 @@
+"""Test the logging formatters and queue handler."""
+
+import datetime
+import json
+import logging
+import queue
+import sys
+
+from app.log import DeferredQueueHandler, FixedWidthFormatter, JsonFormatter, TimestampCache, create_formatter
+
+
+def _record(message: str, *args: object) -> logging.LogRecord:
+    """Create a log record.
+
+    :param message: Message format string.
+    :param args: Message arguments.
+    :return: A log record of the "sync" logger.
+    """
+    return logging.LogRecord("sync", logging.INFO, "sync.py", 42, message, args, None, func="run")
+
+
+def test_timestamp_cache_matches_datetime_formatting() -> None:
+    """Test that cached timestamps equal a full local ISO 8601 rendering, also across second boundaries."""
+    cache: TimestampCache = TimestampCache()
+    for created in (1_745_150_400.123, 1_745_150_400.999, 1_745_150_401.0):
+        local: datetime.datetime = datetime.datetime.fromtimestamp(created, tz=datetime.UTC).astimezone()
+        milliseconds: int = int((created - int(created)) * 1000)  # as LogRecord.msecs
+        expected: str = local.strftime("%Y-%m-%dT%H:%M:%S.") + f"{milliseconds:03d}" + local.strftime("%z")
+        assert cache.format(created) == expected
+
+
+def test_fixed_width_formatter_does_not_mutate_record() -> None:
+    """Test the text format pads the level name without changing the record seen by other handlers."""
+    record: logging.LogRecord = _record("Updated %d items.", 3)
+
+    line: str = create_formatter("text").format(record)
+
+    assert isinstance(create_formatter("text"), FixedWidthFormatter)
+    assert line.endswith(" - INFO     (sync.run:42) - Updated 3 items.")
+    assert record.levelname == "INFO"
+
+
+def test_json_formatter() -> None:
+    """Test that records are rendered as JSON objects including exception text."""
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record: logging.LogRecord = _record("Failed to update: %s", "photo.jpg")
+        record.exc_info = sys.exc_info()
+
+    entry: dict[str, object] = json.loads(JsonFormatter().format(record))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "sync"
+    assert entry["message"] == "Failed to update: photo.jpg"
+    assert "ValueError: boom" in str(entry["exception"])
+
+
+def test_deferred_queue_handler_leaves_formatting_to_listener() -> None:
+    """Test that records are enqueued without merging the arguments into the message."""
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    record: logging.LogRecord = _record("Updated: %s", "photo.jpg")
+
+    DeferredQueueHandler(records).handle(record)
+
+    queued: logging.LogRecord = records.get_nowait()
+    assert queued.msg == "Updated: %s"
+    assert queued.args == ("photo.jpg",)
+    assert queued.getMessage() == "Updated: photo.jpg"
+
+
+def test_deferred_queue_handler_merges_mutable_arguments() -> None:
+    """Test that arguments which may change after logging are merged into the message before enqueueing."""
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    config: dict[str, int] = {"workers": 1}
+
+    DeferredQueueHandler(records).handle(_record("Initialized with config: %s", config))
+    config["workers"] = 8
+
+    queued: logging.LogRecord = records.get_nowait()
+    assert queued.args is None
+    assert queued.getMessage() == "Initialized with config: {'workers': 1}"
@@ -0,0 +1,111 @@
+"""Test the in-process metrics registry and its exporters."""
+
+from pathlib import Path
+
+import pytest
+import requests
+
+from app.metrics import OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, Metric, MetricsRegistry, start_http_server
+
+
+def _registry() -> MetricsRegistry:
+    """Create a registry with one metric of every kind.
+
+    :return: Populated registry.
+    """
+    registry: MetricsRegistry = MetricsRegistry()
+    requests_total = registry.counter("app_requests", "Requests.", ("endpoint",))
+    in_flight = registry.gauge("app_in_flight", "In-flight requests.")
+    latency = registry.histogram("app_latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+
+    requests_total.inc(endpoint="/asset/{id}")
+    requests_total.inc(2, endpoint='/search "metadata"')
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.05, endpoint="/search")
+    latency.observe(0.5, endpoint="/search")
+    latency.observe(5, endpoint="/search")
+    return registry
+
+
+def test_render_prometheus_text() -> None:
+    """Test rendering counters, gauges and histograms in the Prometheus text format."""
+    text: str = _registry().render()
+
+    assert "# TYPE app_requests_total counter" in text
+    assert 'app_requests_total{endpoint="/asset/{id}"} 1.0' in text
+    assert 'app_requests_total{endpoint="/search \\"metadata\\""} 2.0' in text
+    assert "app_in_flight 1.0" in text
+    assert 'app_latency_seconds_bucket{endpoint="/search",le="0.1"} 1' in text
+    assert 'app_latency_seconds_bucket{endpoint="/search",le="1.0"} 2' in text
+    assert 'app_latency_seconds_bucket{endpoint="/search",le="+Inf"} 3' in text
+    assert 'app_latency_seconds_count{endpoint="/search"} 3' in text
+    assert 'app_latency_seconds_sum{endpoint="/search"} 5.55' in text
+    assert "# EOF" not in text
+
+
+def test_render_openmetrics() -> None:
+    """Test that OpenMetrics names counter families without the suffix and terminates with EOF."""
+    text: str = _registry().render(openmetrics=True)
+
+    assert "# TYPE app_requests counter" in text
+    assert 'app_requests_total{endpoint="/asset/{id}"} 1.0' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_labels_are_validated() -> None:
+    """Test that samples must carry exactly the declared labels."""
+    counter = MetricsRegistry().counter("app_items", "Items.", ("result",))
+
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(status="ok")
+
+
+def test_metric_kind_must_render_samples() -> None:
+    """Test that a metric family without `samples` and `reset` cannot be instantiated."""
+    with pytest.raises(TypeError, match="abstract"):
+        Metric("app_items", "Items.")  # type: ignore[abstract]
+
+
+def test_duplicate_metric_is_rejected() -> None:
+    """Test that a metric name can only be registered once."""
+    registry: MetricsRegistry = MetricsRegistry()
+    registry.counter("app_items", "Items.")
+
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("app_items", "Items.")
+
+
+def test_write_textfile(tmp_path: Path) -> None:
+    """Test the textfile collector dump.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: Path = tmp_path / "collector" / "gphoto2immich.prom"
+    registry: MetricsRegistry = _registry()
+
+    registry.write_textfile(str(path))
+
+    assert path.read_text() == registry.render()
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_http_endpoint_negotiates_format() -> None:
+    """Test the metrics HTTP endpoint in both exposition formats."""
+    server = start_http_server(0, _registry())
+    url: str = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    try:
+        plain: requests.Response = requests.get(url, timeout=5)
+        openmetrics: requests.Response = requests.get(
+            url, headers={"Accept": "application/openmetrics-text; version=1.0.0"}, timeout=5
+        )
+        missing: requests.Response = requests.get(url.replace("/metrics", "/other"), timeout=5)
+    finally:
+        server.shutdown()
+
+    assert plain.headers["Content-Type"] == PROMETHEUS_CONTENT_TYPE
+    assert "app_in_flight 1.0" in plain.text
+    assert openmetrics.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+    assert openmetrics.text.endswith("# EOF\n")
+    assert missing.status_code == 404  # noqa: PLR2004
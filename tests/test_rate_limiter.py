@@ -0,0 +1,73 @@
+"""Test cases for the AdaptiveRateLimiter class."""
+
+import pytest
+
+from app.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time.
+
+        :return: Current fake time in seconds.
+        """
+        return self.now
+
+
+def test_reserve_paces_requests_at_rate() -> None:
+    """Test that requests beyond the burst are delayed according to the rate."""
+    limiter = AdaptiveRateLimiter(10.0, clock=FakeClock())
+
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+
+
+def test_throttling_decreases_rate_and_honors_retry_after() -> None:
+    """Test multiplicative decrease on 429 and blocking until Retry-After expires."""
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(20.0, clock=clock)
+
+    limiter.on_response(429, 0.05, "3")
+    limiter.on_response(429, 0.05, None)  # within cooldown, no second decrease
+
+    assert limiter.rate == pytest.approx(10.0)
+    assert limiter.reserve() == pytest.approx(3.0)
+
+
+def test_fast_responses_increase_rate_additively() -> None:
+    """Test that fast successful responses grow the rate up to the maximum."""
+    limiter = AdaptiveRateLimiter(10.0, max_rate=11.0, clock=FakeClock())
+
+    for _ in range(10):
+        limiter.on_response(200, 0.01)
+    assert limiter.rate == pytest.approx(11.0, abs=0.05)
+
+    for _ in range(100):
+        limiter.on_response(200, 0.01)
+    assert limiter.rate == 11.0  # noqa: PLR2004
+
+
+def test_slow_responses_decrease_rate() -> None:
+    """Test that responses slower than the target latency decrease the rate down to the minimum."""
+    clock = FakeClock()
+    limiter = AdaptiveRateLimiter(4.0, min_rate=1.5, target_latency=0.5, clock=clock)
+
+    for _ in range(3):
+        limiter.on_response(200, 2.0)
+        clock.now += 2.0
+
+    assert limiter.rate == 1.5  # noqa: PLR2004
+
+
+def test_parse_retry_after() -> None:
+    """Test parsing delay seconds and invalid values."""
+    assert parse_retry_after("5") == 5.0  # noqa: PLR2004
+    assert parse_retry_after(None) == 0.0
+    assert parse_retry_after("soon") == 0.0
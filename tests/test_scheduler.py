@@ -0,0 +1,131 @@
+"""Test the schedules and the daemon loop."""
+
+import datetime
+import threading
+
+import pytest
+from pytest import LogCaptureFixture
+
+from app.scheduler import CronSchedule, Daemon, IntervalSchedule, create_schedule
+
+NOW: datetime.datetime = datetime.datetime(2025, 4, 18, 10, 7, 30)  # a Friday
+
+
+def test_interval_schedule_skips_missed_runs() -> None:
+    """Test that the interval grid stays anchored and runs missed by an overrun are skipped."""
+    schedule: IntervalSchedule = IntervalSchedule(600)
+
+    assert schedule.next_run(NOW) == NOW + datetime.timedelta(minutes=10)
+    assert schedule.next_run(NOW + datetime.timedelta(minutes=10, seconds=2)) == NOW + datetime.timedelta(minutes=20)
+    assert schedule.next_run(NOW + datetime.timedelta(minutes=35)) == NOW + datetime.timedelta(minutes=40)
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("*/15 * * * *", datetime.datetime(2025, 4, 18, 10, 15)),
+        ("0 3 * * *", datetime.datetime(2025, 4, 19, 3, 0)),
+        ("30 9-17/4 * * 1-5", datetime.datetime(2025, 4, 18, 13, 30)),
+        ("0 0 * * 7", datetime.datetime(2025, 4, 20, 0, 0)),
+        ("0 0 1,15 * 1", datetime.datetime(2025, 4, 21, 0, 0)),
+        ("0 12 29 2 *", datetime.datetime(2028, 2, 29, 12, 0)),
+        ("@monthly", datetime.datetime(2025, 5, 1, 0, 0)),
+    ],
+)
+def test_cron_schedule_next_run(expression: str, expected: datetime.datetime) -> None:
+    """Test computing the next run of cron expressions.
+
+    :param expression: Cron expression.
+    :param expected: Expected next run after NOW.
+    """
+    assert CronSchedule(expression).next_run(NOW) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "*/0 * * * *", "a * * * *", "0 0 31 2 *"])
+def test_cron_schedule_invalid(expression: str) -> None:
+    """Test that invalid or never matching expressions are rejected.
+
+    :param expression: Cron expression.
+    """
+    with pytest.raises(ValueError, match=r"[Cc]ron"):
+        CronSchedule(expression).next_run(NOW)
+
+
+def test_create_schedule_prefers_cron() -> None:
+    """Test that a cron expression takes precedence over the interval."""
+    assert isinstance(create_schedule(3600, "0 * * * *"), CronSchedule)
+    assert isinstance(create_schedule(3600, ""), IntervalSchedule)
+
+
+def test_daemon_runs_until_stopped(caplog: LogCaptureFixture) -> None:
+    """Test that the daemon runs on start and on schedule, survives failures and stops when asked.
+
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    calls: list[int] = []
+    stopped: list[bool] = []
+    daemon: Daemon
+
+    def job() -> None:
+        calls.append(len(calls))
+        if len(calls) == 2:  # noqa: PLR2004
+            raise RuntimeError("Immich unavailable")
+        if len(calls) == 3:  # noqa: PLR2004
+            daemon.stop()
+
+    daemon = Daemon(job, IntervalSchedule(0.01), jitter=0.01, on_stop=lambda: stopped.append(True))
+    with caplog.at_level("INFO"):
+        daemon.run_forever()
+
+    assert len(calls) == 3  # noqa: PLR2004
+    assert stopped == [True]
+    assert "Sync run failed: Immich unavailable" in caplog.text
+    assert "Daemon stopped after 3 runs." in caplog.text
+
+
+def test_daemon_applies_jitter() -> None:
+    """Test that the jitter is added to the scheduled delay."""
+    waits: list[float] = []
+    daemon: Daemon = Daemon(
+        lambda: None,
+        IntervalSchedule(60),
+        jitter=30,
+        run_on_start=False,
+        now=lambda: NOW,
+        random_fraction=lambda: 0.5,
+    )
+
+    def wait(timeout: float | None = None) -> bool:
+        waits.append(timeout or 0.0)
+        return True
+
+    daemon.stop_event.wait = wait  # type: ignore[method-assign]
+    daemon.run_forever()
+
+    assert waits == [75.0]
+    assert daemon.runs == 0
+
+
+def test_daemon_skips_overlapping_run(caplog: LogCaptureFixture) -> None:
+    """Test that a run is skipped while the previous one is still in progress.
+
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    started: threading.Event = threading.Event()
+    release: threading.Event = threading.Event()
+
+    def job() -> None:
+        started.set()
+        release.wait(5)
+
+    daemon: Daemon = Daemon(job, IntervalSchedule(60))
+    worker: threading.Thread = threading.Thread(target=daemon.run_once)
+    worker.start()
+    started.wait(5)
+    with caplog.at_level("WARNING"):
+        assert daemon.run_once() is False
+    release.set()
+    worker.join()
+
+    assert daemon.runs == 1
+    assert "Previous sync is still running" in caplog.text
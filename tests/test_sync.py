@@ -1,13 +1,25 @@
 """test_sync.py"""
 
-from typing import Any
+import asyncio
+import datetime
+from pathlib import Path
+from typing import Any, cast
 
+import pytest
 from pytest import LogCaptureFixture, MonkeyPatch
 
 from app.config import Config
+from app.metrics import SYNC_ITEMS
 from app.sync import SyncService
+from tests.mocks.dummy_async_immich_client import DummyAsyncImmichClient, DummyAsyncImmichClientFailing
 from tests.mocks.dummy_gphoto_client import DummyGooglePhotosClient
-from tests.mocks.dummy_immich_client import DummyImmichClient, DummyImmichClientWithDescription
+from tests.mocks.dummy_immich_client import (
+    DummyImmichClient,
+    DummyImmichClientBulkFails,
+    DummyImmichClientWithDescription,
+    DummyImmichClientWithDuplicates,
+)
+from tests.mocks.dummy_takeout_client import DummyTakeoutClient
 
 
 def test_sync_run(monkeypatch: MonkeyPatch, caplog: Any) -> None:
@@ -107,3 +119,547 @@ def test_sync_skip_if_present(monkeypatch: MonkeyPatch, caplog: LogCaptureFixtur
         sync.run()
 
     assert "Skipping test1.jpg - already has description in Immich" in caplog.text
+
+
+def test_sync_concurrent_workers(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test the SyncService run method with a worker pool produces the same totals.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        sync_workers=4,
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Updated 1 items." in caplog.text
+
+
+def test_sync_index_mode(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test the SyncService run method resolving matches from the local asset index.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        match_mode="index",
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Indexed 2 Immich assets (2 changed, 0 removed)." in caplog.text
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Updated 1 items." in caplog.text
+    assert sync.immich.searched == []  # type: ignore[attr-defined]
+
+
+def test_sync_index_ambiguous_match(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that items matching several indexed assets are skipped instead of updating an arbitrary one.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        match_mode="index",
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClientWithDuplicates)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Ambiguous match in Immich: test1.jpg (2 candidates)" in caplog.text
+    assert "Skipped 1 items with ambiguous matches in Immich." in caplog.text
+    assert "Updated 0 items." in caplog.text
+    assert sync.immich.updated == []  # type: ignore[attr-defined]
+
+
+def test_sync_window_mode(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that window mode fetches the assets taken in the sync window once and matches them locally.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        match_mode="window",
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    filters: list[dict[str, Any]] = sync.immich.asset_filters  # type: ignore[attr-defined]
+    assert len(filters) == 1
+    taken_after = datetime.datetime.fromisoformat(filters[0]["takenAfter"])
+    taken_before = datetime.datetime.fromisoformat(filters[0]["takenBefore"])
+    assert taken_before - taken_after == datetime.timedelta(days=17)
+    assert "Indexed 2 Immich assets in the sync window." in caplog.text
+    assert "Updated: test1.jpg" in caplog.text
+    assert sync.immich.searched == []  # type: ignore[attr-defined]
+
+
+def test_sync_index_cache_delta(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test that a cached index is refreshed with a delta fetch on the next run.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        match_mode="index",
+        asset_cache_path=str(tmp_path / "assets.sqlite3"),
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    SyncService(config).run()
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Refreshing Immich asset index with changes since 2024-04-16T00:00:00.000Z" in caplog.text
+    assert "Indexed 2 Immich assets (0 changed, 0 removed)." in caplog.text
+    assert "Updated: test1.jpg" in caplog.text
+
+
+def test_sync_takeout_source(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test the SyncService run method reading metadata from Takeout archives.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=0,
+        source="takeout",
+        takeout_paths=["/takeout"],
+    )
+
+    monkeypatch.setattr("app.sync.TakeoutClient", DummyTakeoutClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Reading Google Takeout archives from /takeout..." in caplog.text
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Updated 1 items." in caplog.text
+
+
+def test_sync_fields_single_write(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that all synchronized fields of an item are written in one asset update.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=0,
+        source="takeout",
+        takeout_paths=["/takeout"],
+        sync_fields=["description", "date", "location", "favorite", "rating"],
+    )
+
+    monkeypatch.setattr("app.sync.TakeoutClient", DummyTakeoutClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Ignoring unknown sync field: rating" in caplog.text
+    assert sync.immich.updated == [  # type: ignore[attr-defined]
+        (
+            "asset123",
+            {
+                "description": "Test photo",
+                "dateTimeOriginal": "2024-04-15T10:00:00Z",
+                "latitude": 50.0875,
+                "longitude": 14.4214,
+                "isFavorite": True,
+            },
+        )
+    ]
+    assert sync.immich.bulk_updated == []  # type: ignore[attr-defined]
+    assert "Not found in Immich: test2.jpg" in caplog.text
+
+
+def test_sync_fields_bulk_flags(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that flag-only updates are sent with the bulk asset update.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=0,
+        source="takeout",
+        takeout_paths=["/takeout"],
+        sync_fields=["favorite"],
+    )
+
+    monkeypatch.setattr("app.sync.TakeoutClient", DummyTakeoutClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert sync.immich.updated == []  # type: ignore[attr-defined]
+    assert sync.immich.bulk_updated == [(["asset123"], {"isFavorite": True})]  # type: ignore[attr-defined]
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Updated 1 items." in caplog.text
+
+
+def test_sync_fields_bulk_flags_failed(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that items of a rejected bulk update are counted as failed, not updated, also on the next run.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=0,
+        source="takeout",
+        takeout_paths=["/takeout"],
+        sync_fields=["favorite"],
+    )
+
+    monkeypatch.setattr("app.sync.TakeoutClient", DummyTakeoutClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClientBulkFails)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Failed to update: test1.jpg" in caplog.text
+    assert "Updated 0 items." in caplog.text
+
+    caplog.clear()
+    sync._bulk_updates[(("isFavorite", True),)] = [("stale", "stale", "stale.jpg", "")]
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert sync.immich.bulk_updated[-1] == (["asset123"], {"isFavorite": True})  # type: ignore[attr-defined]
+    assert "stale.jpg" not in caplog.text
+    assert "Updated 0 items." in caplog.text
+
+
+def test_sync_journal_skips_unchanged(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test that a repeated run skips items already pushed with the same description.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        journal_path=str(tmp_path / "journal.jsonl"),
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    SyncService(config).run()
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Skipped 1 items unchanged since the last sync." in caplog.text
+    assert "Updated 0 items." in caplog.text
+    assert sync.immich.updated == []  # type: ignore[attr-defined]
+
+
+def test_sync_update_if_changed_search(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that update_if_changed writes a description missing in Immich and reports it as created.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        sync_strategy="update_if_changed",
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Descriptions created: 1, changed: 0, unchanged: 0." in caplog.text
+
+
+def test_sync_update_if_changed_index(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that update_if_changed skips writes when the indexed description already matches.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        sync_strategy="update_if_changed",
+        match_mode="index",
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Descriptions created: 0, changed: 0, unchanged: 1." in caplog.text
+    assert "Updated 0 items." in caplog.text
+    assert sync.immich.updated == []  # type: ignore[attr-defined]
+
+
+def test_sync_run_async(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test the SyncService run_async method with the async Immich client.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        sync_workers=4,
+        sync_async=True,
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+    monkeypatch.setattr("app.sync.AsyncImmichClient", DummyAsyncImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        asyncio.run(sync.run_async())
+
+    assert "Found 2 items." in caplog.text
+    assert "Updated: test1.jpg" in caplog.text
+    assert "Updated 1 items." in caplog.text
+    assert sync.immich_async.updated == [("asset123", {"description": "Test photo"})]  # type: ignore[attr-defined]
+    assert sync.immich_async.closed  # type: ignore[attr-defined]
+
+
+def test_sync_run_async_keeps_client(monkeypatch: MonkeyPatch) -> None:
+    """Test that consecutive runs on one event loop share the async Immich client until it is closed.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        sync_async=True,
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+    monkeypatch.setattr("app.sync.AsyncImmichClient", DummyAsyncImmichClient)
+
+    sync = SyncService(config)
+    with asyncio.Runner() as runner:
+        runner.run(sync.run_async(keep_client=True))
+        client: DummyAsyncImmichClient = cast(DummyAsyncImmichClient, sync.immich_async)
+        runner.run(sync.run_async(keep_client=True))
+        assert sync.immich_async is client
+        assert not client.closed
+        runner.run(sync.aclose())
+
+    assert client.closed
+    assert len(client.updated) == 2  # noqa: PLR2004
+
+
+def test_sync_run_async_failed_item(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test that an error in an async item task fails the run and keeps the watermark.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        sync_workers=4,
+        sync_async=True,
+        watermark_path=str(tmp_path / "watermark.json"),
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+    monkeypatch.setattr("app.sync.AsyncImmichClient", DummyAsyncImmichClientFailing)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"), pytest.raises(ConnectionError, match="Immich is unreachable"):
+        asyncio.run(sync.run_async())
+
+    assert "Run did not complete, keeping the watermark" in caplog.text
+    assert not (tmp_path / "watermark.json").exists()
+    assert sync.immich_async.closed  # type: ignore[attr-defined]
+
+
+def test_sync_metrics_textfile(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    """Test that sync results are counted and dumped to the textfile at the end of a run.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    textfile: Path = tmp_path / "gphoto2immich.prom"
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        days_back=15,
+        metrics_textfile=str(textfile),
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+    before: dict[str, float] = {result: SYNC_ITEMS.value(result=result) for result in ("seen", "skipped", "updated")}
+
+    SyncService(config).run()
+
+    assert SYNC_ITEMS.value(result="seen") == before["seen"] + 2
+    assert SYNC_ITEMS.value(result="skipped") == before["skipped"] + 1
+    assert SYNC_ITEMS.value(result="updated") == before["updated"] + 1
+    text: str = textfile.read_text()
+    assert 'gphoto2immich_sync_items_total{result="updated"}' in text
+    assert 'gphoto2immich_sync_stage_seconds_count{stage="update"}' in text
+
+
+def test_sync_stop(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that a stopped sync does not take further items and still finishes the run.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(google_credentials_path="dummy", immich_base_url="http://dummy", immich_api_key="dummy")
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    sync.stop()
+    with caplog.at_level("INFO"):
+        sync.run()
+
+    assert "Stop requested, not processing further items." in caplog.text
+    assert "Found 0 items." in caplog.text
+
+
+def test_sync_watermark(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture, tmp_path: Path) -> None:
+    """Test that a second run skips the items already synchronized up to the stored watermark.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    config = Config(
+        google_credentials_path="dummy",
+        immich_base_url="http://dummy",
+        immich_api_key="dummy",
+        watermark_path=str(tmp_path / "watermark.json"),
+        watermark_overlap=0,
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    SyncService(config).run()
+    caplog.clear()
+    with caplog.at_level("INFO"):
+        SyncService(config).run()
+
+    assert "Syncing items taken since 2024-04-15T10:00:00Z" in caplog.text
+    assert "Updated: test1.jpg" not in caplog.text
+    assert "Updated 0 items." in caplog.text
+
+
+def test_sync_albums(monkeypatch: MonkeyPatch, caplog: LogCaptureFixture) -> None:
+    """Test that source albums are created in Immich and filled with the matching assets only once.
+
+    :param monkeypatch: The pytest monkeypatch fixture to patch classes.
+    :param caplog: The pytest caplog fixture to capture log output.
+    """
+    config = Config(
+        google_credentials_path="dummy", immich_base_url="http://dummy", immich_api_key="dummy", sync_albums=True
+    )
+
+    monkeypatch.setattr("app.sync.GooglePhotosClient", DummyGooglePhotosClient)
+    monkeypatch.setattr("app.sync.ImmichClient", DummyImmichClient)
+
+    sync = SyncService(config)
+    with caplog.at_level("INFO"):
+        sync.run()
+        sync.run()
+
+    assert sync.immich.albums == {"Holiday": {"asset123"}}  # type: ignore[attr-defined]
+    assert "Synchronized 2 albums: 1 created, 1 assets added, 2 items not matched in Immich." in caplog.text
+    assert "Synchronized 2 albums: 0 created, 0 assets added, 2 items not matched in Immich." in caplog.text
+    assert sync.immich.asset_filters == [  # type: ignore[attr-defined]
+        {"withExif": True},
+        {"withExif": True, "updatedAfter": "2024-04-16T00:00:00.000Z", "withDeleted": True},
+    ]
@@ -0,0 +1,267 @@
+"""Test cases for the Google Takeout client."""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+from collections.abc import Generator
+from pathlib import Path
+from typing import cast
+
+from pytest import MonkeyPatch
+
+from app.media_record import MediaRecord
+from app.takeout_client import TakeoutClient, media_name_for, parse_sidecar, replay_spool, spool_archive
+
+MEDIA_BYTES: bytes = b"\xff\xd8 media bytes"
+MEDIA_CHECKSUM: str = base64.b64encode(hashlib.sha1(MEDIA_BYTES, usedforsecurity=False).digest()).decode()
+
+SIDECAR: dict = {
+    "title": "IMG_0001.jpg",
+    "description": "Sunset at the beach",
+    "photoTakenTime": {"timestamp": "1712750400", "formatted": "Apr 10, 2024, 12:00:00 PM UTC"},
+}
+
+
+def _write_zip(path: Path) -> None:
+    """Write a small Takeout-like zip archive.
+
+    :param path: Destination path.
+    """
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("Takeout/Google Photos/Trip/IMG_0001.jpg", MEDIA_BYTES)
+        archive.writestr("Takeout/Google Photos/Trip/IMG_0001.jpg.json", json.dumps(SIDECAR))
+        archive.writestr("Takeout/Google Photos/Trip/metadata.json", json.dumps({"title": "Trip", "date": {}}))
+
+
+def _spool_at_the_same_time(path: str, with_media: bool, spool_path: str) -> tuple[int, dict[str, str]]:
+    """Spool an archive part, then wait until every part in its directory is spooled, in a worker process.
+
+    Fails if the parts are not all scanned at the same time, e.g. when a worker has to wait for the reader.
+
+    :param path: Path to the archive part.
+    :param with_media: Hash the media files.
+    :param spool_path: Spool file of the part.
+    :return: Result of `spool_archive`.
+    """
+    result: tuple[int, dict[str, str]] = spool_archive(path, with_media, spool_path)
+    Path(f"{path}.done").touch()
+    directory: str = os.path.dirname(path)
+    parts: int = sum(name.endswith(".zip") for name in os.listdir(directory))
+    deadline: float = time.monotonic() + 10
+    while sum(name.endswith(".done") for name in os.listdir(directory)) < parts:
+        if time.monotonic() > deadline:
+            raise TimeoutError("archive parts were not scanned concurrently")
+        time.sleep(0.01)
+    return result
+
+
+def _write_tgz(path: Path) -> None:
+    """Write a small Takeout-like tgz archive.
+
+    :param path: Destination path.
+    """
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in (
+            ("Takeout/Google Photos/Photos from 2024/IMG_0002.jpg", MEDIA_BYTES),
+            (
+                "Takeout/Google Photos/Photos from 2024/IMG_0002.jpg.json",
+                json.dumps({**SIDECAR, "title": "IMG_0002.jpg", "description": ""}).encode(),
+            ),
+        ):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_parse_sidecar() -> None:
+    """Test parsing a photo sidecar and ignoring other JSON files."""
+    metadata = parse_sidecar("Takeout/IMG_0001.jpg.json", json.dumps(SIDECAR).encode())
+
+    assert metadata == MediaRecord(
+        id="Takeout/IMG_0001.jpg.json",
+        filename="IMG_0001.jpg",
+        description="Sunset at the beach",
+        creation_time="2024-04-10T12:00:00Z",
+    )
+    assert parse_sidecar("metadata.json", b'{"title": "Album"}') is None
+    assert parse_sidecar("broken.json", b"{not json") is None
+    for timestamp in ("99999999999999999999", "-99999999999999", "soon"):
+        sidecar: bytes = json.dumps({**SIDECAR, "photoTakenTime": {"timestamp": timestamp}}).encode()
+        assert parse_sidecar("Takeout/IMG_0001.jpg.json", sidecar) is None
+
+
+def test_parse_sidecar_location_and_flags() -> None:
+    """Test reading the GPS position and the favorite/archived flags of a sidecar."""
+    sidecar: dict = {
+        **SIDECAR,
+        "favorited": True,
+        "geoData": {"latitude": 0.0, "longitude": 0.0},
+        "geoDataExif": {"latitude": 50.0875, "longitude": 14.4214},
+    }
+
+    metadata = parse_sidecar("Takeout/IMG_0001.jpg.json", json.dumps(sidecar).encode())
+
+    assert metadata is not None
+    assert (metadata.latitude, metadata.longitude) == (50.0875, 14.4214)
+    assert metadata.favorite is True
+    assert metadata.archived is False
+
+
+def test_iter_media_items_reads_zip_and_tgz(tmp_path: Path) -> None:
+    """Test reading sidecars from a directory with zip and tgz archive parts.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    _write_tgz(tmp_path / "takeout-002.tgz")
+    client = TakeoutClient([str(tmp_path)])
+
+    items = list(client.iter_media_items(days_back=0))
+
+    assert [item.filename for item in items] == ["IMG_0001.jpg", "IMG_0002.jpg"]
+    assert items[1].description is None
+    assert not list(tmp_path.glob("**/*.jpg"))  # nothing extracted to disk
+
+
+def test_iter_media_items_filters_days_back(tmp_path: Path) -> None:
+    """Test that items older than the window are skipped when days_back is set.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    client = TakeoutClient([str(tmp_path / "takeout-001.zip")])
+
+    assert list(client.iter_media_items(days_back=1)) == []
+
+
+def test_iter_media_items_process_pool_keeps_order(tmp_path: Path) -> None:
+    """Test that scanning archive parts on a process pool yields the same ordered stream.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    _write_tgz(tmp_path / "takeout-002.tgz")
+    _write_zip(tmp_path / "takeout-003.zip")
+
+    sequential = list(TakeoutClient([str(tmp_path)]).iter_media_items(days_back=0))
+    parallel = list(TakeoutClient([str(tmp_path)], workers=3).iter_media_items(days_back=0))
+
+    assert parallel == sequential
+    assert [item.filename for item in parallel] == ["IMG_0001.jpg", "IMG_0002.jpg", "IMG_0001.jpg"]
+
+
+def test_spool_archive_round_trip(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that a worker spools its records in chunks and the reader replays them in archive order.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    :param monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr("app.takeout_client.SCAN_CHUNK_SIZE", 1)
+    path = tmp_path / "takeout-001.zip"
+    _write_zip(path)
+    with zipfile.ZipFile(path, "a") as archive:
+        archive.writestr(
+            "Takeout/Google Photos/Trip/IMG_0003.jpg.json", json.dumps({**SIDECAR, "title": "IMG_0003.jpg"})
+        )
+    spool_path: str = str(tmp_path / "00000.pickle")
+
+    assert spool_archive(str(path), False, spool_path) == (2, {"Takeout/Google Photos/Trip": "Trip"})
+    assert [item.filename for item in replay_spool(spool_path)] == ["IMG_0001.jpg", "IMG_0003.jpg"]
+
+
+def test_iter_media_items_process_pool_overlaps_parts(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that archive parts are scanned concurrently, without waiting for the reader to take their records.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    :param monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr("app.takeout_client.spool_archive", _spool_at_the_same_time)
+    for part in range(3):
+        _write_zip(tmp_path / f"takeout-{part:03d}.zip")
+
+    items = list(TakeoutClient([str(tmp_path)], workers=3).iter_media_items(days_back=0))
+
+    assert [item.filename for item in items] == ["IMG_0001.jpg"] * 3
+    assert len(list(tmp_path.glob("*.done"))) == 3  # noqa: PLR2004
+
+
+def test_iter_media_items_process_pool_closes_early(tmp_path: Path) -> None:
+    """Test that closing a parallel scan early stops the workers instead of waiting for every part.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    for part in range(6):
+        _write_zip(tmp_path / f"takeout-{part:03d}.zip")
+    items = cast(Generator[MediaRecord], TakeoutClient([str(tmp_path)], workers=2).iter_media_items(days_back=0))
+
+    assert next(items).filename == "IMG_0001.jpg"
+    items.close()
+
+
+def test_media_name_for() -> None:
+    """Test deriving media file names from sidecar names, including Takeout duplicate naming."""
+    assert media_name_for("Trip/IMG_0001.jpg.json") == "Trip/IMG_0001.jpg"
+    assert media_name_for("Trip/IMG_0001.jpg.supplemental-metadata.json") == "Trip/IMG_0001.jpg"
+    assert media_name_for("Trip/IMG_0001.jpg(1).json") == "Trip/IMG_0001(1).jpg"
+
+
+def test_iter_media_items_hashes_media(tmp_path: Path) -> None:
+    """Test that media checksums and sizes are computed in zip and tgz archives when requested.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    _write_tgz(tmp_path / "takeout-002.tgz")
+
+    items = list(TakeoutClient([str(tmp_path)], hash_media=True).iter_media_items(days_back=0))
+
+    assert [item.checksum for item in items] == [MEDIA_CHECKSUM, MEDIA_CHECKSUM]
+    assert [item.size for item in items] == [len(MEDIA_BYTES), len(MEDIA_BYTES)]
+
+
+def test_iter_albums_merges_archive_parts(tmp_path: Path) -> None:
+    """Test that album folders are found by their metadata.json and merged across archive parts.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    _write_tgz(tmp_path / "takeout-002.tgz")
+    with zipfile.ZipFile(tmp_path / "takeout-003.zip", "w") as archive:
+        archive.writestr(
+            "Takeout/Google Photos/Trip/IMG_0003.jpg.json", json.dumps({**SIDECAR, "title": "IMG_0003.jpg"})
+        )
+
+    for workers in (1, 3):
+        albums = list(TakeoutClient([str(tmp_path)], workers=workers).iter_albums())
+
+        assert [(album["id"], album["title"]) for album in albums] == [("Takeout/Google Photos/Trip", "Trip")]
+        assert [item.filename for item in albums[0]["items"]] == ["IMG_0001.jpg", "IMG_0003.jpg"]
+
+
+def test_iter_albums_reuses_the_media_scan(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    """Test that albums are collected during the media scan, including items outside the sync window.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    :param monkeypatch: The pytest monkeypatch fixture.
+    """
+    _write_zip(tmp_path / "takeout-001.zip")
+    _write_tgz(tmp_path / "takeout-002.tgz")
+    client = TakeoutClient([str(tmp_path)], collect_albums=True)
+
+    assert list(client.iter_media_items(days_back=1)) == []
+
+    def no_second_pass(path: str, with_media: bool = False) -> None:
+        raise AssertionError("archives must not be scanned again")
+
+    monkeypatch.setattr("app.takeout_client.iter_sidecars", no_second_pass)
+    albums = list(client.iter_albums())
+
+    assert client.album_items == {"Takeout/Google Photos/Trip": ["Takeout/Google Photos/Trip/IMG_0001.jpg.json"]}
+    assert [(album["title"], [item.filename for item in album["items"]]) for album in albums] == [
+        ("Trip", ["IMG_0001.jpg"])
+    ]
@@ -0,0 +1,99 @@
+"""Test cases for the SyncWatermark class."""
+
+import json
+from pathlib import Path
+
+from app.watermark import SyncWatermark
+
+
+def _run(path: str, items: list[tuple[str, str, bool]], overlap_hours: float = 0.0, floor: str | None = None) -> None:
+    """Observe and complete items as one sync run would, then commit.
+
+    :param path: Path to the watermark file.
+    :param items: Tuples of (item ID, creation time, synchronized).
+    :param overlap_hours: Watermark overlap in hours.
+    :param floor: Retry floor passed to `commit`.
+    """
+    watermark = SyncWatermark(path, overlap_hours)
+    for item_id, taken_at, done in items:
+        if not watermark.is_done(item_id, taken_at):
+            watermark.observe(item_id, taken_at)
+            watermark.complete(item_id, done)
+    watermark.commit(floor)
+
+
+def test_watermark_advances_to_newest_item(tmp_path: Path) -> None:
+    """Test that a run stores the newest item and the next run skips everything up to it.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: str = str(tmp_path / "state" / "watermark.json")
+    _run(
+        path,
+        [
+            ("a", "2025-04-10T08:00:00Z", True),
+            ("b", "2025-04-12T08:00:00Z", True),
+            ("c", "2025-04-12T08:00:00Z", True),
+        ],
+    )
+
+    watermark = SyncWatermark(path)
+
+    assert json.loads(Path(path).read_text()) == {"time": "2025-04-12T08:00:00Z", "ids": ["b", "c"]}
+    assert watermark.is_done("a", "2025-04-10T08:00:00Z")
+    assert watermark.is_done("b", "2025-04-12T08:00:00Z")
+    assert not watermark.is_done("d", "2025-04-12T08:00:00Z")  # late arrival at the boundary
+    assert not watermark.is_done("e", "2025-04-12T08:00:01Z")
+    assert not watermark.is_done("f", None)
+
+
+def test_watermark_overlap_reprocesses_recent_items(tmp_path: Path) -> None:
+    """Test that items within the overlap before the watermark are processed again.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: str = str(tmp_path / "watermark.json")
+    _run(path, [("a", "2025-04-12T08:00:00Z", True)])
+
+    watermark = SyncWatermark(path, overlap_hours=24)
+
+    assert watermark.since == "2025-04-11T08:00:00Z"
+    assert not watermark.is_done("a", "2025-04-12T08:00:00Z")
+    assert not watermark.is_done("b", "2025-04-11T09:00:00Z")
+    assert watermark.is_done("c", "2025-04-11T07:59:59Z")
+
+
+def test_watermark_held_back_by_unsynced_item(tmp_path: Path) -> None:
+    """Test that an item that could not be synchronized holds the watermark back, down to the floor.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: str = str(tmp_path / "watermark.json")
+    items: list[tuple[str, str, bool]] = [("a", "2025-04-12T08:00:00Z", True), ("b", "2025-04-11T08:00:00Z", False)]
+    _run(path, items)
+
+    assert SyncWatermark(path).time == "2025-04-11T08:00:00Z"
+    assert not SyncWatermark(path).is_done("b", "2025-04-11T08:00:00Z")
+
+    _run(path, items, floor="2025-04-11T12:00:00Z")
+
+    assert SyncWatermark(path).time == "2025-04-11T12:00:00Z"
+
+
+def test_watermark_read_only_and_unreadable(tmp_path: Path) -> None:
+    """Test that a dry-run watermark is never stored and a corrupt file is ignored.
+
+    :param tmp_path: The pytest temporary directory fixture.
+    """
+    path: Path = tmp_path / "watermark.json"
+    watermark = SyncWatermark(str(path), read_only=True)
+    watermark.observe("a", "2025-04-12T08:00:00Z")
+    watermark.complete("a", True)
+    watermark.commit()
+
+    assert not path.exists()
+
+    path.write_text("{not json")
+
+    assert SyncWatermark(str(path)).time is None
+    assert SyncWatermark(str(path)).days_back(15) == 15  # noqa: PLR2004